@@ -0,0 +1,94 @@
+import random
+import sys
+
+import host
+
+clock = host.install(virtual=True)
+
+import machine
+from checks import check
+from pimoroni import Analog
+
+"""
+Check pimoroni.Analog against a simulated ADC: that a burst's median ignores a wild
+reading that its mean doesn't, and that a background Analog's ring buffer gives the
+mean (or median) of the last readings without reading the ADC itself.
+
+Run from the repository root with: python3 benchmarks/analog_check.py
+"""
+
+PIN = 26
+RATE = 100   # background readings a second
+SIZE = 8     # readings in the ring
+
+
+class Source:
+    # Hands the ADC a given sequence of readings, one per read, remembering what it gave
+    def __init__(self, values):
+        self.values = list(values)
+        self.given = []
+
+    def __call__(self, _ms):
+        value = self.values[len(self.given) % len(self.values)]
+        self.given.append(value)
+        return value
+
+
+def median(values):
+    return sorted(values)[len(values) // 2]
+
+
+def check_burst():
+    ok = True
+    machine.reset_state()
+    machine.set_adc(PIN, Source([1000, 1020, 60000, 990, 1010]))
+    mean = Analog(PIN, samples=5)
+    ok &= check("a burst is averaged", mean.read_raw() == (1000 + 1020 + 60000 + 990 + 1010) // 5)
+
+    source = Source([1000, 1020, 60000, 990, 1010])
+    machine.set_adc(PIN, source)
+    filtered = Analog(PIN, samples=5, median=True)
+    ok &= check("a burst's median ignores the wild reading", filtered.read_raw() == 1010 and len(source.given) == 5)
+    ok &= check("and the median reads the ADC afresh each time", filtered.read_raw() == 1010 and len(source.given) == 10)
+
+    machine.set_adc(PIN, 65535)
+    ok &= check("one sample by default, as before", Analog(PIN).read_raw() == 65535)
+    return ok
+
+
+def check_ring(median_filter):
+    ok = True
+    name = "median" if median_filter else "mean"
+    machine.reset_state()
+    rng = random.Random(1)
+    source = Source(rng.randrange(65536) for _ in range(1000))
+    machine.set_adc(PIN, source)
+    analog = Analog(PIN, median=median_filter)
+    analog.start(RATE, SIZE)
+    # start() fills the ring with one reading, so it's full from the first read
+    ok &= check(f"{name}: the ring starts full of the first reading", analog.read_raw() == source.given[0])
+
+    for readings in (SIZE // 2, SIZE, 10 * SIZE + 3, 500):
+        clock.sleep_ms(readings * 1000 // RATE)
+        given = len(source.given)
+        last = ([source.given[0]] * SIZE + source.given[1:])[-SIZE:]
+        expected = median(last) if median_filter else sum(last) // SIZE
+        value = analog.read_raw()
+        ok &= check(f"{name}: after {given - 1} background readings, the {name} of the last {SIZE}", value == expected and len(source.given) == given)
+
+    analog.stop()
+    given = len(source.given)
+    clock.sleep_ms(100)
+    ok &= check(f"{name}: stop() stops the readings, and reads go back to the ADC", len(source.given) == given and analog.read_raw() == source.given[-1])
+    return ok
+
+
+def main():
+    ok = check_burst()
+    ok &= check_ring(False)
+    ok &= check_ring(True)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
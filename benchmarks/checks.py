@@ -0,0 +1,9 @@
+"""
+What the *_check.py scripts share: each check prints a line saying whether it passed, and
+returns that so a script can exit non-zero if any of its checks failed.
+"""
+
+
+def check(description, condition):
+    print(f"{'OK  ' if condition else 'FAIL'} {description}")
+    return condition
@@ -0,0 +1,270 @@
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import time
+import tracemalloc
+
+import host
+
+host.install(virtual=True)
+
+from simulator import network
+from simulator.allocations import Allocations
+from simulator.clock import StopSimulation
+from simulator.run import run
+
+"""
+Run each of the bundled effects for a fixed number of frames at several strip lengths,
+and report how long the frames took, how much memory they allocated and how often
+(and for how long) the garbage collector ran.
+
+Run from the repository root with: python3 benchmarks/effects.py --output report.json
+and compare two reports with: python3 benchmarks/effects.py --compare old.json new.json
+
+Each effect is run three times: once for timing, once with tracemalloc watching every
+allocation, and once counting the objects MicroPython would allocate (both of which slow
+things down too much to time at the same time). The object counts are the ones to go by
+for a board: CPython allocates ints that MicroPython doesn't, and reuses lists and floats
+that MicroPython wouldn't, so its byte counts ("alloc B") are only good for comparing runs.
+Times are on this computer, so compare reports from the same machine.
+"""
+
+LENGTHS = (50, 144, 300, 1000)
+FRAMES = 200
+WARMUP = 20
+INTRO = 10_000  # the most frames an example may take to get its effect going
+
+WEATHER_HOST = "api.open-meteo.com"
+
+# Where objects are counted: the examples themselves, and the frozen modules they use
+WATCHED = (host.ROOT / "examples", host.ROOT / "modules")
+
+
+def weather(code):
+    # Answer weather.py's request with the given weather code
+    body = json.dumps({"current_weather": {"time": "2024-01-15T14:00", "temperature": 6.3, "weathercode": code}}).encode("utf-8")
+
+    def setup(_clock):
+        network.serve(WEATHER_HOST, body)
+    return setup
+
+
+def requested():
+    # weather.py flashes the strip while it connects to WiFi, and only starts its effect once it's online
+    return len(network.requests) > 0
+
+
+# name: (example, setup, returns True once the effect has started)
+EFFECTS = {
+    "fire": ("examples/fire.py", None, None),
+    "rainbows": ("examples/rainbows.py", None, None),
+    "sparkles": ("examples/sparkles.py", None, None),
+    "snow": ("examples/snow.py", None, None),
+    "pulse": ("examples/pulse.py", None, None),
+    "tree": ("examples/tree.py", None, None),
+    "hue_twinkles_encoder": ("examples/hue_twinkles_encoder.py", None, None),
+    "rotary": ("examples/rotary.py", None, None),
+    "weather-clear": ("examples/weather.py", weather(0), requested),
+    "weather-clouds": ("examples/weather.py", weather(3), requested),
+    "weather-rain": ("examples/weather.py", weather(63), requested),
+    "weather-snow": ("examples/weather.py", weather(73), requested),
+    "weather-storm": ("examples/weather.py", weather(95), requested),
+}
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, len(values) * p // 100)] if values else 0
+
+
+def quiet(function, *args, **kwargs):
+    # The examples print as they go, which would drown out the report
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        return function(*args, **kwargs)
+
+
+def measure(path, setup, ready, num_leds, frames, warmup, on_start, on_measure):
+    # Run an example until it's ready, then for `warmup` frames, then call on_start() and
+    # on_measure(frame_us) at the end of each of the next `frames` frames
+    first = warmup if ready is None else None
+
+    def on_frame(frame, us):
+        nonlocal first
+        if first is None:
+            if not ready():
+                return
+            first = frame + 1 + warmup
+        if frame == first - 1:
+            on_start()
+        elif frame >= first:
+            on_measure(us)
+            if frame - first + 1 >= frames:
+                raise StopSimulation
+
+    if first == 0:
+        on_start()
+    quiet(run, path, num_leds, frames + warmup + INTRO, setup=setup, on_frame=on_frame)
+
+
+def time_effect(path, setup, ready, num_leds, frames, warmup):
+    times = []
+    pauses = []
+    started = []
+
+    def on_gc(phase, _info):
+        if phase == "start":
+            started.append(time.perf_counter_ns())
+        elif started:
+            pauses.append((time.perf_counter_ns() - started.pop()) // 1_000)
+
+    gc.collect()
+    gc.callbacks.append(on_gc)
+    try:
+        measure(path, setup, ready, num_leds, frames, warmup, pauses.clear, times.append)
+    finally:
+        gc.callbacks.remove(on_gc)
+
+    return {
+        "frames": len(times),
+        "mean_us": sum(times) // len(times) if times else 0,
+        "p50_us": percentile(times, 50),
+        "p95_us": percentile(times, 95),
+        "max_us": max(times, default=0),
+        "gc_collections": len(pauses),
+        "gc_pause_total_us": sum(pauses),
+        "gc_pause_max_us": max(pauses, default=0),
+    }
+
+
+def measure_allocations(path, setup, ready, num_leds, frames, warmup):
+    allocated = []
+    heap = {}
+
+    # Only count what the example and the frozen modules hold on to, not the simulator or this script
+    ignore = [tracemalloc.Filter(False, str(host.ROOT / folder / "*")) for folder in ("simulator", "benchmarks")]
+    ignore.append(tracemalloc.Filter(False, tracemalloc.__file__))
+
+    def on_start():
+        heap["warm"] = tracemalloc.take_snapshot().filter_traces(ignore)
+        heap["start"] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def on_measure(_us):
+        current, peak = tracemalloc.get_traced_memory()
+        # The most memory in use at once during the frame, beyond what was in use when it started
+        allocated.append(max(0, peak - heap["start"]))
+        if len(allocated) == frames:
+            heap["end"] = tracemalloc.take_snapshot().filter_traces(ignore)
+        heap["start"] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        measure(path, setup, ready, num_leds, frames, warmup, on_start, on_measure)
+    finally:
+        tracemalloc.stop()
+
+    growth = 0
+    if "end" in heap:
+        growth = sum(stat.size_diff for stat in heap["end"].compare_to(heap["warm"], "filename"))
+    return {
+        "alloc_bytes_mean": sum(allocated) // len(allocated) if allocated else 0,
+        "alloc_bytes_max": max(allocated, default=0),
+        "heap_growth_bytes": growth,
+    }
+
+
+def count_allocations(path, setup, ready, num_leds, frames, warmup):
+    # How many objects MicroPython would allocate in each frame, and where (see simulator/allocations.py)
+    allocations = Allocations(WATCHED)
+    counts = []
+
+    def on_start():
+        allocations.reset()
+        allocations.counting = True
+
+    def on_measure(_us):
+        counts.append(allocations.count)
+        allocations.count = 0
+        if len(counts) == frames:
+            allocations.counting = False
+
+    allocations.start()
+    try:
+        measure(path, setup, ready, num_leds, frames, warmup, on_start, on_measure)
+    finally:
+        allocations.stop()
+    return counts, allocations.sites
+
+
+def benchmark(effects, lengths, frames, warmup):
+    results = []
+    for name in effects:
+        path, setup, ready = EFFECTS[name]
+        path = host.ROOT / path
+        for num_leds in lengths:
+            result = {"effect": name, "leds": num_leds}
+            result.update(time_effect(path, setup, ready, num_leds, frames, warmup))
+            result.update(measure_allocations(path, setup, ready, num_leds, frames, warmup))
+            counts, _sites = count_allocations(path, setup, ready, num_leds, frames, warmup)
+            result["objects_mean"] = sum(counts) // len(counts) if counts else 0
+            results.append(result)
+            print(f"{name:>22} {num_leds:>5} {result['mean_us']:>9} {result['p95_us']:>9} {result['max_us']:>9}"
+                  f" {result['objects_mean']:>7} {result['alloc_bytes_mean']:>9} {result['heap_growth_bytes']:>8} {result['gc_collections']:>4} {result['gc_pause_total_us']:>8}")
+    return results
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = {(r["effect"], r["leds"]): r for r in json.load(f)["results"]}
+    with open(new_path) as f:
+        new = json.load(f)["results"]
+
+    print(f"{'effect':>22} {'LEDs':>5} {'mean us':>17} {'p95 us':>17} {'alloc bytes':>19}")
+    for r in new:
+        before = old.get((r["effect"], r["leds"]))
+        if before is None:
+            continue
+        cells = []
+        for key in ("mean_us", "p95_us", "alloc_bytes_mean"):
+            change = (r[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            cells.append(f"{before[key]:>7} > {r[key]:>7} {change:+6.1f}%")
+        print(f"{r['effect']:>22} {r['leds']:>5} " + " ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the bundled effects in the simulator.")
+    parser.add_argument("--effects", nargs="+", choices=list(EFFECTS), default=list(EFFECTS))
+    parser.add_argument("--leds", nargs="+", type=int, default=list(LENGTHS))
+    parser.add_argument("--frames", type=int, default=FRAMES)
+    parser.add_argument("--warmup", type=int, default=WARMUP, help="frames to run before measuring")
+    parser.add_argument("--output", help="write a JSON report to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two JSON reports")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    print(f"{'effect':>22} {'LEDs':>5} {'mean us':>9} {'p95 us':>9} {'max us':>9} {'objects':>7} {'alloc B':>9} {'heap +B':>8} {'gcs':>4} {'gc us':>8}")
+    results = benchmark(args.effects, args.leds, args.frames, args.warmup)
+
+    if args.output:
+        report = {
+            "python": platform.python_implementation() + " " + platform.python_version(),
+            "machine": platform.machine(),
+            "frames": args.frames,
+            "warmup": args.warmup,
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
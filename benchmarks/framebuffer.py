@@ -0,0 +1,88 @@
+import time
+
+import host
+
+host.install()
+
+from framebuffer import BLEND_ADD, FrameBuffer
+
+"""
+Compare per-pixel set_rgb() updates against compositing into a FrameBuffer
+and pushing it to the strip with a single copy, and time pushes of frames
+where nothing, or only one LED, has changed.
+
+Run from the repository root with: python3 benchmarks/framebuffer.py
+"""
+
+FRAMES = 200
+LENGTHS = (50, 144, 300, 1000)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        function(frame, *args)
+    return (time.perf_counter() - start) / FRAMES * 1000
+
+
+def gradient_per_pixel(frame, strip, num_leds):
+    # The same gradient fb.gradient() draws, sent one set_rgb() at a time
+    r1, r2 = frame & 0xff, 255 - (frame & 0xff)
+    steps = max(1, num_leds - 1)
+    for i in range(num_leds):
+        strip.set_rgb(i, r1 + (r2 - r1) * i // steps, 0, 64)
+
+
+def gradient_framebuffer(frame, fb, num_leds):
+    fb.gradient(0, num_leds, (frame & 0xff, 0, 64), (255 - (frame & 0xff), 0, 64))
+    fb.push()
+
+
+def composite_framebuffer(frame, fb, layer, num_leds):
+    gradient_framebuffer(frame, fb, num_leds)
+    layer.fill(0, 16, 0)
+    fb.blend(layer, BLEND_ADD)
+    fb.push()
+
+
+def push_per_pixel(frame, fb, strip):
+    # Every LED changes each frame
+    fb.fill(frame & 0xff, 0, 64)
+    fb.push(strip)
+
+
+def push_bulk(frame, fb):
+    fb.fill(frame & 0xff, 0, 64)
+    fb.push()
+
+
+def push_unchanged(_frame, fb):
+    # The frame hasn't changed, so there's nothing to copy
+    fb.push()
+
+
+def push_one_pixel(frame, fb, strip):
+    # A single LED changes each frame, as in tree.py or random-blinkies.py
+    fb.set_rgb(frame % fb.num_leds, frame & 0xff, 0, 0)
+    fb.push(strip)
+
+
+def main():
+    print(f"{'LEDs':>6} {'set_rgb loop':>13} {'fb gradient':>12} {'fb + blend':>11} {'push/pixel':>11} {'push/bulk':>10} {'push/same':>10} {'push/1 LED':>11}  (ms per frame)")
+    for num_leds in LENGTHS:
+        strip = host.StubStrip(num_leds)
+        fb = FrameBuffer(num_leds)
+        fb.ws2812()
+        layer = FrameBuffer(num_leds)
+        print(f"{num_leds:>6}"
+              f" {timed(gradient_per_pixel, strip, num_leds):>13.3f}"
+              f" {timed(gradient_framebuffer, fb, num_leds):>12.3f}"
+              f" {timed(composite_framebuffer, fb, layer, num_leds):>11.3f}"
+              f" {timed(push_per_pixel, fb, strip):>11.3f}"
+              f" {timed(push_bulk, fb):>10.4f}"
+              f" {timed(push_unchanged, fb):>10.4f}"
+              f" {timed(push_one_pixel, fb, strip):>11.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import argparse
+import gc
+import sys
+import tracemalloc
+from array import array
+
+import host
+from effects import EFFECTS, WARMUP, count_allocations, measure
+
+"""
+Check that the bundled effects don't allocate memory every frame once they're running.
+
+Each effect is run twice in the simulator, both times after WARMUP frames to let it get going:
+
+* With simulator.allocations watching the examples and frozen modules, counting the objects
+  that MicroPython would have to allocate on its heap each frame (lists, tuples, floats,
+  slices, closures, generators...). CPython's own byte counts don't carry over to a board -
+  it allocates ints that MicroPython doesn't, and reuses lists and floats that MicroPython
+  wouldn't - so this counts objects rather than bytes. The effects in ALLOCATION_FREE must
+  not allocate anything at all; the rest are reported.
+* With gc.mem_alloc() read at the end of every frame, to catch memory that an effect keeps
+  hold of, like a list that grows every frame, as the heap creeping upwards.
+
+Run from the repository root with: python3 benchmarks/heap_check.py
+"""
+
+FRAMES = 200
+LEDS = 144
+# Regular Python's own bookkeeping can wander by a few hundred bytes. Keeping hold of even
+# one small object a frame grows the heap by several KB over FRAMES frames
+TOLERANCE = 1024
+
+# Effects that shouldn't allocate anything once they're going, so never need the garbage collector
+ALLOCATION_FREE = {
+    "fire", "sparkles", "snow",
+    "weather-clear", "weather-clouds", "weather-rain", "weather-snow", "weather-storm",
+}
+
+def heap_growth(path, setup, ready, num_leds, frames, warmup):
+    # Preallocated, so that keeping the readings doesn't grow the heap that's being read
+    readings = array("q", bytes(8 * frames))
+    count = 0
+
+    def on_measure(_us):
+        nonlocal count
+        readings[count] = gc.mem_alloc()
+        count += 1
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        measure(path, setup, ready, num_leds, frames, warmup, lambda: None, on_measure)
+    finally:
+        tracemalloc.stop()
+
+    half = count // 2
+    return max(readings[half:count], default=0) - max(readings[:half], default=0)
+
+
+def check(name, num_leds, frames, warmup):
+    # Returns the objects allocated in each frame, where they were allocated, and how much the heap grew
+    path, setup, ready = EFFECTS[name]
+    path = host.ROOT / path
+    counts, sites = count_allocations(path, setup, ready, num_leds, frames, warmup)
+    growth = heap_growth(path, setup, ready, num_leds, frames, warmup)
+    return counts, sites, growth
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the bundled effects don't allocate every frame.")
+    parser.add_argument("--effects", nargs="+", choices=list(EFFECTS), default=list(EFFECTS))
+    parser.add_argument("--leds", type=int, default=LEDS)
+    parser.add_argument("--frames", type=int, default=FRAMES)
+    parser.add_argument("--warmup", type=int, default=WARMUP, help="frames to run before checking")
+    args = parser.parse_args()
+
+    failed = []
+    for name in args.effects:
+        counts, sites, growth = check(name, args.leds, args.frames, args.warmup)
+        allocated = sum(counts) // len(counts) if len(counts) else 0
+        ok = len(counts) == args.frames and growth <= TOLERANCE
+        if name in ALLOCATION_FREE:
+            ok = ok and max(counts, default=0) == 0
+        print(f"{name:>22}: {len(counts)} frames, {allocated} objects allocated a frame, heap {growth:+} bytes"
+              f" {'OK' if ok else 'FAIL'}")
+        if not ok:
+            failed.append(name)
+            for (filename, line, kind), times in sites.most_common(5):
+                print(f"{'':>24}{times // max(1, len(counts))} x {kind} at {filename}:{line}")
+
+    if failed:
+        print(f"Allocating every frame, or growing the heap: {', '.join(failed)}")
+        sys.exit(1)
+    print(f"None of {', '.join(sorted(ALLOCATION_FREE & set(args.effects)))} allocated, and no effect grew the heap")
+
+
+if __name__ == "__main__":
+    main()
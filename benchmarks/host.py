@@ -0,0 +1,22 @@
+import sys
+from pathlib import Path
+
+"""
+Lets the benchmarks, which are run as scripts, use the simulator in the repository root
+to stand in for the MicroPython modules that the frozen modules import.
+"""
+
+ROOT = Path(__file__).resolve().parent.parent
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import simulator
+from simulator.plasma import WS2812 as StubStrip
+
+__all__ = ["ROOT", "StubStrip", "install"]
+
+
+def install(virtual=False):
+    # The benchmarks time real work, so unless asked otherwise, sleeping really sleeps
+    return simulator.install(virtual)
@@ -0,0 +1,145 @@
+import asyncio
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import host
+
+host.install()
+
+import ezhttp
+from checks import check
+from httpcache import HTTPCache
+
+"""
+Check httpcache against a local stand-in for a polled API, which counts requests
+and full responses. Covers max-age freshness, 304 revalidation (with and without the 304
+repeating Cache-Control), changed content, reloading the cache from disk (as after a reboot)
+and get_async() with an ezhttp.Session.
+
+Run from the repository root with: python3 benchmarks/httpcache_check.py
+"""
+
+MAX_AGE = 1
+
+
+class Server(BaseHTTPRequestHandler):
+    body = b'{"field2": "#ff0000"}'
+    etag = '"v1"'
+    cache_control_on_304 = True
+    requests = 0
+    full_responses = 0
+
+    def do_GET(self):
+        Server.requests += 1
+        if self.headers.get("If-None-Match") == Server.etag:
+            self.send_response(304)
+            self.send_header("ETag", Server.etag)
+            if Server.cache_control_on_304:
+                self.send_header("Cache-Control", f"max-age={MAX_AGE}")
+            self.end_headers()
+            return
+        Server.full_responses += 1
+        self.send_response(200)
+        self.send_header("ETag", Server.etag)
+        self.send_header("Cache-Control", f"max-age={MAX_AGE}")
+        self.send_header("Content-Length", str(len(Server.body)))
+        self.end_headers()
+        self.wfile.write(Server.body)
+
+    def log_message(self, *args):
+        pass
+
+
+class Response:
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = dict(headers)
+        self.content = content
+
+    def close(self):
+        pass
+
+
+class UrllibSession:
+    # Just enough of the requests API for HTTPCache, using urllib
+    def get(self, url, headers=None):
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, headers=headers or {})) as r:
+                return Response(r.status, r.headers.items(), r.read())
+        except urllib.error.HTTPError as e:
+            return Response(e.code, e.headers.items(), e.read())
+
+
+async def check_async(url):
+    # The simulator swaps in pretend servers, so use asyncio's own connections for the real one
+    asyncio.open_connection = asyncio.streams.open_connection
+    session = ezhttp.Session()
+    cache = HTTPCache(session=session, persist=False)
+    ok = True
+    full_responses = Server.full_responses
+
+    r = await cache.get_async(url)
+    ok &= check("get_async() downloads the body", r.json()["field2"] == "#00ff00" and Server.full_responses == full_responses + 1)
+    r = await cache.get_async(url)
+    ok &= check("and serves it while fresh without a request", r.from_cache and cache.hits == 1)
+    await asyncio.sleep(MAX_AGE + 0.1)
+    r = await cache.get_async(url)
+    ok &= check("and revalidates it once stale", r.revalidated and r.json()["field2"] == "#00ff00" and Server.full_responses == full_responses + 1)
+
+    await session.close()
+    return ok
+
+
+def main():
+    server = HTTPServer(("127.0.0.1", 0), Server)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/channels/1417/field/2/last.json"
+
+    ok = True
+    with tempfile.TemporaryDirectory() as path:
+        cache = HTTPCache(path, session=UrllibSession())
+
+        r = cache.get(url)
+        ok &= check("first request downloads the body", r.json()["field2"] == "#ff0000" and Server.full_responses == 1)
+
+        r = cache.get(url)
+        ok &= check("fresh response is served without a request", r.from_cache and Server.requests == 1)
+
+        time.sleep(MAX_AGE + 0.1)
+        r = cache.get(url)
+        ok &= check("stale response is revalidated with a 304", r.revalidated and r.text == '{"field2": "#ff0000"}' and Server.full_responses == 1)
+
+        rebooted = HTTPCache(path, session=UrllibSession())
+        r = rebooted.get(url)
+        ok &= check("cache reloaded from disk is used without a request", r.from_cache and Server.requests == 2)
+
+        Server.body = b'{"field2": "#00ff00"}'
+        Server.etag = '"v2"'
+        time.sleep(MAX_AGE + 0.1)
+        r = rebooted.get(url)
+        ok &= check("changed content is downloaded again", r.json()["field2"] == "#00ff00" and Server.full_responses == 2)
+
+        # A 304 only has to send the headers that changed, so one without Cache-Control
+        # means the max-age stored with the response still stands
+        Server.cache_control_on_304 = False
+        time.sleep(MAX_AGE + 0.1)
+        r = rebooted.get(url)
+        ok &= check("a 304 without Cache-Control still revalidates", r.revalidated and Server.full_responses == 2)
+        r = rebooted.get(url)
+        ok &= check("and keeps the stored max-age, so the next poll needs no request", r.from_cache and Server.requests == 4)
+
+        print(f"{Server.requests} requests, {Server.full_responses} full responses for 7 polls")
+
+    ok &= asyncio.run(check_async(url))
+
+    server.shutdown()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import asyncio
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import host
+
+host.install()
+
+import ezhttp
+from checks import check
+from httpcache import HTTPCache
+from httppool import ConnectionPool
+
+"""
+Check httppool, and ezhttp's Session (its asyncio counterpart), against a local HTTP/1.1
+server that counts the TCP connections it accepts, including the server closing
+connections between requests.
+
+Run from the repository root with: python3 benchmarks/httppool_check.py
+"""
+
+POLLS = 20
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    connections = 0
+    closed = 0
+    requests = 0
+    close_next = False
+
+    def setup(self):
+        Handler.connections += 1
+        super().setup()
+
+    def finish(self):
+        super().finish()
+        Handler.closed += 1
+
+    def do_GET(self):
+        Handler.requests += 1
+        body = b'{"field2": "#800080"}'
+        if self.path == "/chunked":
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for chunk in (body[:7], body[7:]):
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.write(b"0\r\n\r\n")
+            return
+        if self.path == "/garbled":
+            self.wfile.write(b"HTTP/1.1 two-hundred OK\r\n\r\n")
+            return
+        if self.path == "/slow":
+            # Longer than the client waits, so it's gone by the time this finishes
+            time.sleep(0.5)
+            self.close_connection = True
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("ETag", '"purple"')
+        self.end_headers()
+        self.wfile.write(body)
+        if Handler.close_next:
+            # Close after responding, without saying so, as an idle timeout would
+            Handler.close_next = False
+            self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+async def check_session(base):
+    # The simulator swaps in pretend servers, so use asyncio's own connections for the real one
+    asyncio.open_connection = asyncio.streams.open_connection
+    session = ezhttp.Session()
+    ok = True
+    connections = Handler.connections
+
+    for _ in range(POLLS):
+        r = await session.get(base + "/channels/1417/field/2/last.json")
+        data = await r.json()
+    ok &= check(f"session: {POLLS} requests use one connection", data["field2"] == "#800080" and Handler.connections == connections + 1)
+
+    r = await session.get(base + "/last.json")
+    await r.reader.read(5)
+    await r.close()
+    r = await session.get(base + "/last.json")
+    ok &= check("session: a body left part read is skipped, keeping the connection", (await r.json())["field2"] == "#800080" and Handler.connections == connections + 1)
+
+    Handler.close_next = True
+    await (await session.get(base + "/last.json")).read()
+    await asyncio.sleep(0.1)
+    r = await session.get(base + "/last.json")
+    await r.read()
+    ok &= check("session: a connection closed by the server is replaced transparently", r.status == 200 and session.reconnects == 1 and Handler.connections == connections + 2)
+
+    r = await session.get(base + "/chunked")
+    chunks = []
+    while True:
+        chunk = await r.reader.read(4)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    await r.close()
+    ok &= check("session: chunked responses are read in full, and streamed", b"".join(chunks) == b'{"field2": "#800080"}' and session.stats()["open"] == 1)
+
+    closed = Handler.closed
+    try:
+        await session.get(base + "/garbled")
+        garbled = False
+    except ValueError:
+        garbled = True
+    await asyncio.sleep(0.1)
+    ok &= check("session: a connection with a garbled response is closed, not kept", garbled and Handler.closed == closed + 1 and session.stats()["open"] == 0)
+
+    try:
+        await session.get(base + "/slow", timeout=0.1)
+        timed_out = False
+    except asyncio.TimeoutError:
+        timed_out = True
+    r = await session.get(base + "/last.json", timeout=5)
+    await r.read()
+    ok &= check("session: a request can have its own timeout", timed_out and r.status == 200)
+
+    print(f"session: {session.stats()}")
+    await session.close()
+    return ok
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    pool = ConnectionPool()
+    ok = True
+
+    start = time.perf_counter()
+    for _ in range(POLLS):
+        r = pool.get(base + "/channels/1417/field/2/last.json")
+    pooled = time.perf_counter() - start
+    ok &= check(f"{POLLS} requests use one connection", r.json()["field2"] == "#800080" and Handler.connections == 1)
+
+    Handler.close_next = True
+    pool.get(base + "/last.json")
+    time.sleep(0.1)
+    r = pool.get(base + "/last.json")
+    ok &= check("a connection closed by the server is replaced transparently", r.status_code == 200 and pool.reconnects == 1 and Handler.connections == 2)
+
+    r = pool.get(base + "/chunked")
+    ok &= check("chunked responses are read in full", r.json()["field2"] == "#800080")
+
+    closed = Handler.closed
+    error = None
+    try:
+        pool.get(base + "/garbled")
+    except ValueError as e:
+        # Kept, so its traceback stops CPython tidying the connection away (MicroPython wouldn't promptly either)
+        error = e
+    time.sleep(0.1)
+    ok &= check("a connection with a garbled response is closed, not kept", error is not None and Handler.closed == closed + 1 and pool.stats()["open"] == 0)
+    ok &= check("the next request opens a new one", pool.get(base + "/last.json").status_code == 200)
+
+    try:
+        pool.get(base + "/slow", timeout=0.1)
+        timed_out = False
+    except OSError:
+        timed_out = True
+    ok &= check("a request can have its own timeout", timed_out and pool.get(base + "/last.json", timeout=5).status_code == 200)
+
+    cache = HTTPCache(session=pool, persist=False)
+    cache.get(base + "/last.json")
+    ok &= check("works as a session for httpcache", cache.get(base + "/last.json", timeout=5).status_code == 200)
+
+    fresh = ConnectionPool(max_idle_ms=0)
+    start = time.perf_counter()
+    for _ in range(POLLS):
+        fresh.get(base + "/last.json")
+        time.sleep(0.002)
+    unpooled = time.perf_counter() - start - POLLS * 0.002
+
+    print(f"{pool.stats()}")
+    print(f"{POLLS} polls: {pooled * 1000:.1f} ms reusing connections, {unpooled * 1000:.1f} ms with a new connection each time")
+
+    pool.close()
+    ok &= asyncio.run(check_session(base))
+    server.shutdown()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import sys
+import time
+
+import host
+
+clock = host.install(virtual=True)
+
+import machine
+from checks import check
+from pimoroni import IRQButton
+
+"""
+Check pimoroni.IRQButton against a simulated pin: that bouncing contacts make a single
+press and release, that a press between two polls isn't missed, and that holding the
+button gives one HOLD and REPEATs that speed up once it's held.
+
+Run from the repository root with: python3 benchmarks/irqbutton_check.py
+"""
+
+PIN = 12
+DEBOUNCE_MS = 20
+REPEAT_MS = 200
+HOLD_MS = 1000
+
+NAMES = {IRQButton.PRESS: "PRESS", IRQButton.RELEASE: "RELEASE", IRQButton.HOLD: "HOLD", IRQButton.REPEAT: "REPEAT"}
+
+
+def button(**kwargs):
+    machine.reset_state()
+    machine.set_pin(PIN, 1)   # not pressed: the pull-up holds the pin high
+    return IRQButton(PIN, repeat_time=kwargs.pop("repeat_time", REPEAT_MS), hold_time=HOLD_MS, debounce_ms=DEBOUNCE_MS, **kwargs)
+
+
+def events(b, start):
+    # Every event waiting, with how long after `start` it happened
+    taken = []
+    while True:
+        event = b.get()
+        if event == IRQButton.NONE:
+            return taken
+        taken.append((NAMES[event], b.event_time - start))
+
+
+def press(bounces=0, pressed=True):
+    # Move the pin, with some bounces of a millisecond each first
+    level = 0 if pressed else 1
+    for _ in range(bounces):
+        machine.set_pin(PIN, level)
+        clock.sleep_ms(1)
+        machine.set_pin(PIN, 1 - level)
+        clock.sleep_ms(1)
+    machine.set_pin(PIN, level)
+
+
+def check_debounce():
+    ok = True
+    b = button(repeat_time=0)
+    start = time.ticks_ms()
+    press(bounces=3)
+    clock.sleep_ms(100)
+    press(bounces=3, pressed=False)
+    clock.sleep_ms(100)
+    taken = events(b, start)
+    ok &= check("a bouncing press and release are one PRESS and one RELEASE", [name for name, _ in taken] == ["PRESS", "RELEASE"])
+    ok &= check("timestamped when the contacts first met and parted", taken == [("PRESS", 0), ("RELEASE", 106)])
+
+    # A release within debounce_ms of the press is taken for a bounce, leaving the button
+    # looking pressed after it's been let go, until the pin is checked again once it settles
+    start = time.ticks_ms()
+    press()
+    clock.sleep_ms(5)
+    press(pressed=False)
+    clock.sleep_ms(DEBOUNCE_MS)
+    ok &= check("a release during the debounce is seen once it settles", events(b, start) == [("PRESS", 0), ("RELEASE", DEBOUNCE_MS)])
+    return ok
+
+
+def check_missed():
+    ok = True
+    b = button()
+    b.read()
+    press()
+    clock.sleep_ms(50)
+    press(pressed=False)
+    clock.sleep_ms(500)
+    ok &= check("a 50ms press between two read()s is still seen", b.read() and not b.read())
+
+    b = button(size=4)
+    for _ in range(4):
+        press()
+        clock.sleep_ms(50)
+        press(pressed=False)
+        clock.sleep_ms(50)
+    ok &= check("edges that don't fit in the ring are counted as dropped", b.dropped == 5)
+    return ok
+
+
+def check_hold():
+    ok = True
+    b = button()
+    start = time.ticks_ms()
+    press()
+    clock.sleep_ms(1500)
+    taken = events(b, start)
+    repeats = [when for name, when in taken if name == "REPEAT"]
+    held = [when for name, when in taken if name == "HOLD"]
+    ok &= check("a long press is a PRESS first", taken[0] == ("PRESS", 0))
+    ok &= check("then one HOLD, hold_time after it", held == [HOLD_MS])
+    ok &= check(f"REPEATs every {REPEAT_MS}ms until then", repeats[:5] == [200, 400, 600, 800, 1000])
+    ok &= check(f"and every {REPEAT_MS // 3}ms once held", len(repeats) > 6 and all(repeats[i] - repeats[i - 1] == REPEAT_MS // 3 for i in range(6, len(repeats))))
+    ok &= check("every event in the order it happened", [when for _, when in taken] == sorted(when for _, when in taken))
+
+    press(pressed=False)
+    clock.sleep_ms(300)
+    ok &= check("letting go is a RELEASE, and the REPEATs stop", [name for name, _ in events(b, start)] == ["RELEASE"])
+
+    b = button()
+    start = time.ticks_ms()
+    press()
+    clock.sleep_ms(1100)
+    b.clear()
+    clock.sleep_ms(10)
+    ok &= check("clear() throws away the events waiting", events(b, start) == [])
+    return ok
+
+
+def main():
+    ok = check_debounce()
+    ok &= check_missed()
+    ok &= check_hold()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import io
+import json
+import time
+import tracemalloc
+from pathlib import Path
+
+import host
+
+host.install()
+
+from jsonstream import extract
+
+"""
+Compare peak memory use (and time) of reading a whole API response and parsing it
+with json.loads(), as the wireless examples used to, against pulling out just the
+values they need with jsonstream.extract().
+
+The sample responses in benchmarks/data/ follow the format of the Open-Meteo and
+Cheerlights (ThingSpeak) APIs.
+
+Run from the repository root with: python3 benchmarks/jsonstream.py
+"""
+
+DATA = Path(__file__).resolve().parent / "data"
+RUNS = 200
+
+CASES = (
+    ("open-meteo-current.json", ("current_weather.temperature", "current_weather.weathercode", "current_weather.time")),
+    ("open-meteo-hourly.json", ("current_weather.temperature", "current_weather.weathercode", "current_weather.time")),
+    ("cheerlights-last.json", ("field2",)),
+)
+
+
+def whole(body, paths):
+    j = json.loads(io.BytesIO(body).read())
+    values = {}
+    for path in paths:
+        value = j
+        for key in path.split("."):
+            value = value[key]
+        values[path] = value
+    return values
+
+
+def streamed(body, paths):
+    return extract(io.BytesIO(body), paths)
+
+
+def measure(function, body, paths):
+    tracemalloc.start()
+    result = function(body, paths)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        function(body, paths)
+    return result, peak, (time.perf_counter() - start) / RUNS * 1000
+
+
+def main():
+    print(f"{'response':<26} {'bytes':>6} {'json.loads peak':>16} {'extract peak':>13} {'json.loads ms':>14} {'extract ms':>11}")
+    for name, paths in CASES:
+        body = (DATA / name).read_bytes()
+        expected, whole_peak, whole_ms = measure(whole, body, paths)
+        result, stream_peak, stream_ms = measure(streamed, body, paths)
+        assert result == expected, (result, expected)
+        print(f"{name:<26} {len(body):>6} {whole_peak:>16} {stream_peak:>13} {whole_ms:>14.3f} {stream_ms:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
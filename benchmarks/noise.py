@@ -0,0 +1,63 @@
+import random
+import time
+
+import host
+
+host.install()
+
+from noise import Random, Sampler
+
+"""
+Compare rolling random.uniform() for every LED against the noise module: filling a
+buffer with Random.fill(), and picking a few LEDs with a Sampler.
+
+On a board the difference is bigger than here, as every float that random.uniform()
+returns has to be allocated (and later collected).
+
+Run from the repository root with: python3 benchmarks/noise.py
+"""
+
+FRAMES = 200
+LENGTHS = (50, 144, 300, 1000)
+CHANCE = 0.005
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        function(*args)
+    return (time.perf_counter() - start) / FRAMES * 1000
+
+
+def fill_uniform(buf):
+    for i in range(len(buf)):
+        buf[i] = int(random.uniform(0, 256))
+
+
+def pick_uniform(num_leds, hits):
+    count = 0
+    for i in range(num_leds):
+        if CHANCE > random.uniform(0, 1):
+            hits[count] = i
+            count += 1
+    return count
+
+
+def main():
+    rng = Random(1)
+    print(f"{'LEDs':>6} {'fill uniform':>13} {'fill xorshift':>14} {'pick uniform':>13} {'pick sampler':>13}  (ms per frame, {CHANCE} chance)")
+    for num_leds in LENGTHS:
+        buf = bytearray(num_leds)
+        sampler = Sampler(num_leds, CHANCE, rng)
+        print(f"{num_leds:>6}"
+              f" {timed(fill_uniform, buf):>13.3f}"
+              f" {timed(rng.fill, buf):>14.3f}"
+              f" {timed(pick_uniform, num_leds, sampler.hits):>13.3f}"
+              f" {timed(sampler.sample):>13.3f}")
+
+    hits = sum(sampler.sample() for _ in range(FRAMES))
+    print(f"Sampler picked {hits / FRAMES / num_leds:.4f} of {num_leds} LEDs per frame, for a chance of {CHANCE}")
+
+
+if __name__ == "__main__":
+    main()
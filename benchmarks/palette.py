@@ -0,0 +1,80 @@
+import math
+import time
+
+import host
+
+host.install()
+
+from framebuffer import FrameBuffer
+from palette import PaletteCache, hsv_ramp, hue_ramp
+
+"""
+Compare the per-frame cost of working out each LED's colour with HSV maths
+against looking it up in a precomputed 256 entry palette.
+
+Run from the repository root with: python3 benchmarks/palette.py
+"""
+
+FRAMES = 200
+LENGTHS = (50, 144, 300, 1000)
+HUE = 0.5
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        function(frame, *args)
+    return (time.perf_counter() - start) / FRAMES * 1000
+
+
+def pulse_set_hsv(frame, strip, num_leds):
+    # As in examples/pulse.py before palettes: the same colour, recalculated for every LED
+    v = (1 + math.sin(frame * 0.05)) / 2
+    for i in range(num_leds):
+        strip.set_hsv(i, HUE, 1.0, v)
+
+
+def pulse_palette(frame, fb, palette):
+    palette.fill(fb, (1 + math.sin(frame * 0.05)) * 127.5)
+    fb.push()
+
+
+def wave_set_hsv(frame, strip, num_leds):
+    # A different brightness on every LED
+    for i in range(num_leds):
+        strip.set_hsv(i, HUE, 1.0, (1 + math.sin(frame * 0.05 + i * 0.1)) / 2)
+
+
+def wave_palette(frame, fb, palette, indexes, num_leds):
+    for i in range(num_leds):
+        indexes[i] = int((1 + math.sin(frame * 0.05 + i * 0.1)) * 127.5)
+    palette.apply(fb, indexes)
+    fb.push()
+
+
+def main():
+    start = time.perf_counter()
+    palette = hue_ramp(HUE)
+    build = (time.perf_counter() - start) * 1000
+    print(f"Building one palette: {build:.3f} ms, {len(palette.colours)} bytes")
+
+    print(f"{'LEDs':>6} {'pulse hsv':>10} {'pulse lut':>10} {'wave hsv':>9} {'wave lut':>9}  (ms per frame)")
+    for num_leds in LENGTHS:
+        strip = host.StubStrip(num_leds)
+        fb = FrameBuffer(num_leds)
+        fb.ws2812()
+        indexes = bytearray(num_leds)
+        print(f"{num_leds:>6}"
+              f" {timed(pulse_set_hsv, strip, num_leds):>10.3f}"
+              f" {timed(pulse_palette, fb, palette):>10.3f}"
+              f" {timed(wave_set_hsv, strip, num_leds):>9.3f}"
+              f" {timed(wave_palette, fb, palette, indexes, num_leds):>9.3f}")
+
+    cache = PaletteCache(max_palettes=4)
+    for hue in range(12):
+        cache.get(hue % 6, hsv_ramp, hue / 12, (hue + 1) / 12)
+    print(f"Cache of 4 palettes, 12 requests for 6 keys: {cache.hits} hits, {cache.misses} misses, {cache.evictions} evictions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import time
+
+import host
+
+host.install()
+
+from framebuffer import FrameBuffer
+from power import Governor
+
+"""
+Time how long power.Governor takes to estimate a frame's current draw and work out how much
+to dim it, against the 16.7ms a frame has at 60 FPS. Also shows how much a full white frame
+is dimmed to keep within LIMIT_MA.
+
+Run from the repository root with: python3 benchmarks/power.py
+"""
+
+FRAMES = 200
+LENGTHS = (50, 144, 300, 1000)
+LIMIT_MA = 2000
+
+
+def timed(function):
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        function()
+    return (time.perf_counter() - start) / FRAMES * 1000
+
+
+def main():
+    print(f"{'LEDs':>6} {'update ms':>10} {'push ms':>8} {'white mA':>9} {'scale':>6}  (limit {LIMIT_MA} mA)")
+    for num_leds in LENGTHS:
+        fb = FrameBuffer(num_leds)
+        fb.ws2812()
+        governor = Governor(fb, LIMIT_MA)
+        fb.fill(255, 255, 255)
+        update_ms = timed(governor.update)
+        push_ms = timed(fb.push)
+        print(f"{num_leds:>6} {update_ms:>10.3f} {push_ms:>8.3f} {governor.estimate():>9} {governor.scale:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import sys
+
+import host
+
+host.install(virtual=True)
+
+import machine
+from checks import check
+from qwstpad import QwSTPad, QwSTPadGroup
+
+"""
+Check QwSTPad and QwSTPadGroup against simulated TCA9555 I/O expanders, with and without
+their INT pins wired up: how many polls are answered without touching the bus, that a
+press between polls is still read, and how many writes the LEDs cost.
+
+Run from the repository root with: python3 benchmarks/qwstpad_check.py
+"""
+
+POLLS = 100
+INT_PIN = 3
+SHARED_INT_PIN = 4
+
+A = 1 << QwSTPad.BUTTON_MAPPING["A"]
+X = 1 << QwSTPad.BUTTON_MAPPING["X"]
+
+
+def idle(i2c, pad, polls=POLLS):
+    # Poll with nothing changing, returning how many of the polls read the pad
+    before = i2c.transactions
+    for _ in range(polls):
+        pad.poll()
+    return i2c.transactions - before
+
+
+def check_pad(i2c):
+    ok = True
+    machine.reset_state()
+    chip = machine.add_i2c_device(0x21, machine.TCA9555())
+    pad = QwSTPad(i2c, show_address=False)
+    polled = idle(i2c, pad)
+    ok &= check(f"without INT, {POLLS} polls read the pad {POLLS} times", polled == POLLS and pad.reads_avoided == 0)
+
+    machine.reset_state()
+    chip = machine.add_i2c_device(0x21, machine.TCA9555(interrupt=INT_PIN))
+    pad = QwSTPad(i2c, show_address=False, interrupt=INT_PIN)
+    ok &= check("the first poll reads, in case a button is already held", idle(i2c, pad, 1) == 1)
+    polled = idle(i2c, pad)
+    ok &= check(f"with INT, {POLLS} quiet polls don't read at all", polled == 0 and pad.reads_avoided == POLLS)
+
+    chip.set_inputs(A)
+    reads = chip.reads
+    changed = pad.poll()
+    ok &= check("a press pulls INT low, and the next poll reads it", chip.reads == reads + 1 and changed == A)
+    ok &= check("pressed and released masks", pad.pressed == A and pad.released == 0 and pad.state == A)
+    ok &= check("events() gives the press", list(pad.events()) == [("A", True)])
+    ok &= check("read_buttons() agrees", pad.read_buttons()["A"] and idle(i2c, pad) == 0)
+
+    chip.set_inputs(0)
+    pad.poll()
+    ok &= check("the release is read too", pad.pressed == 0 and pad.released == A and list(pad.events()) == [("A", False)])
+
+    # A press and release between polls: the chip lets go of INT by itself once the input is
+    # back as it was last read, so only the falling edge the IRQ saw is left to go on
+    chip.set_inputs(A)
+    chip.set_inputs(0)
+    machine.set_pin(INT_PIN, 1)
+    reads = chip.reads
+    pad.poll()
+    ok &= check("a quick press and release still makes the next poll read", chip.reads == reads + 1 and idle(i2c, pad) == 0)
+    return ok
+
+
+def check_group(i2c):
+    ok = True
+    machine.reset_state()
+    first = machine.add_i2c_device(0x21, machine.TCA9555(interrupt=SHARED_INT_PIN))
+    second = machine.add_i2c_device(0x23, machine.TCA9555(interrupt=SHARED_INT_PIN))
+    pads = QwSTPadGroup(i2c, show_address=False, interrupt=SHARED_INT_PIN)
+    ok &= check("the group finds both pads", len(pads) == 2)
+
+    pads.poll()
+    before = i2c.transactions
+    for _ in range(POLLS):
+        pads.poll()
+    ok &= check(f"{POLLS} quiet polls of the group don't read either pad", i2c.transactions == before and pads.reads_avoided == 2 * POLLS)
+
+    second.set_inputs(X)
+    reads = first.reads + second.reads
+    changed = pads.poll()
+    ok &= check("a press on the shared INT line reads every pad", first.reads + second.reads == reads + 2)
+    ok &= check("and only the pad that changed reports it", changed == 0b10 and list(pads.events()) == [(1, "X", True)])
+    ok &= check("the other pad's masks are clear", pads[0].changed == 0 and pads[0].pressed == 0)
+    return ok
+
+
+def check_leds(i2c):
+    ok = True
+    machine.reset_state()
+    chip = machine.add_i2c_device(0x21, machine.TCA9555())
+    pad = QwSTPad(i2c, show_address=False)
+
+    writes = chip.writes
+    pad.set_leds(0b0101)
+    pad.set_leds(0b0101)
+    pad.set_led(1, True)
+    ok &= check("setting LEDs to what they already are doesn't write", chip.writes == writes + 1 and pad.writes_avoided == 2)
+
+    writes = chip.writes
+    pad.begin()
+    for led in range(1, 5):
+        pad.set_led(led, led % 2 == 0)
+    pad.commit()
+    off = (1 << QwSTPad.LED_MAPPING[0]) | (1 << QwSTPad.LED_MAPPING[2])   # an LED lights when its bit is low
+    ok &= check("four LED changes between begin() and commit() are one write", chip.writes == writes + 1)
+    ok &= check("what's written lights the right LEDs", chip.registers[2] | (chip.registers[3] << 8) == off)
+
+    writes = chip.writes
+    pad.begin()
+    pad.begin()
+    pad.set_led(1, True)
+    pad.commit()
+    held = chip.writes == writes
+    pad.commit()
+    ok &= check("nested begin()s write at the last commit()", held and chip.writes == writes + 1)
+    return ok
+
+
+def main():
+    i2c = machine.I2C()
+    ok = check_pad(i2c)
+    ok &= check_group(i2c)
+    ok &= check_leds(i2c)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import sys
+import time
+
+import host
+
+host.install()
+
+import ezhttp
+from runtime import Runtime
+
+from simulator import network
+
+"""
+Check that a Runtime keeps animating on time while slow web requests are in flight.
+
+The simulator's network stands in for the internet, with a server that takes FETCH_DELAY_MS
+to respond. Two requests are made through an ezhttp.Session, the second reusing the first's
+connection, and the render task must keep to its frame rate throughout.
+
+Run from the repository root with: python3 benchmarks/runtime_cadence.py
+"""
+
+FPS = 60
+FETCH_DELAY_MS = 1000
+FETCHES = 2
+MAX_GAP_MS = 2 * 1000 // FPS
+HOST = "api.example.com"
+BODY = b'{"current_weather": {"temperature": 12.5, "weathercode": 3, "time": "2024-01-01T12:00"}}'
+
+
+def main():
+    network.serve(HOST, BODY, delay_ms=FETCH_DELAY_MS)
+
+    runtime = Runtime()
+    session = ezhttp.Session()
+    frame_times = []
+    result = {"fetch_ms": 0, "fetches": 0}
+
+    def effect(_frame):
+        frame_times.append(time.ticks_ms())
+        time.sleep(0.002)  # a little rendering work
+
+    async def fetch():
+        start = time.ticks_ms()
+        response = await session.get(f"http://{HOST}/v1/forecast")
+        result.update(await response.json())
+        result["fetch_ms"] += time.ticks_diff(time.ticks_ms(), start)
+        result["fetches"] += 1
+        if result["fetches"] == FETCHES:
+            runtime.stop()
+
+    scheduler = runtime.render(effect, FPS)
+    runtime.every(FETCH_DELAY_MS + 100, fetch)
+    runtime.run()
+
+    gaps = [frame_times[i] - frame_times[i - 1] for i in range(1, len(frame_times))]
+    expected = result["fetch_ms"] * FPS // 1000
+    stats = scheduler.stats()
+    print(f"{FETCHES} fetches took {result['fetch_ms']} ms, temperature {result['current_weather']['temperature']}")
+    print(f"{len(frame_times)} frames rendered (expected at least ~{expected}), longest gap {max(gaps)} ms, {stats['dropped']} dropped")
+    print(f"{network.connections} connection(s) opened, {session.stats()}")
+
+    ok = True
+    if max(gaps) > MAX_GAP_MS or len(frame_times) < expected * 0.9:
+        print("FAIL: frame cadence was not maintained during the fetches")
+        ok = False
+    if network.connections != 1 or session.reused != FETCHES - 1:
+        print("FAIL: the session didn't reuse its connection")
+        ok = False
+    if not ok:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
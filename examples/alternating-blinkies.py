@@ -1,5 +1,7 @@
 import time
 
+from framebuffer import FrameBuffer
+
 import plasma
 
 """
@@ -20,23 +22,24 @@ BRIGHTNESS = 0.5
 SPEED = 1
 
 # WS2812 / NeoPixel™ LEDs
-led_strip = plasma.WS2812(NUM_LEDS, color_order=plasma.COLOR_ORDER_RGB)
-
-# Start updating the LED strip
-led_strip.start()
+fb = FrameBuffer(NUM_LEDS, color_order=plasma.COLOR_ORDER_RGB)
+led_strip = fb.ws2812()
+
+# The strip isn't start()ed, fb.update() sends it a frame only when the colours change
+
+# Work out both patterns once, up front
+patterns = [FrameBuffer(NUM_LEDS, color_order=plasma.COLOR_ORDER_RGB) for _ in range(2)]
+for i in range(NUM_LEDS):
+    # the if statements below use a modulo operation to identify the even and odd numbered LEDs
+    if (i % 2) == 0:
+        patterns[0].set_hsv(i, HUE_1 / 360, 1.0, BRIGHTNESS)
+        patterns[1].set_hsv(i, HUE_2 / 360, 1.0, BRIGHTNESS)
+    else:
+        patterns[0].set_hsv(i, HUE_2 / 360, 1.0, BRIGHTNESS)
+        patterns[1].set_hsv(i, HUE_1 / 360, 1.0, BRIGHTNESS)
 
 while True:
-    for i in range(NUM_LEDS):
-        # the if statements below use a modulo operation to identify the even and odd numbered LEDs
-        if (i % 2) == 0:
-            led_strip.set_hsv(i, HUE_1 / 360, 1.0, BRIGHTNESS)
-        else:
-            led_strip.set_hsv(i, HUE_2 / 360, 1.0, BRIGHTNESS)
-    time.sleep(SPEED)
-
-    for i in range(NUM_LEDS):
-        if (i % 2) == 0:
-            led_strip.set_hsv(i, HUE_2 / 360, 1.0, BRIGHTNESS)
-        else:
-            led_strip.set_hsv(i, HUE_1 / 360, 1.0, BRIGHTNESS)
-    time.sleep(SPEED)
+    for pattern in patterns:
+        fb.copy(pattern)
+        fb.update()
+        time.sleep(SPEED)
@@ -1,8 +1,12 @@
+import asyncio
 import time
 
-import urequests
+import ezhttp
 from ezwifi import connect
+from framebuffer import FrameBuffer
+from jsonstream import extract_async
 from machine import Pin
+from runtime import Runtime
 
 import plasma
 
@@ -20,6 +24,12 @@ NUM_LEDS = 50
 # Set the brightness
 BRIGHTNESS = 0.5
 
+# How many times the LEDs will be updated per second
+UPDATES = 30
+
+# How quickly to fade to a new colour (bigger = faster, up to 1.0)
+FADE_SPEED = 0.1
+
 
 # if no wifi connection, you get spooky rainbows. Bwahahaha!
 def wifi_failed(message=""):
@@ -65,49 +75,69 @@ def hex_to_rgb(hex):
     return r, g, b
 
 
-# set up the Pico W's onboard LED
-pico_led = Pin("LED", Pin.OUT)
-
-# set up the WS2812 / NeoPixel™ LEDs
-led_strip = plasma.WS2812(NUM_LEDS, color_order=plasma.COLOR_ORDER_RGB)
-
-# start updating the LED strip
-led_strip.start()
-
-# set up wifi
-try:
-    connect(failed=wifi_failed, info=wifi_message, warning=wifi_message, error=wifi_message)
-except ValueError as e:
-    wifi_failed(e)
-
-while True:
-    # open the json file
+async def get_colour():
+    # this runs alongside the fade animation, which carries on while we wait for the server
+    global target
     print(f"Requesting URL: {URL}")
-    r = urequests.get(URL)
-    # open the json data
-    j = r.json()
+    try:
+        r = await session.get(URL)
+        try:
+            # read just the colour from the json data, as it arrives
+            j = await extract_async(r.reader, ("field2",))
+        finally:
+            # hand the connection back for next time (or close it, if the data couldn't be read)
+            await r.close()
+    except (OSError, ValueError, KeyError, asyncio.TimeoutError) as e:
+        print(f"Request failed: {e}")
+        return
     print("Data obtained!")
-    r.close()
 
     # flash the onboard LED after getting data
     pico_led.value(True)
-    time.sleep(0.2)
+    await asyncio.sleep_ms(200)
     pico_led.value(False)
 
     # extract hex colour from the data
     hex = j["field2"]
 
-    # and convert it to RGB
-    r, g, b = hex_to_rgb(hex)
+    # convert it to RGB and adjust the brightness
+    target = [i * BRIGHTNESS for i in hex_to_rgb(hex)]
+    print(f"LEDs fading to {hex}")
+
 
-    # adjust the brightness
-    r, g, b = (int(i * BRIGHTNESS) for i in (r, g, b))
+def fade(_frame):
+    # move the current colour a little closer to the target colour, and light up the LEDs
+    for c in range(3):
+        current[c] += (target[c] - current[c]) * FADE_SPEED
+    fb.fill(int(current[0]), int(current[1]), int(current[2]))
+    fb.push()
 
-    # light up the LEDs
-    for i in range(NUM_LEDS):
-        led_strip.set_rgb(i, r, g, b)
-    print(f"LEDs set to {hex}")
 
-    # sleep
-    print(f"Sleeping for {UPDATE_INTERVAL} seconds.")
-    time.sleep(UPDATE_INTERVAL)
+# keeps the connection to the server open between requests, so each one doesn't have to start over
+session = ezhttp.Session()
+
+# the colour currently shown, and the colour we're fading to
+current = [0.0, 0.0, 0.0]
+target = [0.0, 0.0, 0.0]
+
+# set up the Pico W's onboard LED
+pico_led = Pin("LED", Pin.OUT)
+
+# set up the WS2812 / NeoPixel™ LEDs, drawn through a frame buffer
+fb = FrameBuffer(NUM_LEDS, color_order=plasma.COLOR_ORDER_RGB)
+led_strip = fb.ws2812()
+
+# start updating the LED strip
+led_strip.start()
+
+# set up wifi
+try:
+    connect(failed=wifi_failed, info=wifi_message, warning=wifi_message, error=wifi_message)
+except ValueError as e:
+    wifi_failed(e)
+
+# keep fading, and check for a new colour every UPDATE_INTERVAL, both at the same time
+runtime = Runtime()
+runtime.render(fade, UPDATES)
+runtime.every(UPDATE_INTERVAL * 1000, get_colour)
+runtime.run()
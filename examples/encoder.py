@@ -1,5 +1,6 @@
 import machine
 from breakout_encoder import BreakoutEncoder
+from colourmath import hsv_to_rgb
 
 import plasma
 
@@ -20,30 +21,6 @@ enc.set_brightness(1.0)
 # enc.set_direction(BreakoutEncoder.DIRECTION_CCW)     # Uncomment this to flip the direction
 
 
-def hsv_to_rgb(h, s, v):
-    # From CPython Lib/colorsys.py
-    if s == 0.0:
-        return v, v, v
-    i = int(h * 6.0)
-    f = (h * 6.0) - i
-    p = v * (1.0 - s)
-    q = v * (1.0 - s * f)
-    t = v * (1.0 - s * (1.0 - f))
-    i = i % 6
-    if i == 0:
-        return v, t, p
-    if i == 1:
-        return q, v, p
-    if i == 2:
-        return p, v, t
-    if i == 3:
-        return p, q, v
-    if i == 4:
-        return t, p, v
-    # if i == 5:
-    return v, p, q
-
-
 def count_changed(count):
     print("Count: ", count, sep="")
     h = ((count % STEPS_PER_REV) * 360.0) / STEPS_PER_REV     # Convert the count to a colour hue
@@ -1,5 +1,6 @@
 import time
-from random import random, uniform
+
+from noise import Random
 
 import plasma
 
@@ -16,8 +17,16 @@ led_strip = plasma.WS2812(NUM_LEDS, color_order=plasma.COLOR_ORDER_RGB)
 # Start updating the LED strip
 led_strip.start()
 
+# A fast random number generator, and somewhere to put a frame's worth of random numbers
+rng = Random()
+heat = bytearray(NUM_LEDS)
+brightness = bytearray(NUM_LEDS)
+
 while True:
     # fire effect! Random red/orange hue, full saturation, random brightness
+    rng.fill(heat, 0, 213)  # how much green to mix in with the red, from red (0) to orange (50°, 212)
+    rng.fill(brightness)
     for i in range(NUM_LEDS):
-        led_strip.set_hsv(i, uniform(0.0, 50 / 360), 1.0, random())
+        v = brightness[i]
+        led_strip.set_rgb(i, v, (heat[i] * v) >> 8, 0)
     time.sleep(0.1)
@@ -4,6 +4,7 @@ import time
 import machine
 from breakout_encoder_wheel import CENTRE, BreakoutEncoderWheel
 from pimoroni import RGBLED
+from wave import SINE, TURN, table
 
 import plasma
 
@@ -59,14 +60,28 @@ wheel_pressed = False
 if led:
     led.set_rgb(*colours[mode])
 
+# Waves are looked up in tables, and go round once every TURN (65536) steps of their phase.
+# The brightness is a sine wave shifted up by a half, and clipped to between 0 and 1
+twinkle = table(lambda x: 0.5 + math.sin(x * 2 * math.pi))
+
+# Where each LED sits along the waves, once round for the whole strip
+positions = [i * TURN // NUM_LEDS for i in range(NUM_LEDS)]
+
+last = time.ticks_ms()
+t = 0  # phase of the waves, in 1/1000ths
+
 while True:
     hue, spread, brightness, speed = values
-    hue /= 360
-    spread /= 100
-    brightness /= 100
+    hue = hue * TURN // 360
+    spread = spread * TURN // 100
+    brightness /= 100 * 255
     speed /= 100
 
-    t = time.ticks_ms() / 100 / (2 * math.pi) * speed
+    # The waves move on speed / (100 * 2 * pi) radians every millisecond
+    now = time.ticks_ms()
+    t = (t + int(time.ticks_diff(now, last) * speed * TURN * 1000 / (400 * math.pi * math.pi))) % (TURN * 1000)
+    last = now
+    phase = t // 1000
 
     if wheel.pressed(CENTRE) and not wheel_pressed:
         mode = (mode + 1) % len(modes)
@@ -84,19 +99,19 @@ while True:
         print(f"{modes[mode]:10}: {values[mode]:3d} / {360 if mode == 0 else 100}")
         wheel.zero()
 
-    hue_phase = 1000 * speed
+    # 1000 * speed radians ahead of the brightness
+    hue_phase = phase + int(1000 * speed / (2 * math.pi) * TURN)
 
     for i in range(NUM_LEDS):
-        position = i / NUM_LEDS
-        br = 0.5 + math.sin(t + (position * 2 * math.pi))
-        br = min(1.0, max(0, br))
-        br *= brightness
-        hue_offset = math.sin(t + hue_phase + (position * 2 * math.pi)) / 20
-        hue_offset += spread * (i / NUM_LEDS)
+        position = positions[i]
+        br = twinkle[((phase + position) >> 8) & 0xFF] * brightness
+        # Wobble the hue by up to 1/20th of a turn either way
+        hue_offset = (SINE[((hue_phase + position) >> 8) & 0xFF] - 128) * TURN // (127 * 20)
+        hue_offset += spread * i // NUM_LEDS
         hue_offset += hue
-        hue_offset %= 1.0
+        hue_offset &= 0xFFFF
 
-        led_strip.set_hsv(i, hue_offset, 1.0, 0.1 if mode == 3 else br)
+        led_strip.set_hsv(i, hue_offset / TURN, 1.0, 0.1 if mode == 3 else br)
 
     # Approximately 120fps
     time.sleep(1.0 / 120)
@@ -1,10 +1,11 @@
 import math
 import random
-import time
 
 import machine
 from breakout_msa301 import BreakoutMSA301
-from pimoroni import RGBLED, Button
+from pimoroni import RGBLED, IRQButton
+from scheduler import Scheduler
+from segment import Segment
 
 import plasma
 
@@ -64,12 +65,17 @@ led_strip = plasma.APA102(NUM_LEDS)
 # WS2812 / NeoPixel™ LEDs
 # led_strip = plasma.WS2812(NUM_LEDS)
 
-user_sw = Button("USER_SW", repeat_time=0)
-button_a = Button("BUTTON_A", repeat_time=0)
+# The game is drawn into a segment of the strip, which can be all of it, part of it
+# (eg: Segment(led_strip, 10, 40)) or run backwards (reverse=True)
+level = Segment(led_strip, 0, NUM_LEDS)
+
+# The buttons are watched by interrupts, so a press between frames isn't missed
+user_sw = IRQButton("USER_SW", repeat_time=0)
+button_a = IRQButton("BUTTON_A", repeat_time=0)
 
 try:
     # Button B is only available on Plasma 2040
-    button_b = Button("BUTTON_B", repeat_time=0)
+    button_b = IRQButton("BUTTON_B", repeat_time=0)
 except ValueError:
     button_b = None
 
@@ -96,8 +102,8 @@ def colour_band(centre_position, width, goal_position, goal_width, hue):
         goal_pixels_start = goal_position - (goal_width / 2)
         goal_pixels_end = goal_position + (goal_width / 2)
 
-        # Go through each led in the strip
-        for i in range(NUM_LEDS):
+        # Go through each led in the segment
+        for i in range(len(level)):
             # Set saturation and brightness values for if the led is inside or outside of the goal
             saturation = BAND_SATURATION
             brightness = 0.0
@@ -109,24 +115,24 @@ def colour_band(centre_position, width, goal_position, goal_width, hue):
             if i2 <= band_pixels_end:
                 if i2 <= band_pixels_start:
                     # Outside of the band
-                    led_strip.set_hsv(i, hue, 0.0, brightness)
+                    level.set_hsv(i, hue, 0.0, brightness)
                 elif i <= band_pixels_start:
                     # Transition into the band
                     val = map(band_pixels_start, float(i), float(i2), BAND_BRIGHTNESS, brightness)
                     sat = map(band_pixels_start, float(i), float(i2), BAND_SATURATION, saturation)
-                    led_strip.set_hsv(i, hue, sat, val)
+                    level.set_hsv(i, hue, sat, val)
                 else:
                     # Inside the band
-                    led_strip.set_hsv(i, hue, 1.0, 1.0)
+                    level.set_hsv(i, hue, 1.0, 1.0)
 
             elif i <= band_pixels_end:
                 # Transition out of the band
                 val = map(band_pixels_end, float(i), float(i2), brightness, BAND_BRIGHTNESS)
                 sat = map(band_pixels_end, float(i), float(i2), saturation, BAND_SATURATION)
-                led_strip.set_hsv(i, hue, sat, val)
+                level.set_hsv(i, hue, sat, val)
             else:
                 # Outside of the band
-                led_strip.set_hsv(i, hue, 0.0, brightness)
+                level.set_hsv(i, hue, 0.0, brightness)
 
 
 mode = ANGLE
@@ -139,6 +145,8 @@ game_mode = False
 # Start updating the LED strip
 led_strip.start()
 
+scheduler = Scheduler(UPDATES)
+
 while True:
     # Read the x and y axes of the accelerometer
     x = msa.get_x_axis()
@@ -172,8 +180,8 @@ while True:
         hue = map(position_diff, 0.0, 1.0, VELOCITY_MODE_GOAL_HUE, VELOCITY_MODE_EDGE_HUE)
 
     # Convert the band and goal positions to positions on the LED strip
-    strip_band_position = map(band_position, -1.0, 1.0, 0.0, float(NUM_LEDS))
-    strip_goal_position = map(goal_position, -1.0, 1.0, 0.0, float(NUM_LEDS))
+    strip_band_position = level.position(band_position, -1.0, 1.0)
+    strip_goal_position = level.position(goal_position, -1.0, 1.0)
 
     # Draw the band and goal
     colour_band(strip_band_position, BAND_PIXEL_WIDTH, strip_goal_position, GOAL_PIXEL_WIDTH, hue)
@@ -213,4 +221,4 @@ while True:
         if above_lower and below_upper:
             goal_position = random.uniform(-1.0, 1.0)
 
-    time.sleep(1.0 / UPDATES)
+    scheduler.wait()
@@ -1,6 +1,8 @@
-import machine
 from breakout_bme68x import BreakoutBME68X
+from i2cbus import I2CBus
 from pimoroni import RGBLED, Button
+from scheduler import Scheduler
+from segment import Segment
 
 import plasma
 
@@ -56,8 +58,11 @@ button_a = Button("BUTTON_A", repeat_time=0)
 led = RGBLED("LED_R", "LED_G", "LED_B")
 
 
-i2c = machine.I2C()
-bme = BreakoutBME68X(i2c)
+bus = I2CBus()
+bme = BreakoutBME68X(bus.i2c)
+
+# Read the sensor once a second, rather than every time around the loop, and keep the reading
+sensor = bus.add("bme", bme.read, 1000)
 
 
 ALL, TEMPERATURE, PRESSURE, HUMIDITY = range(4)
@@ -68,10 +73,10 @@ def map(x, in_min, in_max, out_min, out_max):
     return (x - in_min) * (out_max - out_min) / (in_max - in_min) + out_min
 
 
-# Sets a section of the led strip to show a hue gradient based on the provided percent
-def colour_gauge(percent, start_led, end_led, start_hue, end_hue):
-    if end_led > start_led:
-        length = end_led - start_led
+# Sets a segment of the led strip to show a hue gradient based on the provided percent
+def colour_gauge(percent, segment, start_hue, end_hue):
+    length = len(segment)
+    if length > 0:
         light_pixels = percent * float(length)
 
         for i in range(length):
@@ -79,48 +84,54 @@ def colour_gauge(percent, start_led, end_led, start_hue, end_hue):
 
             i2 = i + 1
             if i2 <= light_pixels:
-                led_strip.set_hsv(i + start_led, h, 1.0, 1.0)
+                segment.set_hsv(i, h, 1.0, 1.0)
             elif i <= light_pixels:
                 scale = map(light_pixels, float(i), float(i2), 0.0, 1.0)
-                led_strip.set_hsv(i + start_led, h, 1.0, scale)
+                segment.set_hsv(i, h, 1.0, scale)
             else:
-                led_strip.set_hsv(i + start_led, 0.0, 0.0, 0.0)
+                segment.set_hsv(i, 0.0, 0.0, 0.0)
 
 
-first_third = int(NUM_LEDS / 3)
-second_third = int((NUM_LEDS * 2) / 3)
+# The whole strip, and the strip split into thirds for showing all three readings at once
+whole = Segment(led_strip, end=NUM_LEDS)
+temperature_third, pressure_third, humidity_third = whole.split(3)
 
 mode = ALL
 
 # Start updating the LED strip
 led_strip.start()
 
+# Keeps the loop running at UPDATES frames per second, rather than as fast as it can
+scheduler = Scheduler(UPDATES)
+
 while True:
-    temperature, pressure, humidity, _, _, _, _ = bme.read()
-    print("{:0.2f}c, {:0.2f}Pa, {:0.2f}%".format(
-        temperature, pressure, humidity))
+    bus.poll()
+    temperature, pressure, humidity, _, _, _, _ = sensor.value
+    if sensor.fresh:
+        print("{:0.2f}c, {:0.2f}Pa, {:0.2f}%".format(
+            temperature, pressure, humidity))
 
     if mode == ALL:
         t = map(temperature, TEMPERATURE_C_MIN, TEMPERATURE_C_MAX, 0.0, 1.0)
-        colour_gauge(t, 0, first_third, TEMPERATURE_HUE_START, TEMPERATURE_HUE_END)
+        colour_gauge(t, temperature_third, TEMPERATURE_HUE_START, TEMPERATURE_HUE_END)
 
         t = map(pressure, PRESSURE_PA_MIN, PRESSURE_PA_MAX, 0.0, 1.0)
-        colour_gauge(t, first_third, second_third, PRESSURE_HUE_START, PRESSURE_HUE_END)
+        colour_gauge(t, pressure_third, PRESSURE_HUE_START, PRESSURE_HUE_END)
 
         t = map(humidity, HUMIDITY_MIN, HUMIDITY_MAX, 0.0, 1.0)
-        colour_gauge(t, second_third, NUM_LEDS, HUMIDITY_HUE_START, HUMIDITY_HUE_END)
+        colour_gauge(t, humidity_third, HUMIDITY_HUE_START, HUMIDITY_HUE_END)
 
     elif mode == TEMPERATURE:
         t = map(temperature, TEMPERATURE_C_MIN, TEMPERATURE_C_MAX, 0.0, 1.0)
-        colour_gauge(t, 0, NUM_LEDS, TEMPERATURE_HUE_START, TEMPERATURE_HUE_END)
+        colour_gauge(t, whole, TEMPERATURE_HUE_START, TEMPERATURE_HUE_END)
 
     elif mode == PRESSURE:
         t = map(pressure, PRESSURE_PA_MIN, PRESSURE_PA_MAX, 0.0, 1.0)
-        colour_gauge(t, 0, NUM_LEDS, PRESSURE_HUE_START, PRESSURE_HUE_END)
+        colour_gauge(t, whole, PRESSURE_HUE_START, PRESSURE_HUE_END)
 
     elif mode == HUMIDITY:
         t = map(humidity, HUMIDITY_MIN, HUMIDITY_MAX, 0.0, 1.0)
-        colour_gauge(t, 0, NUM_LEDS, HUMIDITY_HUE_START, HUMIDITY_HUE_END)
+        colour_gauge(t, whole, HUMIDITY_HUE_START, HUMIDITY_HUE_END)
 
     a_pressed = button_a.read()
     b_pressed = user_sw.read()
@@ -152,3 +163,5 @@ while True:
             mode = ALL
         elif b_pressed:
             mode = PRESSURE
+
+    scheduler.wait()
@@ -0,0 +1,50 @@
+import colourmath
+from scheduler import Scheduler
+from strips import Strips
+
+import plasma
+
+"""
+Run one rainbow along several LED strips, connected to different pins.
+Each strip gets its own PIO state machine, and they're all updated together.
+"""
+
+# Describe your strips here - how many LEDs, and which pin each is connected to
+STRIPS = [
+    {"kind": "ws2812", "num_leds": 50, "dat": 15, "color_order": plasma.COLOR_ORDER_RGB},
+    {"kind": "ws2812", "num_leds": 50, "dat": 14, "color_order": plasma.COLOR_ORDER_RGB},
+    # {"kind": "apa102", "num_leds": 60, "dat": 12, "clk": 13},
+]
+
+# The SPEED that the LEDs cycle at (1 - 255)
+SPEED = 20
+
+# How many times the LEDs will be updated per second
+UPDATES = 60
+
+# Set up every strip, each drawn through its own frame buffer
+strips = Strips(STRIPS)
+
+# The hue of each LED, counting along all of the strips in turn, before the offset is added
+hues = []
+for n, fb in enumerate(strips):
+    start = strips.starts[n]
+    hues.append(colourmath.array([(start + i) / len(strips) for i in range(fb.num_leds)]))
+
+# Keeps the loop running at UPDATES frames per second, however long each frame takes to draw
+scheduler = Scheduler(UPDATES)
+
+offset = 0.0
+
+while True:
+    offset += SPEED / 2000.0
+    offset %= 1
+
+    # Draw every strip...
+    for i, fb in enumerate(strips):
+        colourmath.fill_hsv(fb, hues[i], 1.0, 1.0, h_offset=offset * 2)
+
+    # ...then send them all out together
+    strips.show()
+
+    scheduler.wait()
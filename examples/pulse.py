@@ -1,4 +1,7 @@
-from math import sin
+from framebuffer import FrameBuffer
+from palette import hue_ramp
+from scheduler import Scheduler
+from wave import sine
 
 import plasma
 
@@ -13,27 +16,42 @@ NUM_LEDS = 50
 # to convert a hue that's in degrees, divide it by 360
 COLOUR = 0.5
 
-# set up the WS2812 / NeoPixel™ LEDs
-led_strip = plasma.WS2812(NUM_LEDS, color_order=plasma.COLOR_ORDER_RGB)
+# How many times the LEDs will be updated per second
+UPDATES = 60
+
+# work out every brightness of our colour once, up front (index 0 is off, 255 is full brightness)
+palette = hue_ramp(COLOUR)
+
+# set up the WS2812 / NeoPixel™ LEDs, drawing through a frame buffer
+fb = FrameBuffer(NUM_LEDS, color_order=plasma.COLOR_ORDER_RGB)
+led_strip = fb.ws2812()
 
 # start updating the LED strip
 led_strip.start()
 
+# Keeps the loop running at UPDATES frames per second, rather than as fast as it can
+scheduler = Scheduler(UPDATES)
+
+# how far along the sine wave we are. 65536 is a full turn, so 208 a frame takes about 5 seconds
 offset = 0
 
 while True:
-    # use a sine wave to set the brightness
-    for i in range(NUM_LEDS):
-        led_strip.set_hsv(i, COLOUR, 1.0, sin(offset))
-    offset += 0.002
-
-#     # our sine wave goes between -1.0 and 1.0 - this means the LEDs will be off half the time
-#     # this formula forces the brightness to be between 0.0 and 1.0
-#     for i in range(NUM_LEDS):
-#         led_strip.set_hsv(i, COLOUR, 1.0, (1 + sin(offset)) / 2)
-#     offset += 0.002
-
-#     # adjust the saturation instead of the brightness/value
-#     for i in range(NUM_LEDS):
-#         led_strip.set_hsv(i, COLOUR, (1 + sin(offset)) / 2, 0.8)
-#     offset += 0.002
+    # use a sine wave to pick the brightness from our palette
+    palette.fill(fb, sine(offset) * 2)
+    fb.push()
+    offset = (offset + 208) & 0xFFFF
+    scheduler.wait()
+
+#     # our sine wave goes between -127 and 127 - this means the LEDs will be off half the time
+#     # the SINE table goes between 1 and 255 instead, so the LEDs are never quite off (needs `from wave import SINE`)
+#     palette.fill(fb, SINE[(offset >> 8) & 0xFF])
+#     fb.push()
+#     offset = (offset + 208) & 0xFFFF
+#     scheduler.wait()
+
+#     # adjust the saturation instead of the brightness/value (needs `from colourmath import hsv_to_rgb` and `from wave import SINE`)
+#     r, g, b = hsv_to_rgb(COLOUR, SINE[(offset >> 8) & 0xFF] / 255, 0.8)
+#     fb.fill(int(r * 255), int(g * 255), int(b * 255))
+#     fb.push()
+#     offset = (offset + 208) & 0xFFFF
+#     scheduler.wait()
@@ -1,4 +1,6 @@
-import time
+import colourmath
+from framebuffer import FrameBuffer
+from scheduler import Scheduler
 
 import plasma
 
@@ -15,12 +17,21 @@ SPEED = 20
 # How many times the LEDs will be updated per second
 UPDATES = 60
 
+# Draw into a frame buffer, and send the whole frame to the LEDs at once
+fb = FrameBuffer(NUM_LEDS, color_order=plasma.COLOR_ORDER_RGB)
+
 # WS2812 / NeoPixel™ LEDs
-led_strip = plasma.WS2812(NUM_LEDS, color_order=plasma.COLOR_ORDER_RGB)
+led_strip = fb.ws2812()
 
 # Start updating the LED strip
 led_strip.start()
 
+# The hue of each LED along the strip, before the offset is added
+hues = colourmath.array([i / NUM_LEDS for i in range(NUM_LEDS)])
+
+# Keeps the loop running at UPDATES frames per second, however long each frame takes to draw
+scheduler = Scheduler(UPDATES)
+
 offset = 0.0
 
 # Make rainbows
@@ -30,8 +41,8 @@ while True:
     offset += float(SPEED) / 2000.0
     offset %= 1
 
-    for i in range(NUM_LEDS):
-        hue = (offset + float(i) / NUM_LEDS) % 1
-        led_strip.set_hsv(i, hue + offset, 1.0, 1.0)
+    # Convert every LED's hue to RGB in one go
+    colourmath.fill_hsv(fb, hues, 1.0, 1.0, h_offset=offset * 2)
+    fb.push()
 
-    time.sleep(1.0 / UPDATES)
+    scheduler.wait()
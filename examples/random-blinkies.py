@@ -1,6 +1,8 @@
 import time
 from random import randrange, uniform
 
+from framebuffer import FrameBuffer
+
 import plasma
 
 """
@@ -23,23 +25,27 @@ SPEED = 0.3
 
 # Pick *one* LED type by uncommenting the relevant line below:
 
+# The same colour order plasma.WS2812 uses, unless told otherwise
+fb = FrameBuffer(NUM_LEDS, color_order=plasma.COLOR_ORDER_GRB)
+
 # APA102 / DotStar™ LEDs
-# led_strip = plasma.APA102(NUM_LEDS)
+# led_strip = fb.apa102()
 
 # WS2812 / NeoPixel™ LEDs
-led_strip = plasma.WS2812(NUM_LEDS)
+led_strip = fb.ws2812()
 
-# Start updating the LED strip
-led_strip.start()
+# The strip isn't start()ed, fb.update() sends it a frame only when something has changed
 
 # Light up all the leds random colours and brightnesses from the specified ranges...
 # randrange is for picking integers from a range,
 # uniform is for generating random uniform floats between a minimum and maximum value.
 for i in range(NUM_LEDS):
-    led_strip.set_hsv(i, randrange(HUE_START, HUE_END) / 360, 1.0, uniform(BRIGHTNESS_MIN, BRIGHTNESS_MAX))
+    fb.set_hsv(i, randrange(HUE_START, HUE_END) / 360, 1.0, uniform(BRIGHTNESS_MIN, BRIGHTNESS_MAX))
+fb.update()
 
 while True:
     # ...and then update one random pixel at a time to keep things fresh and sparkly.
     # Comment out the lines below if you want static lights.
-    led_strip.set_hsv(randrange(0, NUM_LEDS), randrange(HUE_START, HUE_END) / 360, 1.0, uniform(BRIGHTNESS_MIN, BRIGHTNESS_MAX))
+    fb.set_hsv(randrange(0, NUM_LEDS), randrange(HUE_START, HUE_END) / 360, 1.0, uniform(BRIGHTNESS_MIN, BRIGHTNESS_MAX))
+    fb.update()
     time.sleep(SPEED)
@@ -0,0 +1,57 @@
+from framebuffer import FrameBuffer
+from layout import matrix, shift
+from palette import hsv_ramp
+from scheduler import Scheduler
+
+import plasma
+
+"""
+Rainbow rings rippling out from the middle of a grid of LEDs.
+Set WIDTH and HEIGHT to match your grid, and SERPENTINE if the strip doubles back at the end of each row.
+"""
+
+# Set the size of your grid
+WIDTH = 16
+HEIGHT = 16
+NUM_LEDS = WIDTH * HEIGHT
+
+# Set to True if every other row runs backwards
+SERPENTINE = True
+
+# How many times the LEDs will be updated per second
+UPDATES = 60
+
+# How far the rings move each frame (256 is all the way from the middle to the corners)
+SPEED = 3
+
+# set up the WS2812 / NeoPixel™ LEDs, drawing through a frame buffer
+fb = FrameBuffer(NUM_LEDS, color_order=plasma.COLOR_ORDER_RGB)
+led_strip = fb.ws2812()
+
+# start updating the LED strip
+led_strip.start()
+
+# where each LED is, and how far each one is from the middle (0 to 255), worked out once
+layout = matrix(WIDTH, HEIGHT, serpentine=SERPENTINE)
+rings = layout.distances((WIDTH - 1) / 2, (HEIGHT - 1) / 2)
+
+# For a strip wound around a bottle, try turning colours around it instead (needs `from layout import spiral`)
+# layout = spiral(NUM_LEDS, per_turn=12)
+# rings = layout.angles()
+
+# two trips around the colour wheel between the middle and the corners
+palette = hsv_ramp(0.0, 2.0)
+colours = bytearray(NUM_LEDS)
+
+# Keeps the loop running at UPDATES frames per second, rather than as fast as it can
+scheduler = Scheduler(UPDATES)
+
+offset = 0
+
+while True:
+    # subtracting the offset moves the rings outwards
+    shift(colours, rings, -offset)
+    palette.apply(fb, colours)
+    fb.push()
+    offset = (offset + SPEED) & 0xFF
+    scheduler.wait()
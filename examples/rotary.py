@@ -1,9 +1,10 @@
-import math
 import time
 
 import machine
 from breakout_encoder import BreakoutEncoder
-from pimoroni import RGBLED, Button
+from pimoroni import RGBLED, IRQButton
+from scheduler import Scheduler
+from wave import TURN, sine
 
 import plasma
 
@@ -40,12 +41,13 @@ led_strip = plasma.APA102(NUM_LEDS)
 # WS2812 / NeoPixel™ LEDs
 # led_strip = plasma.WS2812(NUM_LEDS)
 
-user_sw = Button("USER_SW", repeat_time=0)
-button_a = Button("BUTTON_A", repeat_time=0)
+# The buttons are watched by interrupts, so a press between frames isn't missed
+user_sw = IRQButton("USER_SW", repeat_time=0)
+button_a = IRQButton("BUTTON_A", repeat_time=0)
 
 try:
     # Button B is only available on Plasma 2040
-    button_b = Button("BUTTON_B", repeat_time=0)
+    button_b = IRQButton("BUTTON_B", repeat_time=0)
 except ValueError:
     button_b = None
 
@@ -59,24 +61,20 @@ enc.set_brightness(1.0)
 COLOUR, ANGLE, BRIGHTNESS, SPEED = range(4)
 
 
-def wrap(v, mn, mx):
-    if v <= mn:
-        v += mx - mn
-
-    if v > mx:
-        v -= mx - mn
-
-    return v
+# Where each LED sits along the sine wave: half a turn from one end of the strip to the other
+positions = [i * TURN // (2 * NUM_LEDS) for i in range(NUM_LEDS)]
 
 
 def colour_cycle(hue, t, angle):
-    t /= 200.0
+    # The wave is looked up in a table, and goes round once every TURN (65536) steps of its phase
+    phase = int((t / 200.0 + 0.5) * TURN / 2)
 
+    # Hues are worked out in 1/16ths of a degree
+    hue *= 16
     for i in range(NUM_LEDS):
-        percent_along = float(i) / NUM_LEDS
-        offset = math.sin((percent_along + 0.5 + t) * math.pi) * angle
-        h = wrap((hue + offset) / 360.0, 0.0, 1.0)
-        led_strip.set_hsv(i, h, 1.0, 1.0)
+        offset = sine(phase + positions[i]) * angle * 16 // 127
+        h = (hue + offset) % 5760
+        led_strip.set_hsv(i, h / 5760, 1.0, 1.0)
 
 
 def speed_gauge(v, vmax=100):
@@ -112,6 +110,7 @@ brightness = DEFAULT_BRIGHTNESS
 
 cycle = True
 mode = COLOUR
+scheduler = Scheduler(UPDATES)
 start_time = time.ticks_ms()
 
 while True:
@@ -187,4 +186,4 @@ while True:
     mid_led = led_strip.get(int(NUM_LEDS / 2))
     enc.set_led(int(mid_led[0]), int(mid_led[1]), int(mid_led[2]))
 
-    time.sleep(1.0 / UPDATES)
+    scheduler.wait()
@@ -1,4 +1,7 @@
-from random import uniform
+from fade import Fader
+from framebuffer import FrameBuffer
+from noise import Sampler
+from scheduler import Scheduler
 
 import plasma
 
@@ -21,42 +24,38 @@ SNOW_COLOUR = [240, 255, 255]  # bluish white
 FADE_UP_SPEED = 255  # abrupt change for a snowflake
 FADE_DOWN_SPEED = 1
 
+# How many times the LEDs will be updated per second
+UPDATES = 100
 
-def display_current():
-    # paint our current LED colours to the strip
-    for i in range(NUM_LEDS):
-        led_strip.set_rgb(i, current_leds[i][0], current_leds[i][1], current_leds[i][2])
+# The fader keeps track of current and target colours, and only updates LEDs that are still changing
+fader = Fader(NUM_LEDS, FADE_UP_SPEED, FADE_DOWN_SPEED)
 
+# once a snowflake has appeared, slowly reset it to the background
+fader.set_rest(*BACKGROUND_COLOUR)
+fader.fill_target(*BACKGROUND_COLOUR)
 
-def move_to_target():
-    # nudge our current colours closer to the target colours
-    for i in range(NUM_LEDS):
-        for c in range(3):  # 3 times, for R, G & B channels
-            if current_leds[i][c] < target_leds[i][c]:
-                current_leds[i][c] = min(current_leds[i][c] + FADE_UP_SPEED, target_leds[i][c])  # increase current, up to a maximum of target
-            elif current_leds[i][c] > target_leds[i][c]:
-                current_leds[i][c] = max(current_leds[i][c] - FADE_DOWN_SPEED, target_leds[i][c])  # reduce current, down to a minimum of target
+# set up the WS2812 / NeoPixel™ LEDs, drawn through a frame buffer
+fb = FrameBuffer(NUM_LEDS, color_order=plasma.COLOR_ORDER_RGB)
+led_strip = fb.ws2812()
 
+# start updating the LED strip
+led_strip.start()
 
-# Create a list of [r, g, b] values that will hold current LED colours, for display
-current_leds = [[0] * 3 for i in range(NUM_LEDS)]
-# Create a list of [r, g, b] values that will hold target LED colours, to move towards
-target_leds = [[0] * 3 for i in range(NUM_LEDS)]
+# Keeps the loop running at UPDATES frames per second, rather than as fast as it can
+scheduler = Scheduler(UPDATES)
 
-# set up the WS2812 / NeoPixel™ LEDs
-led_strip = plasma.WS2812(NUM_LEDS, color_order=plasma.COLOR_ORDER_RGB)
+# unpack the colour once, rather than for every snowflake
+snow_r, snow_g, snow_b = SNOW_COLOUR
 
-# start updating the LED strip
-led_strip.start()
+# picks which LEDs get a snowflake each frame, without having to roll the dice for every LED
+snowflakes = Sampler(NUM_LEDS, SNOW_INTENSITY)
 
 while True:
-    for i in range(NUM_LEDS):
-        # randomly add snow
-        if SNOW_INTENSITY > uniform(0, 1):
-            # set a target to start a snowflake
-            target_leds[i] = SNOW_COLOUR
-        # slowly reset snowflake to background
-        if current_leds[i] == target_leds[i]:
-            target_leds[i] = BACKGROUND_COLOUR
-    move_to_target()   # nudge our current colours closer to the target colours
-    display_current()  # display current colours to strip
+    # randomly add snow
+    for n in range(snowflakes.sample()):
+        # set a target to start a snowflake
+        fader.set_target(snowflakes.hits[n], snow_r, snow_g, snow_b)
+    fader.step()       # nudge our current colours closer to the target colours
+    fader.render(fb)   # draw the colours that changed
+    fb.push()          # display them on the strip
+    scheduler.wait()
@@ -1,6 +1,8 @@
-import math
 import time
 
+from scheduler import Scheduler
+from wave import SINE, TURN, pulse
+
 import plasma
 
 """
@@ -15,40 +17,47 @@ EFFECT_FPS = 60        # You'll probably never need to change this
 led_strip = plasma.WS2812(NUM_LEDS)
 led_strip.start()
 
-period = math.pi * EFFECT_SPEED
+# Our waves are looked up in tables rather than worked out every time, and go round
+# once every TURN (65536) steps of their phase.
+
+# Convert the slow procession of the sine wave into a brief pulse by raising it by a power
+# we've called EFFECT_SHARPNESS. Doing it once, up front, means each LED only needs a lookup
+# https://www.wolframalpha.com/input?i=plot+pow%28%28sin%28x%29+%2B+1%29+%2F+2.0%2C+10%29%2C+%28sin%28x%29+%2B+1%29+%2F+2.0
+sparkle = pulse(EFFECT_SHARPNESS)
+
+# How far the waves move along each millisecond (in 1/1000ths of a step), and the slower brightness wave with them.
+# Kept as a whole number (even if EFFECT_SPEED isn't) so that everything worked out from it is too
+speed = int(EFFECT_SPEED * TURN / 4)
+# The sparkles are slightly out of phase with the LEDs
+sparkle_offset = int(EFFECT_SPEED * 0.45 * TURN) % TURN
+# Where each LED sits along the waves, spreading them out over 1.5 turns of the strip
+led_offsets = [i * TURN * 3 // (2 * NUM_LEDS) for i in range(NUM_LEDS)]
+
+scheduler = Scheduler(EFFECT_FPS)
+last = time.ticks_ms()
+t = 0       # phase of the sparkles, in 1/1000ths
+t_half = 0  # phase of the brightness, at half the speed
 
 while True:
-    t = time.ticks_ms() / 1000 * period
-    t *= 0.5
+    now = time.ticks_ms()
+    elapsed = time.ticks_diff(now, last)
+    last = now
+    t = (t + elapsed * speed) % (TURN * 1000)
+    t_half = (t_half + elapsed * speed // 2) % (TURN * 1000)
+    phase = t // 1000
+    phase_half = t_half // 1000
 
     for i in range(NUM_LEDS):
-        led_offset = i / NUM_LEDS
-        led_offset *= math.pi
-        led_offset *= 3
-        led_offset += t
+        led_offset = led_offsets[i] + phase
 
-        # A sine with a 2x period, shifted to 0 to 254
+        # A sine with a 2x period, 0 to 254
         # This provides a brightness cycling effect phase-locked to the LEDs
-        br = (math.sin(t / 2 + led_offset) + 1) * 127
-
-        # Calculate slightly out of phase sine waves for the red, green and blue channels
-        r = (math.sin(led_offset + (period * 0.85)) + 1) / 2
-        g = (math.sin(led_offset + (period * 0.90)) + 1) / 2
-        b = (math.sin(led_offset + (period * 0.95)) + 1) / 2
-
-        # Convert the slow procession of the sine wave into a brief pulse
-        # by raising it by a power we've called EFFECT_SHARPNESS
-        # https://www.wolframalpha.com/input?i=plot+pow%28%28sin%28x%29+%2B+1%29+%2F+2.0%2C+10%29%2C+%28sin%28x%29+%2B+1%29+%2F+2.0
-        r = min(1, max(0, math.pow(r, EFFECT_SHARPNESS)))
-        g = min(1, max(0, math.pow(g, EFFECT_SHARPNESS)))
-        b = min(1, max(0, math.pow(b, EFFECT_SHARPNESS)))
+        br = SINE[((led_offset + phase_half) >> 8) & 0xFF]
 
-        # Tune the output colours and apply brightness
-        # This is a nice greeny teal
-        r = 0
-        g = int(g * br)
-        b = int(g * 0.6)
+        # The sparkle at this LED, tuned to a nice greeny teal with brightness applied
+        g = (sparkle[((led_offset + sparkle_offset) >> 8) & 0xFF] * br) >> 8
+        b = (g * 154) >> 8  # 0.6
 
-        led_strip.set_rgb(i, g, r, b)
+        led_strip.set_rgb(i, g, 0, b)
 
-    time.sleep(1.0 / EFFECT_FPS)
+    scheduler.wait()
@@ -1,6 +1,8 @@
 import time
 
-import machine
+from framebuffer import FrameBuffer
+from palette import hsv_ramp
+from pimoroni import Analog
 
 import plasma
 
@@ -23,43 +25,37 @@ MAX = 30
 HUE_START = 230  # blue
 HUE_END = 359  # red
 
-# WS2812 / NeoPixel™ LEDs
-led_strip = plasma.WS2812(NUM_LEDS, color_order=plasma.COLOR_ORDER_RGB)
+# Work out the colours for the whole temperature range once, up front
+palette = hsv_ramp(HUE_START / 360, HUE_END / 360, 1.0, BRIGHTNESS, BRIGHTNESS)
+
+# WS2812 / NeoPixel™ LEDs, drawn through a frame buffer
+fb = FrameBuffer(NUM_LEDS, color_order=plasma.COLOR_ORDER_RGB)
+led_strip = fb.ws2812()
 
 # Start updating the LED strip
 led_strip.start()
 
-sensor_temp = machine.ADC(4)
-conversion_factor = 3.3 / (65535)  # used for calculating a temperature from the raw sensor reading
-
 # The Pico's temperature sensor is not super accurate and readings jump around
-# lets do some averaging to avoid annoying flashing
-n = 0
-temperature = 20  # a dummy value to fill the array
-temperature_array = [temperature] * 10  # average over 10 readings (5 secs)
+# so let's keep reading it in the background, 20 times a second, and average
+# the last 100 readings (5 secs) to avoid annoying flashing
+sensor_temp = Analog(4)
+sensor_temp.start(rate=20, size=100)
 
 while True:
-    # read the sensor
-    # the following two lines do some maths to convert the number from the temp sensor into celsius
-    reading = sensor_temp.read_u16() * conversion_factor
-    temperature = 27 - (reading - 0.706) / 0.001721
-
-    # add the most recent reading to the array
-    if n >= len(temperature_array):
-        n = 0
-    temperature_array[n] = temperature
-    n += 1
-
-    temperature_average = sum(temperature_array) / len(temperature_array)
+    # read the sensor (the average of the last 100 readings, in volts)
+    # and do some maths to convert it into celsius
+    reading = sensor_temp.read_voltage()
+    temperature_average = 27 - (reading - 0.706) / 0.001721
+
     print(f"""
     Average temperature: {temperature_average:.2f} °C
     """)
 
-    # calculates a colour
-    hue = HUE_START + ((temperature_average - MIN) * (HUE_END - HUE_START) / (MAX - MIN))
+    # pick a colour from the palette, 0 for MIN and 255 for MAX
+    index = (temperature_average - MIN) * 255 / (MAX - MIN)
 
     # set the leds
-    for i in range(NUM_LEDS):
-        led_strip.set_hsv(i, hue / 360, 1.0, BRIGHTNESS)
+    palette.fill(fb, index)
+    fb.push()
 
     time.sleep(0.5)
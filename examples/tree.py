@@ -1,6 +1,8 @@
 import time
 from random import choice, random
 
+from framebuffer import FrameBuffer
+
 import plasma
 
 """
@@ -21,22 +23,25 @@ LIGHT_COLOURS = ((0.0, 1.0, 1.0),   # red
                  (0.85, 0.4, 1.0))  # pink
 LIGHT_CHANGE_CHANCE = 0.5  # change to 0.0 if you want static lights
 
-# set up the WS2812 / NeoPixel™ LEDs
-led_strip = plasma.WS2812(NUM_LEDS, color_order=plasma.COLOR_ORDER_RGB)
+# set up the WS2812 / NeoPixel™ LEDs, drawing into a frame buffer
+fb = FrameBuffer(NUM_LEDS, color_order=plasma.COLOR_ORDER_RGB)
+led_strip = fb.ws2812()
 
-# start updating the LED strip
-led_strip.start()
+# the strip isn't start()ed - fb.update() only sends it a frame when a light has changed colour
 
 # initial setup
 for i in range(NUM_LEDS):
     if i % LIGHT_RATIO == 0:  # add an appropriate number of lights
-        led_strip.set_hsv(i, *choice(LIGHT_COLOURS))  # choice randomly chooses from a list
+        fb.set_hsv(i, *choice(LIGHT_COLOURS))  # choice randomly chooses from a list
     else:  # GREEN
-        led_strip.set_hsv(i, *TREE_COLOUR)
+        fb.set_hsv(i, *TREE_COLOUR)
+fb.update()
 
 # animate
 while True:
-    for i in range(NUM_LEDS):
-        if (i % LIGHT_RATIO == 0) and (random() < LIGHT_CHANGE_CHANCE):
-            led_strip.set_hsv(i, *choice(LIGHT_COLOURS))
+    # only the lights ever change, so there's no need to visit the tree pixels
+    for i in range(0, NUM_LEDS, LIGHT_RATIO):
+        if random() < LIGHT_CHANGE_CHANCE:
+            fb.set_hsv(i, *choice(LIGHT_COLOURS))
+    fb.update()
     time.sleep(0.5)
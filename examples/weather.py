@@ -1,11 +1,14 @@
-import gc
+import asyncio
 import time
-# Random functions! randrange is for picking integers from a range, and uniform is for floats.
-from random import randrange, uniform
 
-import requests
+import ezhttp
 from ezwifi import connect
-from machine import Pin, Timer
+from fade import Fader
+from jsonstream import extract_async
+from machine import Pin
+# Random numbers! rng.below(n) picks a whole number from 0 to n - 1, and a Sampler picks which LEDs to change
+from noise import Random, Sampler
+from runtime import Runtime
 
 import plasma
 
@@ -28,6 +31,9 @@ TIMEZONE = "auto"  # determines time zone from lat/long
 URL = "http://api.open-meteo.com/v1/forecast?latitude=" + str(LAT) + "&longitude=" + str(LNG) + "&current_weather=true&timezone=" + TIMEZONE
 UPDATE_INTERVAL = 900  # refresh interval in secs. Be nice to free APIs!
 
+# How many times the LEDs will be updated per second
+UPDATES = 60
+
 # Weather codes from https://open-meteo.com/en/docs#:~:text=WMO%20Weather%20interpretation%20codes%20(WW)
 WEATHERCODES = {
     0: "clear sky",
@@ -79,145 +85,178 @@ def wifi_message(_wifi, message):
         led_strip.set_rgb(i, 0, 0, 0)
 
 
-def get_data(_t=None):
+async def get_data():
+    # this runs alongside the animation, which carries on while we wait for the server
     global weathercode
     print(f"Requesting URL: {URL}")
-    r = requests.get(URL)
-    # open the json data
-    j = r.json()
+    try:
+        r = await session.get(URL)
+        try:
+            # read just the values we need from the json data, as it arrives
+            j = await extract_async(r.reader, ("current_weather.temperature", "current_weather.weathercode", "current_weather.time"))
+        finally:
+            # hand the connection back for next time (or close it, if the data couldn't be read)
+            await r.close()
+    except (OSError, ValueError, KeyError, asyncio.TimeoutError) as e:
+        print(f"Request failed: {e}")
+        return
     print("Data obtained!")
 
-    # parse relevant data from JSON
-    current = j["current_weather"]
-    temperature = current["temperature"]
-    weathercode = current["weathercode"]
-    datetime_arr = current["time"].split("T")
+    temperature = j["current_weather.temperature"]
+    weathercode = j["current_weather.weathercode"]
+    datetime_arr = j["current_weather.time"].split("T")
 
     print(f"""Temperature = {temperature}°C
 Conditions = {WEATHERCODES[weathercode]}
 Last Open-Meteo update: {datetime_arr[0]}, {datetime_arr[1]}
     """)
 
-    r.close()
-
     # flash the onboard LED after getting data
     pico_led.value(True)
-    time.sleep(0.2)
+    await asyncio.sleep_ms(200)
     pico_led.value(False)
 
 
 # the rest of our functions are for animations!
-def display_current():
-    # paint our current LED colours to the strip
-    for i in range(NUM_LEDS):
-        led_strip.set_rgb(i, current_leds[i][0], current_leds[i][1], current_leds[i][2])
+def backdrop(r, g, b):
+    # fade every LED towards this colour. Only done when it changes, rather than every frame
+    global backdrop_colour
+    colour = (r << 16) | (g << 8) | b
+    if colour != backdrop_colour:
+        fader.fill_target(r, g, b)
+        backdrop_colour = colour
 
 
-def move_to_target():
-    # nudge our current colours closer to the target colours
-    for i in range(NUM_LEDS):
-        for c in range(3):  # 3 times, for R, G & B channels
-            if current_leds[i][c] < target_leds[i][c]:
-                current_leds[i][c] = min(current_leds[i][c] + ANIMATION_SPEED, target_leds[i][c])  # increase current, up to a maximum of target
-            elif current_leds[i][c] > target_leds[i][c]:
-                current_leds[i][c] = max(current_leds[i][c] - ANIMATION_SPEED, target_leds[i][c])  # reduce current, down to a minimum of target
+def chance(probability):
+    # change how likely each LED is to be picked by the sampler
+    if sampler.chance != probability:
+        sampler.set_chance(probability)
 
 
 def clear():
+    # these set the LEDs' targets themselves, so the next backdrop() needs to fill them again
+    global backdrop_colour
+    backdrop_colour = None
     if weathercode == 0:  # clear
         # nice sunny yellow
         for i in range(NUM_LEDS):
-            target_leds[i] = [randrange(220, 260), randrange(220, 260), randrange(60, 100)]
+            fader.set_target(i, 220 + rng.below(36), 220 + rng.below(36), 60 + rng.below(40))
     if weathercode == 1:  # mostly clear
         # sky blues
         for i in range(NUM_LEDS):
-            target_leds[i] = [randrange(0, 40), randrange(150, 190), randrange(180, 220)]
+            fader.set_target(i, rng.below(40), 150 + rng.below(40), 180 + rng.below(40))
 
 
 def clouds():
+    global backdrop_colour
+    backdrop_colour = None
     # base colours:
     if weathercode == 2:
-        cloud_colour = [165, 168, 138]  # partly cloudy
+        r, g, b = 165, 168, 138  # partly cloudy
     if weathercode == 3:
-        cloud_colour = [93, 94, 83]  # cloudy
+        r, g, b = 93, 94, 83  # cloudy
     if weathercode in (45, 48):
-        cloud_colour = [186, 185, 182]  # foggy
+        r, g, b = 186, 185, 182  # foggy
+
+    # add highlights and lowlights to a few LEDs
+    chance(0.007)
+    for n in range(sampler.sample()):
+        i = sampler.hits[n]
+        kind = rng.below(7)
+        if kind == 0:  # highlight
+            fader.set_target(i, r + 20, g + 20, b + 20)
+        elif kind == 1:  # lowlight
+            fader.set_target(i, r - 20, g - 20, b - 20)
+        else:  # normal
+            fader.set_target(i, r, g, b)
 
-    # add highlights and lowlights
-    for i in range(NUM_LEDS):
-        if uniform(0, 1) < 0.001:  # highlight
-            target_leds[i] = [x + 20 for x in cloud_colour]
-        elif uniform(0, 1) < 0.001:  # lowlight
-            target_leds[i] = [x - 20 for x in cloud_colour]
-        elif uniform(0, 1) < 0.005:  # normal
-            target_leds[i] = cloud_colour
+
+def raindrops():
+    for n in range(sampler.sample()):
+        # paint a raindrop (use current rather than target, for an abrupt change to the drop colour)
+        fader.set_current(sampler.hits[n], rng.below(50), 20 + rng.below(80), 50 + rng.below(205))
 
 
 def storm():
     # heavy rain, with lightning!
-    raindrop_chance = 0.01
+    backdrop(0, 15, 60)
+    chance(0.01)
+    raindrops()
 
-    for i in range(NUM_LEDS):
-        if raindrop_chance > uniform(0, 1):
-            # paint a raindrop (use current rather than target, for an abrupt change to the drop colour)
-            current_leds[i] = [randrange(0, 50), randrange(20, 100), randrange(50, 255)]
-        else:
-            # paint backdrop
-            target_leds[i] = [0, 15, 60]
-
-    lightning_chance = 0.001
-    if lightning_chance > uniform(0, 1):
+    # a 1 in 1000 chance of lightning each frame
+    if rng.below(1000) == 0:
         for i in range(NUM_LEDS):
-            current_leds[i] = [255, 255, 255]
+            fader.set_current(i, 255, 255, 255)
 
 
 def rain():
     # splodgy blues
+    backdrop(0, 15, 60)
     # first, work out how many raindrops:
     if weathercode in (51, 56, 61, 66, 80):  # light rain
-        raindrop_chance = 0.001
+        chance(0.001)
     elif weathercode in (53, 63, 81):  # moderate rain
-        raindrop_chance = 0.005
+        chance(0.005)
     else:
         # heavy rain
-        raindrop_chance = 0.01
-
-    for i in range(NUM_LEDS):
-        if raindrop_chance > uniform(0, 1):
-            # paint a raindrop (use current rather than target, for an abrupt change to the drop colour)
-            current_leds[i] = [randrange(0, 50), randrange(20, 100), randrange(50, 255)]
-        else:
-            # paint backdrop
-            target_leds[i] = [0, 15, 60]
+        chance(0.01)
+    raindrops()
 
 
 def snow():
     # splodgy whites
+    backdrop(54, 54, 54)
     # first, work out how many snowflakes:
     if weathercode in (71, 85):  # light snow
-        snowflake_chance = 0.001
+        chance(0.001)
     elif weathercode in (73, 77):  # moderate snow
-        snowflake_chance = 0.005
+        chance(0.005)
     else:
         # heavy snow
-        snowflake_chance = 0.01
+        chance(0.01)
 
-    for i in range(NUM_LEDS):
-        if snowflake_chance > uniform(0, 1):
-            # paint a snowflake (use current rather than target, for an abrupt change to the drop colour)
-            current_leds[i] = [227, 227, 227]
-        else:
-            # paint backdrop
-            target_leds[i] = [54, 54, 54]
+    for n in range(sampler.sample()):
+        # paint a snowflake (use current rather than target, for an abrupt change to the drop colour)
+        fader.set_current(sampler.hits[n], 227, 227, 227)
+
+
+def animate(_frame):
+    # do some fancy stuff with the LEDs based on the weather code
+    if weathercode is None:
+        pass  # still waiting for the first lot of data
+    elif 0 <= weathercode <= 1:
+        clear()
+    elif 2 <= weathercode <= 48:
+        clouds()
+    elif 51 <= weathercode <= 67 or 80 <= weathercode <= 82:
+        rain()
+    elif 71 <= weathercode <= 77 or 85 <= weathercode <= 86:
+        snow()
+    elif 95 <= weathercode <= 99:
+        storm()
+    else:
+        print("Unknown weather code :(")
 
+    fader.step()             # nudge our current colours closer to the target colours
+    fader.render(led_strip)  # display the colours that changed on the strip
+
+
+# keeps the connection to the server open between requests, so each one doesn't have to start over
+session = ezhttp.Session()
 
 # some variables we'll use for animations
 ANIMATION_SPEED = 1  # higher number gets from current to target colour faster
 
-# Create an list of [r, g, b] values that will hold current LED colours, for display
-current_leds = [[0] * 3 for i in range(NUM_LEDS)]
-# Create an list of [r, g, b] values that will hold target LED colours, to move towards
-target_leds = [[0] * 3 for i in range(NUM_LEDS)]
+# The fader holds current and target LED colours, and moves the current colours towards the targets
+fader = Fader(NUM_LEDS, ANIMATION_SPEED)
+backdrop_colour = None
+
+# A fast random number generator, and a sampler that picks a few LEDs at a time without visiting the rest
+rng = Random()
+sampler = Sampler(NUM_LEDS, 0, rng)
+
+# we don't know the weather until the first lot of data arrives
+weathercode = None
 
 # set up the Pico W's onboard LED
 pico_led = Pin("LED", Pin.OUT)
@@ -234,28 +273,8 @@ try:
 except ValueError as e:
     wifi_failed(e)
 
-# get the first lot of data
-get_data()
-
-# start timer (the timer will update our data every UPDATE_INTERVAL)
-timer = Timer(-1)
-timer.init(period=UPDATE_INTERVAL * 1000, mode=Timer.PERIODIC, callback=get_data)
-
-while True:
-    # do some fancy stuff with the LEDs based on the weather code
-    if 0 <= weathercode <= 1:
-        clear()
-    elif 2 <= weathercode <= 48:
-        clouds()
-    elif 51 <= weathercode <= 67 or 80 <= weathercode <= 82:
-        rain()
-    elif 71 <= weathercode <= 77 or 85 <= weathercode <= 86:
-        snow()
-    elif 95 <= weathercode <= 99:
-        storm()
-    else:
-        print("Unknown weather code :(")
-
-    move_to_target()   # nudge our current colours closer to the target colours
-    display_current()  # display current colours to strip
-    gc.collect()
+# animate the LEDs, and get new data every UPDATE_INTERVAL, both at the same time
+runtime = Runtime()
+runtime.render(animate, UPDATES)
+runtime.every(UPDATE_INTERVAL * 1000, get_data)
+runtime.run()
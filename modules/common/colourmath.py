@@ -0,0 +1,95 @@
+try:
+    from ulab import numpy as np
+except ImportError:
+    # No ulab (eg: testing on a computer), fall back to converting one LED at a time
+    np = None
+
+
+def hsv_to_rgb(h, s, v):
+    # From CPython Lib/colorsys.py
+    if s == 0.0:
+        return v, v, v
+    i = int(h * 6.0)
+    f = (h * 6.0) - i
+    p = v * (1.0 - s)
+    q = v * (1.0 - s * f)
+    t = v * (1.0 - s * (1.0 - f))
+    i = i % 6
+    if i == 0:
+        return v, t, p
+    if i == 1:
+        return q, v, p
+    if i == 2:
+        return p, v, t
+    if i == 3:
+        return p, q, v
+    if i == 4:
+        return t, p, v
+    # if i == 5:
+    return v, p, q
+
+
+def array(values):
+    # An array of floats suitable for passing to the functions below
+    if np is not None:
+        return np.array(values, dtype=np.float)
+    return [float(x) for x in values]
+
+
+def hsv_to_rgb_array(h, s=1.0, v=1.0, h_offset=0.0):
+    # Convert a whole array of hues (and optionally saturations and values) to three
+    # arrays of 0-255 red, green and blue values
+    if np is None:
+        count = len(h)
+        r, g, b = bytearray(count), bytearray(count), bytearray(count)
+        for i in range(count):
+            si = s if isinstance(s, (int, float)) else s[i]
+            vi = v if isinstance(v, (int, float)) else v[i]
+            hi = (h[i] + h_offset) % 1.0
+            rf, gf, bf = hsv_to_rgb(hi, si, vi)
+            r[i] = int(rf * 255)
+            g[i] = int(gf * 255)
+            b[i] = int(bf * 255)
+        return r, g, b
+
+    # Branchless HSV: each channel is v minus a clipped triangle wave of the hue,
+    # see https://en.wikipedia.org/wiki/HSL_and_HSV#HSV_to_RGB_alternative
+    h6 = h + h_offset
+    h6 = (h6 - np.floor(h6)) * 6.0
+    vs = v * s * 255.0
+    v255 = v * 255.0
+    out = []
+    for n in (5.0, 3.0, 1.0):
+        k = h6 + n
+        k = k - np.floor(k / 6.0) * 6.0
+        k = np.maximum(np.minimum(np.minimum(k, 4.0 - k), 1.0), 0.0)
+        out.append(np.array(v255 - vs * k, dtype=np.uint8))
+    return out
+
+
+def fill_hsv(fb, h, s=1.0, v=1.0, start=0, h_offset=0.0):
+    # Convert and write len(h) LEDs into a FrameBuffer, starting at `start`
+    count = min(len(h), fb.num_leds - start)
+    if count <= 0:
+        return
+    r, g, b = hsv_to_rgb_array(h, s, v, h_offset)
+    ro, go, bo = fb.offsets
+    first = start * 4
+    last = first + count * 4
+
+    if np is not None:
+        frame = np.frombuffer(fb.frame, dtype=np.uint8)
+        frame[first + ro:last:4] = r[:count]
+        frame[first + go:last:4] = g[:count]
+        frame[first + bo:last:4] = b[:count]
+        fb.mark_dirty(start, start + count)
+        return
+
+    frame = fb.frame
+    i = first
+    for n in range(count):
+        frame[i + ro] = r[n]
+        frame[i + go] = g[n]
+        frame[i + bo] = b[n]
+        i += 4
+    fb.mark_dirty(start, start + count)
@@ -0,0 +1,155 @@
+from array import array
+
+import micropython
+from micropython import const
+
+# Fades LEDs from their current colour towards a target colour, a step each frame.
+# Only LEDs that are still fading are visited by step(), and only LEDs that actually
+# changed are redrawn by render(), so a mostly still strip costs next to nothing.
+
+_MOVING = const(0b01)
+_CHANGED = const(0b10)
+
+
+class Fader:
+    def __init__(self, num_leds, up_speed=1, down_speed=None):
+        self.num_leds = num_leds
+        self.up_speed = up_speed
+        self.down_speed = up_speed if down_speed is None else down_speed
+        self.current = bytearray(num_leds * 3)
+        self.target = bytearray(num_leds * 3)
+        self._flags = bytearray(num_leds)
+        self._moving = array("H", [0] * num_leds)
+        self._moving_count = 0
+        self._changed = array("H", [0] * num_leds)
+        self._changed_count = 0
+        self._rest = None
+
+    def set_rest(self, r, g, b):
+        # Once an LED reaches its target, fade it back to this colour (eg: a background)
+        self._rest = (r, g, b)
+
+    def clear_rest(self):
+        self._rest = None
+
+    def set_target(self, index, r, g, b):
+        i = index * 3
+        target = self.target
+        target[i] = r
+        target[i + 1] = g
+        target[i + 2] = b
+        self._start(index)
+
+    def set_current(self, index, r, g, b):
+        # Jump straight to a colour, then carry on fading from there
+        i = index * 3
+        current = self.current
+        current[i] = r
+        current[i + 1] = g
+        current[i + 2] = b
+        self._mark_changed(index)
+        self._start(index)
+
+    def fill_target(self, r, g, b):
+        for index in range(self.num_leds):
+            self.set_target(index, r, g, b)
+
+    def get_current(self, index):
+        i = index * 3
+        return self.current[i], self.current[i + 1], self.current[i + 2]
+
+    def is_moving(self, index):
+        return bool(self._flags[index] & _MOVING)
+
+    @property
+    def moving(self):
+        return self._moving_count
+
+    def _start(self, index):
+        if self._flags[index] & _MOVING:
+            return
+        i = index * 3
+        current = self.current
+        target = self.target
+        if current[i] == target[i] and current[i + 1] == target[i + 1] and current[i + 2] == target[i + 2]:
+            return
+        self._flags[index] |= _MOVING
+        self._moving[self._moving_count] = index
+        self._moving_count += 1
+
+    def _mark_changed(self, index):
+        if self._flags[index] & _CHANGED:
+            return
+        self._flags[index] |= _CHANGED
+        self._changed[self._changed_count] = index
+        self._changed_count += 1
+
+    @micropython.native
+    def step(self):
+        # Move every fading LED one step closer to its target. Returns how many are still fading
+        current = self.current
+        target = self.target
+        flags = self._flags
+        moving = self._moving
+        changed = self._changed
+        up = self.up_speed
+        down = self.down_speed
+        rest = self._rest
+        changed_count = self._changed_count
+        count = self._moving_count
+        keep = 0
+
+        for n in range(count):
+            index = moving[n]
+            i = index * 3
+            settled = True
+            for c in range(i, i + 3):
+                cur = current[c]
+                tgt = target[c]
+                if cur < tgt:
+                    cur += up
+                    if cur > tgt:
+                        cur = tgt
+                elif cur > tgt:
+                    cur -= down
+                    if cur < tgt:
+                        cur = tgt
+                current[c] = cur
+                if cur != tgt:
+                    settled = False
+
+            if not flags[index] & _CHANGED:
+                flags[index] |= _CHANGED
+                changed[changed_count] = index
+                changed_count += 1
+
+            if settled and rest is not None and (target[i] != rest[0] or target[i + 1] != rest[1] or target[i + 2] != rest[2]):
+                target[i] = rest[0]
+                target[i + 1] = rest[1]
+                target[i + 2] = rest[2]
+                settled = current[i] == rest[0] and current[i + 1] == rest[1] and current[i + 2] == rest[2]
+
+            if settled:
+                flags[index] &= ~_MOVING
+            else:
+                moving[keep] = index
+                keep += 1
+
+        self._moving_count = keep
+        self._changed_count = changed_count
+        return keep
+
+    @micropython.native
+    def render(self, strip):
+        # Send only the LEDs that changed since the last render to a FrameBuffer or plasma strip
+        current = self.current
+        flags = self._flags
+        changed = self._changed
+        for n in range(self._changed_count):
+            index = changed[n]
+            i = index * 3
+            strip.set_rgb(index, current[i], current[i + 1], current[i + 2])
+            flags[index] &= ~_CHANGED
+        count = self._changed_count
+        self._changed_count = 0
+        return count
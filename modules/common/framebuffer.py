@@ -0,0 +1,323 @@
+import micropython
+from micropython import const
+
+from colourmath import hsv_to_rgb
+
+import plasma
+
+# Pixels are stored exactly as the plasma drivers hold them in memory:
+# four bytes per LED, with the white (WS2812) or start-of-frame/brightness (APA102)
+# byte first, followed by the three colour bytes in wire order.
+# A strip built with `buffer=framebuffer.buffer` can then be updated with one copy.
+# Writes are tracked as a dirty range of LEDs, so only the span that actually changed
+# is copied (or sent), and an unchanged frame isn't sent at all.
+BYTES_PER_PIXEL = const(4)
+
+BLEND_NORMAL = const(0)
+BLEND_ADD = const(1)
+BLEND_MULTIPLY = const(2)
+BLEND_MAX = const(3)
+
+APA102_SOF = const(0b11100000)
+
+# Byte offsets of the red, green and blue channels for each colour order,
+# mirroring how plasma's set_rgb() shuffles channels before storing them
+COLOR_ORDER_OFFSETS = {
+    plasma.COLOR_ORDER_RGB: (3, 2, 1),
+    plasma.COLOR_ORDER_RBG: (3, 1, 2),
+    plasma.COLOR_ORDER_GRB: (2, 3, 1),
+    plasma.COLOR_ORDER_GBR: (1, 3, 2),
+    plasma.COLOR_ORDER_BRG: (2, 1, 3),
+    plasma.COLOR_ORDER_BGR: (1, 2, 3),
+}
+
+
+class FrameBuffer:
+    def __init__(self, num_leds, rgbw=False, color_order=plasma.COLOR_ORDER_GRB, brightness=None):
+        if color_order not in COLOR_ORDER_OFFSETS:
+            raise ValueError("color_order is not valid")
+        if brightness is not None and rgbw:
+            raise ValueError("APA102 brightness cannot be combined with rgbw")
+
+        self.num_leds = num_leds
+        self.rgbw = rgbw
+        self.color_order = color_order
+        self._r, self._g, self._b = COLOR_ORDER_OFFSETS[color_order]
+
+        # `frame` is drawn into, `buffer` is what the strip sends out
+        self.frame = bytearray(num_leds * BYTES_PER_PIXEL)
+        self.buffer = bytearray(num_leds * BYTES_PER_PIXEL)
+        self._frame_mv = memoryview(self.frame)
+        self.strip = None
+
+        # LEDs written since the last push, as a range from _lo up to (not including) _hi
+        self._lo = 0
+        self._hi = num_leds
+        self._force = True  # send the first frame even if it's blank, to clear whatever was showing
+
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self.pixels_sent = 0
+        self.pixels_skipped = 0
+
+        # Everything sent out is dimmed by _scale / 256, without touching `frame` (see set_scale())
+        self._scale = 256
+
+        self._brightness = None
+        if brightness is not None:
+            self.set_brightness(brightness)
+
+    def __len__(self):
+        return self.num_leds
+
+    @property
+    def offsets(self):
+        # Byte offsets of red, green and blue within each pixel
+        return self._r, self._g, self._b
+
+    def ws2812(self, *args, **kwargs):
+        self.strip = plasma.WS2812(self.num_leds, *args, buffer=self.buffer, rgbw=self.rgbw, color_order=self.color_order, **kwargs)
+        return self.strip
+
+    def apa102(self, *args, **kwargs):
+        # APA102s always take their colours in the same order, whatever the frame buffer was made with
+        if self.color_order != plasma.COLOR_ORDER_RGB:
+            self._reorder(plasma.COLOR_ORDER_RGB)
+        if self._brightness is None:
+            self.set_brightness(15)
+        self.strip = plasma.APA102(self.num_leds, *args, buffer=self.buffer, **kwargs)
+        return self.strip
+
+    def _reorder(self, color_order):
+        # Move anything already drawn to where the new colour order keeps it
+        ro, go, bo = self._r, self._g, self._b
+        self.color_order = color_order
+        self._r, self._g, self._b = COLOR_ORDER_OFFSETS[color_order]
+        frame = self.frame
+        for i in range(0, len(frame), BYTES_PER_PIXEL):
+            r, g, b = frame[i + ro], frame[i + go], frame[i + bo]
+            frame[i + self._r] = r
+            frame[i + self._g] = g
+            frame[i + self._b] = b
+        self._force = True
+        self.mark_dirty()
+
+    def set_brightness(self, brightness):
+        brightness = min(31, max(0, int(brightness)))
+        self._brightness = brightness
+        sof = APA102_SOF | brightness
+        frame = self.frame
+        buffer = self.buffer
+        for i in range(0, len(frame), BYTES_PER_PIXEL):
+            frame[i] = sof
+            buffer[i] = sof
+        self._force = True
+        self.mark_dirty()
+
+    def set_scale(self, scale):
+        # Dim every LED that's sent out to scale / 256 (256 is full brightness), leaving the frame
+        # as it was drawn, eg: to keep within a power budget
+        scale = min(256, max(0, int(scale)))
+        if scale != self._scale:
+            self._scale = scale
+            self._force = True
+            self.mark_dirty()
+
+    def mark_dirty(self, start=0, end=None):
+        # Call after writing to `frame` directly, so push() knows to look at those LEDs
+        end = self.num_leds if end is None else min(end, self.num_leds)
+        if start < self._lo:
+            self._lo = max(0, start)
+        if end > self._hi:
+            self._hi = end
+
+    def set_rgb(self, index, r, g, b, w=0):
+        i = index * BYTES_PER_PIXEL
+        frame = self.frame
+        frame[i + self._r] = r
+        frame[i + self._g] = g
+        frame[i + self._b] = b
+        if self.rgbw:
+            frame[i] = w
+        if index < self._lo:
+            self._lo = index
+        if index >= self._hi:
+            self._hi = index + 1
+
+    def set_hsv(self, index, h, s=1.0, v=1.0):
+        r, g, b = hsv_to_rgb(h % 1.0, s, v)
+        self.set_rgb(index, int(r * 255), int(g * 255), int(b * 255))
+
+    def get_rgb(self, index):
+        i = index * BYTES_PER_PIXEL
+        frame = self.frame
+        if self.rgbw:
+            return frame[i + self._r], frame[i + self._g], frame[i + self._b], frame[i]
+        return frame[i + self._r], frame[i + self._g], frame[i + self._b]
+
+    def clear(self):
+        self.fill(0, 0, 0, 0)
+
+    def fill(self, r, g, b, w=0, start=0, end=None):
+        end = self.num_leds if end is None else min(end, self.num_leds)
+        if end <= start:
+            return
+        self.set_rgb(start, r, g, b, w)
+
+        # Grow the filled region by copying it onto itself, doubling each pass
+        mv = self._frame_mv
+        first = start * BYTES_PER_PIXEL
+        last = end * BYTES_PER_PIXEL
+        filled = BYTES_PER_PIXEL
+        while first + filled < last:
+            count = min(filled, last - first - filled)
+            mv[first + filled:first + filled + count] = mv[first:first + count]
+            filled += count
+        self.mark_dirty(start, end)
+
+    def gradient(self, start, end, start_rgb, end_rgb):
+        end = min(end, self.num_leds)
+        length = end - start
+        if length <= 0:
+            return
+        r1, g1, b1 = start_rgb[0], start_rgb[1], start_rgb[2]
+        dr = end_rgb[0] - r1
+        dg = end_rgb[1] - g1
+        db = end_rgb[2] - b1
+        steps = max(1, length - 1)
+        frame = self.frame
+        ro, go, bo = self._r, self._g, self._b
+        i = start * BYTES_PER_PIXEL
+        for step in range(length):
+            frame[i + ro] = r1 + dr * step // steps
+            frame[i + go] = g1 + dg * step // steps
+            frame[i + bo] = b1 + db * step // steps
+            i += BYTES_PER_PIXEL
+        self.mark_dirty(start, end)
+
+    def copy(self, source, source_start=0, start=0, count=None):
+        if source.color_order != self.color_order or source.rgbw != self.rgbw:
+            raise ValueError("source must share colour order and rgbw mode")
+        if count is None:
+            count = source.num_leds - source_start
+        count = min(count, source.num_leds - source_start, self.num_leds - start)
+        if count <= 0:
+            return
+        src = source_start * BYTES_PER_PIXEL
+        dst = start * BYTES_PER_PIXEL
+        self._frame_mv[dst:dst + count * BYTES_PER_PIXEL] = memoryview(source.frame)[src:src + count * BYTES_PER_PIXEL]
+        if self._brightness is not None:
+            # Don't let the source's APA102 brightness leak into this frame
+            sof = APA102_SOF | self._brightness
+            frame = self.frame
+            for i in range(dst, dst + count * BYTES_PER_PIXEL, BYTES_PER_PIXEL):
+                frame[i] = sof
+        self.mark_dirty(start, start + count)
+
+    def blend(self, layer, mode=BLEND_NORMAL, alpha=255):
+        if layer.num_leds != self.num_leds or layer.color_order != self.color_order or layer.rgbw != self.rgbw:
+            raise ValueError("layer must match length, colour order and rgbw mode")
+        # Scale alpha to 0-256 so that full opacity is an exact shift
+        alpha = min(255, max(0, int(alpha)))
+        alpha += alpha >> 7
+        self._blend(self.frame, layer.frame, len(self.frame), 0 if self.rgbw else 1, mode, alpha)
+        self.mark_dirty()
+
+    @micropython.native
+    def _blend(self, dst, src, length, first, mode, alpha):
+        inv = 256 - alpha
+        if mode == BLEND_ADD:
+            for p in range(0, length, 4):
+                for i in range(p + first, p + 4):
+                    a = dst[i] + ((src[i] * alpha) >> 8)
+                    dst[i] = 255 if a > 255 else a
+        elif mode == BLEND_MULTIPLY:
+            for p in range(0, length, 4):
+                for i in range(p + first, p + 4):
+                    a = dst[i]
+                    dst[i] = (a * inv + ((a * src[i] + 255) >> 8) * alpha) >> 8
+        elif mode == BLEND_MAX:
+            for p in range(0, length, 4):
+                for i in range(p + first, p + 4):
+                    a = dst[i]
+                    b = (src[i] * alpha) >> 8
+                    dst[i] = b if b > a else a
+        else:
+            for p in range(0, length, 4):
+                for i in range(p + first, p + 4):
+                    dst[i] = (dst[i] * inv + src[i] * alpha) >> 8
+
+    @micropython.native
+    def _scaled_copy(self, frame, buffer, first, last, channel, scale):
+        for p in range(first, last, 4):
+            # The first byte is white (scaled with the rest) or APA102 brightness (copied as is)
+            buffer[p] = frame[p]
+            for i in range(p + channel, p + 4):
+                buffer[i] = (frame[i] * scale) >> 8
+
+    @micropython.native
+    def _first_change(self, frame, buffer, lo, hi):
+        i = lo * BYTES_PER_PIXEL
+        end = hi * BYTES_PER_PIXEL
+        while i < end and frame[i] == buffer[i]:
+            i += 1
+        return i // BYTES_PER_PIXEL
+
+    @micropython.native
+    def _last_change(self, frame, buffer, lo, hi):
+        i = hi * BYTES_PER_PIXEL - 1
+        end = lo * BYTES_PER_PIXEL
+        while i >= end and frame[i] == buffer[i]:
+            i -= 1
+        return i // BYTES_PER_PIXEL + 1
+
+    def push(self, strip=None):
+        # Copy the frame into `buffer` if any LEDs changed since the last push, and return how many did.
+        # With no strip given, `buffer` must be the strip's own memory (see ws2812() and apa102()).
+        # Setting the same colour again doesn't count as a change
+        lo = self._lo
+        hi = self._hi
+        scale = self._scale
+        # While dimmed, `buffer` no longer matches `frame`, so there's nothing to compare against
+        if not self._force and lo < hi and scale == 256:
+            lo = self._first_change(self.frame, self.buffer, lo, hi)
+            if lo < hi:
+                hi = self._last_change(self.frame, self.buffer, lo, hi)
+        self._lo = self.num_leds
+        self._hi = 0
+        self._force = False
+
+        count = hi - lo if hi > lo else 0
+        self.pixels_skipped += self.num_leds - count
+        if count == 0:
+            self.frames_skipped += 1
+            return 0
+        self.frames_sent += 1
+        self.pixels_sent += count
+
+        first = lo * BYTES_PER_PIXEL
+        last = hi * BYTES_PER_PIXEL
+        if scale == 256:
+            # Outside the LEDs that changed the two already match, so copying the whole frame
+            # sends the same thing. It's one memcpy either way, and unlike a slice of `frame`,
+            # doesn't need a new memoryview every frame
+            self.buffer[:] = self.frame
+        else:
+            self._scaled_copy(self.frame, self.buffer, first, last, 0 if self.rgbw else 1, scale)
+
+        if strip is not None:
+            # Fall back to per-pixel updates for strips that own their own buffer
+            for i in range(lo, hi):
+                strip.set_rgb(i, *self.get_rgb(i))
+        return count
+
+    def update(self):
+        # For a strip that hasn't been start()ed: push, and only send the frame out if it changed
+        count = self.push()
+        if count:
+            self.strip.update()
+        return count
+
+    def stats(self):
+        return {"frames_sent": self.frames_sent, "frames_skipped": self.frames_skipped,
+                "pixels_sent": self.pixels_sent, "pixels_skipped": self.pixels_skipped}
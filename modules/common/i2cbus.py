@@ -0,0 +1,134 @@
+import time
+
+from machine import I2C
+
+# Shares one I2C bus between the breakouts an example reads, so that reading them doesn't
+# eat into the time for drawing frames. Each device is read as often as it asks to be, the
+# reads that are due are spread out so no frame spends more than `budget_us` on the bus, and
+# the latest reading is kept for the renderer to use whenever it likes. It also times every
+# read, so it's easy to see which device is taking the time.
+
+
+class Device:
+    def __init__(self, name, read, interval_ms):
+        self.name = name
+        self.read = read
+        self.interval_ms = interval_ms
+        self.value = None
+        self.fresh = False   # True if the value was read at the last poll()
+        self.due = time.ticks_ms()
+
+        self.reads = 0
+        self.errors = 0
+        self.deferred = 0    # times it was due, but held over to keep within the budget
+        self.total_us = 0
+        self.max_us = 0
+        self.cost_us = 0     # how long a read usually takes, to plan with
+        self.polled = -1     # the poll() it was last read at
+
+    def mean_us(self):
+        return self.total_us // self.reads if self.reads else 0
+
+    def stats(self):
+        return {"reads": self.reads, "errors": self.errors, "deferred": self.deferred,
+                "mean_us": self.mean_us(), "max_us": self.max_us, "total_us": self.total_us}
+
+
+class I2CBus:
+    def __init__(self, i2c=None, budget_us=2000):
+        # `i2c` is the bus to share (a machine.I2C() is made if it's not given). Pass it on to the
+        # breakouts, then add() a way to read each one
+        self.i2c = I2C() if i2c is None else i2c
+        self.budget_us = budget_us
+        self.devices = []
+        self.polls = 0
+        self.last_us = 0     # time spent on the bus at the last poll()
+        self.max_us = 0
+
+    def add(self, name, read, interval_ms=100):
+        # `read()` is called every `interval_ms`, and whatever it returns is kept as the device's
+        # value. Returns the Device, eg: bme = bus.add("bme", sensor.read, 1000) then bme.value
+        device = Device(name, read, interval_ms)
+        self.devices.append(device)
+        return device
+
+    def __getitem__(self, name):
+        for device in self.devices:
+            if device.name == name:
+                return device
+        raise KeyError(name)
+
+    def value(self, name):
+        return self[name].value
+
+    def poll(self):
+        # Call once a frame. Reads the devices that are due, most overdue first, until the budget
+        # for this frame is spent (though always at least one, so none of them is starved).
+        # Returns how many were read
+        now = time.ticks_ms()
+        this_pass = self.polls
+        self.polls += 1
+        for device in self.devices:
+            device.fresh = False
+
+        spent = 0
+        count = 0
+        while True:
+            device = self._most_overdue(now, this_pass)
+            if device is None:
+                break
+            if count and spent + device.cost_us > self.budget_us:
+                # Leave this and the rest for the next frame
+                for waiting in self.devices:
+                    if waiting.polled != this_pass and time.ticks_diff(now, waiting.due) >= 0:
+                        waiting.deferred += 1
+                break
+            spent += self._read(device, now, this_pass)
+            count += 1
+
+        self.last_us = spent
+        if spent > self.max_us:
+            self.max_us = spent
+        return count
+
+    def _most_overdue(self, now, this_pass):
+        found = None
+        latest = -1
+        for device in self.devices:
+            if device.polled == this_pass:
+                continue
+            late = time.ticks_diff(now, device.due)
+            if late > latest:
+                found = device
+                latest = late
+        return found
+
+    def _read(self, device, now, this_pass):
+        device.polled = this_pass
+        start = time.ticks_us()
+        try:
+            device.value = device.read()
+            device.fresh = True
+        except OSError:
+            # Not answering (unplugged, or busy) - keep the last reading and try again next time
+            device.errors += 1
+        took = time.ticks_diff(time.ticks_us(), start)
+
+        device.reads += 1
+        device.total_us += took
+        if took > device.max_us:
+            device.max_us = took
+        if device.reads == 1:
+            device.cost_us = took
+        else:
+            device.cost_us += (took - device.cost_us) >> 2
+
+        # Keep to the interval, unless it's fallen a whole interval behind
+        device.due = time.ticks_add(device.due, device.interval_ms)
+        if time.ticks_diff(now, device.due) >= 0:
+            device.due = time.ticks_add(now, device.interval_ms)
+        return took
+
+    def stats(self):
+        # Per device counts and bus time, to see what's eating into each frame
+        return {device.name: device.stats() for device in self.devices}
@@ -0,0 +1,147 @@
+import math
+from array import array
+
+import micropython
+
+# Where the LEDs are, for effects that think in space rather than along the strip: rings
+# spreading out from a point, snow falling by height, colours turning around a bottle.
+# Positions are whole numbers, and everything an effect needs from them (each LED's
+# distance, height or angle, scaled from 0 to 255) is worked out once, up front, into
+# tables that can go straight to Palette.apply(), so there's no geometry to do each frame.
+
+X = 0
+Y = 1
+Z = 2
+
+
+class Layout:
+    def __init__(self, positions):
+        # `positions` is an (x, y) or (x, y, z) for each LED, in order along the strip
+        count = len(positions)
+        self.num_leds = count
+        self.x = array("i", [0] * count)
+        self.y = array("i", [0] * count)
+        self.z = array("i", [0] * count)
+        for i, position in enumerate(positions):
+            self.x[i] = position[0]
+            self.y[i] = position[1]
+            if len(position) > 2:
+                self.z[i] = position[2]
+        self.low = tuple(min(axis) if count else 0 for axis in self.axes())
+        self.high = tuple(max(axis) if count else 0 for axis in self.axes())
+        self._build_lookup()
+
+    def __len__(self):
+        return self.num_leds
+
+    def axes(self):
+        return self.x, self.y, self.z
+
+    def _build_lookup(self):
+        # Flat layouts that fill most of their rectangle (grids, near enough) get a table, so
+        # index() doesn't allocate. Anything else gets a dict
+        width = self.high[X] - self.low[X] + 1
+        height = self.high[Y] - self.low[Y] + 1
+        self.grid = None
+        self._lookup = None
+        if self.low[Z] == self.high[Z] and width * height <= 2 * self.num_leds:
+            self.grid = array("h", [-1] * (width * height))
+            for i in range(self.num_leds - 1, -1, -1):
+                self.grid[(self.y[i] - self.low[Y]) * width + self.x[i] - self.low[X]] = i
+            self._width = width
+            self._height = height
+        else:
+            self._lookup = {}
+            for i in range(self.num_leds - 1, -1, -1):
+                self._lookup[(self.x[i], self.y[i], self.z[i])] = i
+
+    def position(self, index):
+        return self.x[index], self.y[index], self.z[index]
+
+    def index(self, x, y, z=0):
+        # The LED at a position, or -1 if there isn't one
+        if self.grid is None:
+            return self._lookup.get((x, y, z), -1)
+        x -= self.low[X]
+        y -= self.low[Y]
+        if z != self.low[Z] or not (0 <= x < self._width and 0 <= y < self._height):
+            return -1
+        return self.grid[y * self._width + x]
+
+    def levels(self, axis=Y, reverse=False):
+        # How far along an axis each LED is, from 0 (the lowest) to 255 (the highest)
+        values = self.axes()[axis]
+        low = self.low[axis]
+        span = max(1, self.high[axis] - low)
+        table = bytearray(self.num_leds)
+        for i in range(self.num_leds):
+            level = (values[i] - low) * 255 // span
+            table[i] = 255 - level if reverse else level
+        return table
+
+    def distances(self, x, y, z=0, reach=None):
+        # How far each LED is from a point, from 0 (at the point) to 255 (`reach` away, or
+        # the furthest LED if that's not given)
+        found = [math.sqrt((self.x[i] - x) ** 2 + (self.y[i] - y) ** 2 + (self.z[i] - z) ** 2) for i in range(self.num_leds)]
+        reach = max(found) if reach is None else reach
+        scale = 255 / reach if reach else 0
+        table = bytearray(self.num_leds)
+        for i, distance in enumerate(found):
+            table[i] = min(255, int(distance * scale + 0.5))
+        return table
+
+    def angles(self, x=0, y=0, z=0):
+        # How far around each LED is, from 0 to 255 for a full turn: around the point (x, y) for
+        # flat layouts, or around the upright line through (x, z), like the middle of a bottle
+        if self.low[Z] == self.high[Z]:
+            across, centre = self.y, y
+        else:
+            across, centre = self.z, z
+        table = bytearray(self.num_leds)
+        for i in range(self.num_leds):
+            angle = math.atan2(across[i] - centre, self.x[i] - x)
+            table[i] = int(angle * 128 / math.pi) & 0xFF
+        return table
+
+    def order(self, axis=Y):
+        # The LEDs' indexes, from lowest to highest along an axis
+        values = self.axes()[axis]
+        return array("H", sorted(range(self.num_leds), key=lambda i: values[i]))
+
+
+def matrix(width, height, serpentine=False, columns=False):
+    # A grid, with the first LED at (0, 0). The strip runs along rows (or down columns), and
+    # a serpentine strip doubles back at the end of each one rather than starting the next
+    # from the same side
+    positions = []
+    lines, length = (width, height) if columns else (height, width)
+    for line in range(lines):
+        for step in range(length):
+            if serpentine and line & 1:
+                step = length - 1 - step
+            positions.append((line, step) if columns else (step, line))
+    return Layout(positions)
+
+
+def spiral(num_leds, per_turn, pitch=1, spacing=16):
+    # A strip wound around a bottle (or tree), from the bottom up, with `per_turn` LEDs in each
+    # turn and each turn `pitch` LEDs' worth above the last. `spacing` is how far apart
+    # neighbouring LEDs are, in the layout's units. The middle of the bottle is x = 0, z = 0
+    radius = per_turn * spacing / (2 * math.pi)
+    positions = []
+    for i in range(num_leds):
+        angle = 2 * math.pi * i / per_turn
+        positions.append((
+            round(math.cos(angle) * radius),
+            i * pitch * spacing // per_turn,
+            round(math.sin(angle) * radius),
+        ))
+    return Layout(positions)
+
+
+@micropython.native
+def shift(buf, table, offset):
+    # Fill a bytearray with a table's values plus `offset`, wrapping around past 255, for
+    # moving rings, bands or turns along a layout each frame
+    for i in range(len(buf)):
+        buf[i] = (table[i] + offset) & 0xFF
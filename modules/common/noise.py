@@ -0,0 +1,166 @@
+import math
+from array import array
+from random import getrandbits
+
+import micropython
+from micropython import const
+
+# Cheap randomness for effects. random.random() and uniform() allocate a float on every
+# call, which adds up fast at a few hundred LEDs and sixty frames a second. These stick
+# to small integers, fill whole buffers at once, and (with Sampler) only visit the LEDs
+# that are picked, so a sparse effect on a long strip costs next to nothing.
+
+_MASK = const(0xFFFF)
+_SAMPLER_STEPS = const(256)
+
+
+class Random:
+    # A 16-bit xorshift generator (https://doi.org/10.18637/jss.v008.i14, triple 7, 9, 8).
+    # Its numbers are small ints, so drawing one never allocates. Not for anything secret!
+    def __init__(self, seed=None):
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        if seed is None:
+            seed = getrandbits(16)
+        # Zero would get stuck at zero forever
+        self.state = (seed & _MASK) or 0xACE1
+
+    @micropython.native
+    def next(self):
+        # A number from 1 to 65535
+        x = self.state
+        x ^= (x << 7) & _MASK
+        x ^= x >> 9
+        x ^= (x << 8) & _MASK
+        self.state = x
+        return x
+
+    @micropython.native
+    def below(self, n):
+        # A number from 0 to n - 1, for n up to 16384
+        x = self.state
+        x ^= (x << 7) & _MASK
+        x ^= x >> 9
+        x ^= (x << 8) & _MASK
+        self.state = x
+        return (x * n) >> 16
+
+    @micropython.native
+    def fill(self, buf, lo=0, hi=256):
+        # Fill a bytearray (or array) with numbers from lo to hi - 1, for ranges up to 16384
+        span = hi - lo
+        x = self.state
+        for i in range(len(buf)):
+            x ^= (x << 7) & _MASK
+            x ^= x >> 9
+            x ^= (x << 8) & _MASK
+            buf[i] = lo + ((x * span) >> 16)
+        self.state = x
+
+
+class Sampler:
+    # Picks which of `num_leds` LEDs fire this frame, each with probability `chance`.
+    # Rather than rolling for every LED, it jumps straight from one hit to the next by
+    # drawing the length of each gap, so it takes time in proportion to the hits alone.
+    def __init__(self, num_leds, chance, rng=None):
+        self.num_leds = num_leds
+        self.rng = Random() if rng is None else rng
+        self.hits = array("H", [0] * num_leds)
+        self._gaps = array("I", [0] * (_SAMPLER_STEPS + 1))
+        self.set_chance(chance)
+
+    def set_chance(self, chance):
+        # Gaps between hits follow a geometric distribution: a random number u gives a gap
+        # of log(u) / log(1 - chance). Work that out (in 1/256ths) for evenly spaced u now,
+        # so sample() only has to interpolate between them
+        self.chance = chance
+        if not 0 < chance < 1:
+            return
+        scale = 256 / math.log(1 - chance)
+        gaps = self._gaps
+        for k in range(1, _SAMPLER_STEPS + 1):
+            gaps[k] = min(0x3FFFFFFF, int(math.log(k / _SAMPLER_STEPS) * scale))
+        # Below the first step the gap is at least gaps[1], plus another gap like any other
+        gaps[0] = gaps[1]
+
+    @micropython.native
+    def sample(self):
+        # Work out this frame's hits, which are put in order at the start of self.hits.
+        # Returns how many there are
+        num_leds = self.num_leds
+        hits = self.hits
+        chance = self.chance
+        if chance <= 0:
+            return 0
+        if chance >= 1:
+            for i in range(num_leds):
+                hits[i] = i
+            return num_leds
+
+        gaps = self._gaps
+        rng = self.rng
+        count = 0
+        index = 0
+        while True:
+            gap = 0
+            x = rng.next()
+            k = x >> 8
+            while k == 0:
+                # Gaps don't remember how long they've been, so a very long one is a long
+                # gap followed by a fresh one
+                gap += gaps[0]
+                x = rng.next()
+                k = x >> 8
+            a = gaps[k]
+            gap += a - (((a - gaps[k + 1]) * (x & 0xFF)) >> 8)
+            index += gap >> 8
+            if index >= num_leds:
+                return count
+            hits[count] = index
+            count += 1
+            index += 1
+
+
+class Noise:
+    # Smooth 1D noise, for flicker that wanders rather than jumps. Positions are fixed point,
+    # with 256 to each step of the underlying random lattice (which repeats every 256 steps),
+    # and results are from 0 to 255
+    def __init__(self, seed=None):
+        rng = Random(seed)
+        self.lattice = bytearray(256)
+        rng.fill(self.lattice)
+        # Smoothstep, 3t^2 - 2t^3, from 0 to 256
+        self.fade = array("H", [(t * t * (768 - 2 * t)) >> 16 for t in range(256)])
+
+    @micropython.native
+    def value(self, x):
+        # Value noise: random levels on the lattice, eased between
+        lattice = self.lattice
+        cell = (x >> 8) & 0xFF
+        a = lattice[cell]
+        b = lattice[(cell + 1) & 0xFF]
+        return a + (((b - a) * self.fade[x & 0xFF]) >> 8)
+
+    @micropython.native
+    def perlin(self, x):
+        # Perlin (gradient) noise: random slopes on the lattice, so it passes through the
+        # middle at every step and has fewer flat spots than value noise
+        lattice = self.lattice
+        cell = (x >> 8) & 0xFF
+        f = x & 0xFF
+        n0 = (lattice[cell] - 128) * f
+        n1 = (lattice[(cell + 1) & 0xFF] - 128) * (f - 256)
+        n = 128 + ((n0 + (((n1 - n0) * self.fade[f]) >> 8)) >> 7)
+        if n < 0:
+            return 0
+        if n > 255:
+            return 255
+        return n
+
+    @micropython.native
+    def fill(self, buf, x, step=256, perlin=False):
+        # Fill a bytearray with noise at x, x + step, x + 2 * step...
+        for i in range(len(buf)):
+            buf[i] = self.perlin(x) if perlin else self.value(x)
+            x += step
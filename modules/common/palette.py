@@ -0,0 +1,140 @@
+import micropython
+from colourmath import hsv_to_rgb
+from micropython import const
+
+PALETTE_SIZE = const(256)
+DEFAULT_GAMMA = 2.2
+
+
+def gamma_table(gamma=DEFAULT_GAMMA):
+    # Maps linear 0-255 brightness onto perceptually even steps
+    table = bytearray(PALETTE_SIZE)
+    for i in range(PALETTE_SIZE):
+        table[i] = int(pow(i / 255, gamma) * 255 + 0.5)
+    return table
+
+
+class Palette:
+    def __init__(self, colours=None, gamma=None):
+        # 256 packed RGB entries. Gamma correction is applied once, here, rather than per LED
+        self.colours = bytearray(PALETTE_SIZE * 3)
+        if colours is not None:
+            self.colours[:] = colours
+        if gamma is not None:
+            table = gamma_table(gamma)
+            c = self.colours
+            for i in range(len(c)):
+                c[i] = table[c[i]]
+
+    def lookup(self, index):
+        i = min(255, max(0, int(index))) * 3
+        c = self.colours
+        return c[i], c[i + 1], c[i + 2]
+
+    def set(self, fb, led, index):
+        i = min(255, max(0, int(index))) * 3
+        c = self.colours
+        fb.set_rgb(led, c[i], c[i + 1], c[i + 2])
+
+    def fill(self, fb, index, start=0, end=None):
+        i = min(255, max(0, int(index))) * 3
+        c = self.colours
+        fb.fill(c[i], c[i + 1], c[i + 2], 0, start, end)
+
+    def apply(self, fb, indexes, start=0):
+        # Write one palette entry per LED, where `indexes` is a bytearray (or list) of 0-255 values
+        count = min(len(indexes), fb.num_leds - start)
+        if count > 0:
+            ro, go, bo = fb.offsets
+            self._apply(fb.frame, self.colours, indexes, start * 4, count, ro, go, bo)
+            fb.mark_dirty(start, start + count)
+
+    @micropython.native
+    def _apply(self, frame, colours, indexes, first, count, ro, go, bo):
+        p = first
+        for n in range(count):
+            c = indexes[n] * 3
+            frame[p + ro] = colours[c]
+            frame[p + go] = colours[c + 1]
+            frame[p + bo] = colours[c + 2]
+            p += 4
+
+
+def hue_ramp(hue, saturation=1.0, gamma=DEFAULT_GAMMA):
+    # A single hue, from off (index 0) to full brightness (index 255)
+    return hsv_ramp(hue, hue, saturation, 0.0, 1.0, gamma)
+
+
+def hsv_ramp(start_hue, end_hue, saturation=1.0, start_value=1.0, end_value=1.0, gamma=DEFAULT_GAMMA):
+    colours = bytearray(PALETTE_SIZE * 3)
+    for i in range(PALETTE_SIZE):
+        t = i / (PALETTE_SIZE - 1)
+        h = (start_hue + (end_hue - start_hue) * t) % 1.0
+        v = start_value + (end_value - start_value) * t
+        r, g, b = hsv_to_rgb(h, saturation, v)
+        colours[i * 3] = int(r * 255)
+        colours[i * 3 + 1] = int(g * 255)
+        colours[i * 3 + 2] = int(b * 255)
+    return Palette(colours, gamma)
+
+
+def gradient(stops, gamma=DEFAULT_GAMMA):
+    # `stops` is a list of (index, (r, g, b)) pairs, in index order, from 0 to 255
+    colours = bytearray(PALETTE_SIZE * 3)
+    for s in range(len(stops) - 1):
+        start, start_rgb = stops[s]
+        end, end_rgb = stops[s + 1]
+        span = max(1, end - start)
+        for i in range(start, end + 1):
+            for c in range(3):
+                colours[i * 3 + c] = start_rgb[c] + (end_rgb[c] - start_rgb[c]) * (i - start) // span
+    return Palette(colours, gamma)
+
+
+class PaletteCache:
+    # Keeps the most recently used palettes, discarding the least recently used
+    # once `max_palettes` is reached (each palette costs 768 bytes)
+    def __init__(self, max_palettes=4):
+        if max_palettes < 1:
+            raise ValueError("max_palettes must be at least 1")
+        self.max_palettes = max_palettes
+        self._palettes = {}
+        self._order = []
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._order)
+
+    def __contains__(self, key):
+        return key in self._palettes
+
+    def get(self, key, builder=None, *args, **kwargs):
+        # Return the palette stored under `key`, calling `builder(*args, **kwargs)` to create it if needed
+        if key in self._palettes:
+            self.hits += 1
+            self._order.remove(key)
+            self._order.append(key)
+            return self._palettes[key]
+
+        if builder is None:
+            raise KeyError(key)
+
+        self.misses += 1
+        palette = builder(*args, **kwargs)
+        self.put(key, palette)
+        return palette
+
+    def put(self, key, palette):
+        if key in self._palettes:
+            self._order.remove(key)
+        while len(self._order) >= self.max_palettes:
+            del self._palettes[self._order.pop(0)]
+            self.evictions += 1
+        self._palettes[key] = palette
+        self._order.append(key)
+
+    def clear(self):
+        self._palettes = {}
+        self._order = []
@@ -1,6 +1,8 @@
 import time
+from array import array
 
-from machine import ADC, PWM, Pin
+import micropython
+from machine import ADC, PWM, Pin, Timer
 
 BREAKOUT_GARDEN_I2C_PINS = {"sda": 4, "scl": 5}
 PICO_EXPLORER_I2C_PINS = {"sda": 20, "scl": 21}
@@ -17,20 +19,90 @@ PICO_EXPLORER_SPI_ONBOARD = 2
 
 
 class Analog:
-    def __init__(self, pin, amplifier_gain=1, resistor=0, offset=0):
+    def __init__(self, pin, amplifier_gain=1, resistor=0, offset=0, samples=1, median=False):
+        # Each read takes `samples` readings in a burst and averages them (or takes their median,
+        # which ignores the odd wild reading), to calm down a noisy input
         self.gain = amplifier_gain
         self.resistor = resistor
         self.offset = offset
         self.pin = ADC(pin)
+        self.median = median
+        self._burst = array("H", [0] * max(1, samples))
+        self._ring = None
+        self._timer = None
+
+    def read_raw(self):
+        # A filtered read_u16(), from 0 to 65535
+        if self._ring is not None:
+            return self._filtered()
+        burst = self._burst
+        pin = self.pin
+        for i in range(len(burst)):
+            burst[i] = pin.read_u16()
+        return _median(burst, len(burst)) if self.median else _mean(burst, len(burst))
 
     def read_voltage(self):
-        return max((((self.pin.read_u16() * 3.3) / 65535) + self.offset) / self.gain, 0.0)
+        return max((((self.read_raw() * 3.3) / 65535) + self.offset) / self.gain, 0.0)
 
     def read_current(self):
         if self.resistor > 0:
             return self.read_voltage() / self.resistor
         return self.read_voltage()
 
+    def start(self, rate=100, size=16):
+        # Keep sampling in the background, `rate` times a second, into a ring of the last `size`
+        # readings. Reads then filter those, rather than waiting on the ADC
+        self.stop()
+        self._ring = array("H", [self.pin.read_u16()] * size)
+        self._sorted = array("H", self._ring)
+        self._next = 0
+        self._sum = self._ring[0] * size
+        self._timer = Timer(freq=rate, callback=self._sample)
+
+    def stop(self):
+        if self._timer is not None:
+            self._timer.deinit()
+            self._timer = None
+        self._ring = None
+
+    def _sample(self, _timer):
+        ring = self._ring
+        if ring is None:
+            return
+        i = self._next
+        value = self.pin.read_u16()
+        self._sum += value - ring[i]
+        ring[i] = value
+        self._next = i + 1 if i + 1 < len(ring) else 0
+
+    def _filtered(self):
+        ring = self._ring
+        if not self.median:
+            return self._sum // len(ring)
+        self._sorted[:] = ring
+        return _median(self._sorted, len(ring))
+
+
+@micropython.native
+def _mean(values, count):
+    total = 0
+    for i in range(count):
+        total += values[i]
+    return total // count
+
+
+@micropython.native
+def _median(values, count):
+    # Sorts `values` in place (insertion sort, as there are only a few)
+    for i in range(1, count):
+        v = values[i]
+        j = i - 1
+        while j >= 0 and values[j] > v:
+            values[j + 1] = values[j]
+            j -= 1
+        values[j + 1] = v
+    return values[count // 2]
+
 
 class AnalogMux:
     def __init__(self, addr0, addr1=None, addr2=None, en=None, muxed_pin=None):
@@ -136,6 +208,147 @@ class Button:
         return self.raw()
 
 
+class IRQButton(Button):
+    # A Button that's watched by an interrupt, so no press is missed however short it is, or
+    # however rarely it's checked. Each edge is timestamped into a ring as it happens, and
+    # turned into events (debounced, with holds and repeats added) when they're asked for.
+    # Take events with get() (or `async for event in button`), or just use read() as before
+    NONE = 0
+    PRESS = 1
+    RELEASE = 2
+    HOLD = 3
+    REPEAT = 4
+
+    def __init__(self, button, invert=True, repeat_time=200, hold_time=1000, debounce_ms=20, size=16):
+        super().__init__(button, invert, repeat_time, hold_time)
+        self.debounce_ms = debounce_ms
+        self.dropped = 0  # edges that came while the ring was full
+
+        # Edges as they happened: when, and whether the button was pressed afterwards
+        self._edge_times = array("i", [0] * size)
+        self._edge_states = bytearray(size)
+        self._edge_head = 0
+        self._edge_tail = 0
+
+        # Events waiting to be taken, and when each happened
+        self._events = bytearray(size)
+        self._event_times = array("i", [0] * size)
+        self._event_head = 0
+        self._event_tail = 0
+        self.event_time = 0  # when the event get() last returned happened
+
+        self._state = self.raw()
+        self._changed = time.ticks_add(time.ticks_ms(), -debounce_ms)
+        self._bounced = self._changed
+        self._held = False
+        self._next_repeat = 0
+        self.pin.irq(handler=self._edge, trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING)
+
+    def _edge(self, pin):
+        head = self._edge_head
+        following = head + 1 if head + 1 < len(self._edge_states) else 0
+        if following == self._edge_tail:
+            self.dropped += 1
+            return
+        self._edge_times[head] = time.ticks_ms()
+        self._edge_states[head] = pin.value() ^ self.invert
+        self._edge_head = following
+
+    def _add(self, event, when):
+        head = self._event_head
+        following = head + 1 if head + 1 < len(self._events) else 0
+        if following == self._event_tail:
+            return
+        self._events[head] = event
+        self._event_times[head] = when
+        self._event_head = following
+
+    def _change(self, state, when):
+        self._state = state
+        self._changed = when
+        if state:
+            self._held = False
+            self._next_repeat = time.ticks_add(when, self.repeat_time)
+            self._add(IRQButton.PRESS, when)
+        else:
+            self._add(IRQButton.RELEASE, when)
+
+    def poll(self):
+        # Turn the edges so far into events. get() and read() do this themselves
+        size = len(self._edge_states)
+        while self._edge_tail != self._edge_head:
+            tail = self._edge_tail
+            when = self._edge_times[tail]
+            state = self._edge_states[tail]
+            self._edge_tail = tail + 1 if tail + 1 < size else 0
+            # Ignore bounces: edges that don't change anything, or come too soon after one that did
+            if state != self._state and time.ticks_diff(when, self._changed) >= self.debounce_ms:
+                self._change(state, when)
+            else:
+                self._bounced = when
+
+        now = time.ticks_ms()
+        settled = time.ticks_add(self._changed, self.debounce_ms)
+        if time.ticks_diff(now, settled) >= 0:
+            # The last edge may have been taken for a bounce, so check the button has ended up as we think
+            state = self.raw()
+            if state != self._state:
+                self._change(state, self._bounced if time.ticks_diff(self._bounced, settled) > 0 else settled)
+
+        if self._state:
+            hold_at = time.ticks_add(self._changed, self.hold_time)
+            if self.repeat_time > 0:
+                while time.ticks_diff(now, self._next_repeat) >= 0:
+                    self._hold(hold_at, self._next_repeat)
+                    self._add(IRQButton.REPEAT, self._next_repeat)
+                    # Repeat faster once held, like Button
+                    rate = self.repeat_time // 3 if self._held else self.repeat_time
+                    self._next_repeat = time.ticks_add(self._next_repeat, rate)
+            self._hold(hold_at, now)
+
+    def _hold(self, hold_at, now):
+        if not self._held and self.hold_time > 0 and time.ticks_diff(now, hold_at) >= 0:
+            self._held = True
+            self._add(IRQButton.HOLD, hold_at)
+
+    def get(self):
+        # The next event, or NONE if there isn't one. It happened at self.event_time
+        self.poll()
+        tail = self._event_tail
+        if tail == self._event_head:
+            return IRQButton.NONE
+        self.event_time = self._event_times[tail]
+        self._event_tail = tail + 1 if tail + 1 < len(self._events) else 0
+        return self._events[tail]
+
+    def read(self):
+        # True if the button has been pressed (or has repeated) since last time, however briefly.
+        # Any other events are let go, so use either this or get(), not both
+        while True:
+            event = self.get()
+            if event == IRQButton.NONE:
+                return False
+            if event == IRQButton.PRESS or event == IRQButton.REPEAT:
+                return True
+
+    def clear(self):
+        self.poll()
+        self._event_tail = self._event_head
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        # Waits for the next event, checking every 10ms. asyncio is only imported here, so
+        # code that never waits on a button doesn't pay for it
+        import asyncio
+        while True:
+            event = self.get()
+            if event != IRQButton.NONE:
+                return event
+            await asyncio.sleep_ms(10)
+
+
 class RGBLED:
     def __init__(self, r="LED_R", g="LED_G", b="LED_B", invert=True):
         self.invert = invert
@@ -0,0 +1,103 @@
+import micropython
+from micropython import const
+
+# Keeps a strip's current draw within what its supply can give, by working out how much
+# each frame will draw before it's sent and dimming the whole frame (with FrameBuffer.set_scale())
+# if it's over. The estimate is a sum of every channel's brightness, so it's one pass over the
+# frame - cheap enough for every frame. On a Plasma 2040, the current sense can keep the estimate
+# honest: what it measures is compared with what was expected, and the difference (smoothed)
+# corrects later estimates.
+
+_FULL = const(256)
+_SMOOTHING = const(3)        # each reading moves the correction 1/8th of the way
+_CORRECTION_MIN = const(192)  # the estimate is trusted to within 0.75x...
+_CORRECTION_MAX = const(512)  # ...and 2x of what's measured
+
+
+@micropython.native
+def _channel_sums(frame, sums, first):
+    # Add up every LED's bytes, by position within the pixel (starting at `first`, to skip APA102 brightness)
+    s0 = 0
+    s1 = 0
+    s2 = 0
+    s3 = 0
+    for p in range(0, len(frame), 4):
+        s0 += frame[p]
+        s1 += frame[p + 1]
+        s2 += frame[p + 2]
+        s3 += frame[p + 3]
+    sums[0] = s0 if first == 0 else 0
+    sums[1] = s1
+    sums[2] = s2
+    sums[3] = s3
+
+
+class Governor:
+    def __init__(self, fb, limit_ma, channel_ma=(20, 20, 20, 20), idle_ma=1, sense=None):
+        # `limit_ma` is the most the strip should draw. `channel_ma` is how much one LED's red,
+        # green, blue (and white) draws at full brightness, and `idle_ma` how much it draws when off.
+        # `sense` is an optional pimoroni.Analog reading the strip's current, eg: on a Plasma 2040:
+        # Analog("CURRENT_SENSE", 50, 0.015)
+        self.fb = fb
+        self.limit_ma = limit_ma
+        self.idle_ma = idle_ma * fb.num_leds
+        self.sense = sense
+        ro, go, bo = fb.offsets
+        # mA at full brightness for each byte of a pixel: white (or nothing) first, then wire order
+        self._weights = [channel_ma[3] if fb.rgbw and len(channel_ma) > 3 else 0, 0, 0, 0]
+        self._weights[ro] = channel_ma[0]
+        self._weights[go] = channel_ma[1]
+        self._weights[bo] = channel_ma[2]
+        self._first = 0 if fb.rgbw else 1
+        self._sums = [0, 0, 0, 0]
+
+        self.correction = _FULL   # measured / estimated, out of 256
+        self.scale = _FULL
+        self.estimated_ma = 0     # what the frame's LEDs would draw at full brightness (less idle_ma)
+        self.sent_ma = 0          # the same, for the last frame sent, as dimmed
+        self.measured_ma = 0
+
+    def estimate(self):
+        # How much the frame as drawn would draw undimmed, in mA (before correction). APA102
+        # brightness isn't taken into account, so they're assumed to be at full
+        sums = self._sums
+        weights = self._weights
+        _channel_sums(self.fb.frame, sums, self._first)
+        lit = (sums[0] * weights[0] + sums[1] * weights[1] + sums[2] * weights[2] + sums[3] * weights[3]) // 255
+        self.estimated_ma = lit
+        return self.idle_ma + lit
+
+    def measure(self):
+        # Compare the current sense with what the last frame sent should be drawing
+        if self.sense is None:
+            return
+        measured = int(self.sense.read_current() * 1000)
+        self.measured_ma = measured
+        expected = self.sent_ma
+        lit = measured - self.idle_ma
+        # Too little to tell anything from, or so far off the sense can't be working (eg: not a Plasma 2040)
+        if expected < 50 or lit * 4 < expected:
+            return
+        ratio = lit * _FULL // expected
+        correction = self.correction + ((ratio - self.correction) >> _SMOOTHING)
+        self.correction = min(_CORRECTION_MAX, max(_CORRECTION_MIN, correction))
+
+    def update(self):
+        # Work out how much to dim the frame, and tell the FrameBuffer. Returns the scale, out of 256
+        self.measure()
+        self.estimate()
+        lit = self.estimated_ma * self.correction >> 8
+        budget = self.limit_ma - self.idle_ma
+        if lit > budget:
+            scale = max(0, budget) * _FULL // lit
+        else:
+            scale = _FULL
+        self.scale = scale
+        self.sent_ma = self.estimated_ma * scale >> 8
+        self.fb.set_scale(scale)
+        return scale
+
+    def push(self):
+        # Use in place of fb.push()
+        self.update()
+        return self.fb.push()
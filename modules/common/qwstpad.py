@@ -1,6 +1,6 @@
-import struct
 from collections import OrderedDict
 
+from machine import Pin
 from micropython import const
 
 __version__ = "0.0.1"
@@ -15,6 +15,14 @@ ALT_ADDRESS_2 = const(0x25)
 ALT_ADDRESS_3 = const(0x27)
 ADDRESSES = (DEFAULT_ADDRESS, ALT_ADDRESS_1, ALT_ADDRESS_2, ALT_ADDRESS_3)
 
+# The input port bits that are buttons (see QwSTPad.BUTTON_MAPPING)
+BUTTON_MASK = const(0b11111000_00111110)
+
+# The LEDs' output port bits (see QwSTPad.LED_MAPPING), and what to write to the output port
+# for each of the 16 combinations of LEDs. They light when their bit is low
+_LED_BITS = (0x6, 0x7, 0x9, 0xA)
+_LED_OUTPUTS = tuple(sum(1 << _LED_BITS[i] for i in range(NUM_LEDS) if not states & (1 << i)) for states in range(16))
+
 
 class QwSTPad:
     # Registers
@@ -32,24 +40,47 @@ class QwSTPad:
                                   "U": 0x1, "D": 0x4, "L": 0x2, "R": 0x3,
                                   "+": 0xB, "-": 0x5
                                   })
-    LED_MAPPING = (0x6, 0x7, 0x9, 0xA)
+    LED_MAPPING = _LED_BITS
 
-    def __init__(self, i2c, address=DEFAULT_ADDRESS, show_address=True):
+    def __init__(self, i2c, address=DEFAULT_ADDRESS, show_address=True, interrupt=None):
         if address not in ADDRESSES:
             raise ValueError("address is not valid. Expected: 0x21, 0x23, 0x25, or 0x27")
 
         self.__i2c = i2c
         self.__address = address
 
+        self.__write_buffer = bytearray(2)
+
         # Set up the TCA9555 with the correct input and output pins
         self.__reg_write_uint16(self.__i2c, self.__address, self.CONFIGURATION_PORT0, 0b11111001_00111111)
         self.__reg_write_uint16(self.__i2c, self.__address, self.POLARITY_PORT0, 0b11111000_00111111)
         self.__reg_write_uint16(self.__i2c, self.__address, self.OUTPUT_PORT0, 0b00000110_11000000)
 
+        # A copy of what's in OUTPUT_PORT0, so LED changes that don't change it aren't written.
+        # Changes between begin() and commit() are written together
+        self.__output = 0b00000110_11000000
+        self.__batching = 0
+        self.writes_avoided = 0
+
         self.__button_states = OrderedDict({})
         for key, _ in self.BUTTON_MAPPING.items():
             self.__button_states[key] = False
 
+        # The last read of the buttons, as bits of the input port, and what changed since the read before
+        self.__read_buffer = bytearray(2)
+        self.state = 0
+        self.changed = 0
+        self.pressed = 0
+        self.released = 0
+
+        # With the pad's INT pin wired up, the buttons are only read once it says they've changed
+        self.reads_avoided = 0
+        self.__interrupt = None
+        self.__interrupted = True  # read the buttons the first time, in case any are already held
+        if interrupt is not None:
+            self.__interrupt = interrupt if isinstance(interrupt, Pin) else Pin(interrupt, Pin.IN, Pin.PULL_UP)
+            self.__interrupt.irq(handler=self.__on_interrupt, trigger=Pin.IRQ_FALLING)
+
         self.__led_states = 0b0000
         if show_address:
             self.set_leds(self.address_code())
@@ -58,11 +89,53 @@ class QwSTPad:
         return self.__change_bit(0x0000, ADDRESSES.index(self.__address), True)
 
     def read_buttons(self):
-        state = self.__reg_read_uint16(self.__i2c, self.__address, self.INPUT_PORT0)
-        for key, value in self.BUTTON_MAPPING.items():
-            self.__button_states[key] = self.__get_bit(state, value)
+        self.poll()
         return self.__button_states
 
+    def read_raw(self):
+        # The input port as it is, with a bit set for each button that's pressed (see BUTTON_MAPPING)
+        buffer = self.__read_buffer
+        self.__i2c.readfrom_mem_into(self.__address, self.INPUT_PORT0, buffer)
+        return (buffer[0] | (buffer[1] << 8)) & BUTTON_MASK
+
+    def poll(self):
+        # Read the buttons, and work out which have been pressed and released since the last poll
+        # (as bits in .pressed and .released). Returns the bits that changed
+        if self.__interrupt is not None and not self.__interrupted and self.__interrupt.value():
+            return self.skip()
+        self.__interrupted = False
+        state = self.read_raw()
+        self.changed = state ^ self.state
+        self.pressed = self.changed & state
+        self.released = self.changed & self.state
+        self.state = state
+        if self.changed:
+            # Only the buttons that changed need updating
+            for key, value in self.BUTTON_MAPPING.items():
+                if self.changed & (1 << value):
+                    self.__button_states[key] = self.__get_bit(state, value)
+        return self.changed
+
+    def skip(self):
+        # A poll that didn't need to read, as nothing has changed
+        self.reads_avoided += 1
+        self.changed = 0
+        self.pressed = 0
+        self.released = 0
+        return 0
+
+    def __on_interrupt(self, _pin):
+        # INT goes low when an input changes, and back up once the input port is read. This
+        # catches it even if it's gone back up by itself (a quick press and release)
+        self.__interrupted = True
+
+    def events(self):
+        # (button, pressed) for each button that changed at the last poll(), eg: ("A", True)
+        if self.changed:
+            for key, value in self.BUTTON_MAPPING.items():
+                if self.changed & (1 << value):
+                    yield key, self.__get_bit(self.state, value)
+
     def set_leds(self, states):
         self.__led_states = states & 0b1111
         self.__update_leds()
@@ -78,10 +151,22 @@ class QwSTPad:
         self.__led_states = 0b0000
         self.__update_leds()
 
+    def begin(self):
+        # Hold back LED changes until commit(), so several cost one write
+        self.__batching += 1
+
+    def commit(self):
+        self.__batching = max(0, self.__batching - 1)
+        self.__update_leds()
+
     def __update_leds(self):
-        output = 0
-        for i in range(NUM_LEDS):
-            output = self.__change_bit(output, self.LED_MAPPING[i], not self.__get_bit(self.__led_states, i))
+        if self.__batching:
+            return
+        output = _LED_OUTPUTS[self.__led_states]
+        if output == self.__output:
+            self.writes_avoided += 1
+            return
+        self.__output = output
         self.__reg_write_uint16(self.__i2c, self.__address, self.OUTPUT_PORT0, output)
 
     def __get_bit(self, num, bit_pos):
@@ -91,9 +176,54 @@ class QwSTPad:
         return num | (1 << bit_pos) if state else num & ~(1 << bit_pos)
 
     def __reg_write_uint16(self, i2c, address, reg, value):
-        buffer = struct.pack("<H", value)
+        buffer = self.__write_buffer
+        buffer[0] = value & 0xFF
+        buffer[1] = value >> 8
         i2c.writeto_mem(address, reg, buffer)
 
-    def __reg_read_uint16(self, i2c, address, reg):
-        buffer = i2c.readfrom_mem(address, reg, 2)
-        return struct.unpack("<H", buffer)[0]
+
+class QwSTPadGroup:
+    # Several QwSTPads (up to one at each of the four ADDRESSES), read together in one pass,
+    # for multiplayer games. Pads that aren't plugged in are left out
+    def __init__(self, i2c, addresses=ADDRESSES, show_address=True, interrupt=None):
+        # `interrupt` is a pin that all of the pads' INT pins are wired to (they can share one)
+        found = i2c.scan()
+        self.pads = [QwSTPad(i2c, address, show_address) for address in addresses if address in found]
+        self.__interrupt = None
+        self.__interrupted = True
+        if interrupt is not None:
+            self.__interrupt = interrupt if isinstance(interrupt, Pin) else Pin(interrupt, Pin.IN, Pin.PULL_UP)
+            self.__interrupt.irq(handler=self.__on_interrupt, trigger=Pin.IRQ_FALLING)
+
+    def __len__(self):
+        return len(self.pads)
+
+    def __getitem__(self, index):
+        return self.pads[index]
+
+    def poll(self):
+        # Read every pad. Returns a bitmask with a bit set for each pad whose buttons changed
+        if self.__interrupt is not None and not self.__interrupted and self.__interrupt.value():
+            for pad in self.pads:
+                pad.skip()
+            return 0
+        self.__interrupted = False
+        changed = 0
+        for i in range(len(self.pads)):
+            if self.pads[i].poll():
+                changed |= 1 << i
+        return changed
+
+    @property
+    def reads_avoided(self):
+        return sum(pad.reads_avoided for pad in self.pads)
+
+    def __on_interrupt(self, _pin):
+        self.__interrupted = True
+
+    def events(self):
+        # (pad, button, pressed) for each button that changed at the last poll()
+        for i in range(len(self.pads)):
+            for key, pressed in self.pads[i].events():
+                yield i, key, pressed
+
@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+from scheduler import Scheduler
+
+
+class Runtime:
+    # Runs animations, network requests and input polling side by side as asyncio tasks,
+    # so something slow (like waiting on a web API) never holds up the next frame.
+    # Anything that blocks without awaiting will still stall every task, so use
+    # asyncio-friendly network code (like ezhttp) rather than requests/urequests.
+    def __init__(self):
+        self._pending = []
+        self._tasks = []
+        self._running = False
+
+    def render(self, effect, fps=60):
+        # Call `effect(frame)` at `fps` frames per second. Returns the Scheduler, for its stats()
+        scheduler = Scheduler(fps)
+        self._add(self._render(effect, scheduler))
+        return scheduler
+
+    def every(self, interval_ms, callback, delay_ms=0):
+        # Call `callback()` every `interval_ms`. It can be a regular or an async function
+        self._add(self._every(interval_ms, callback, delay_ms))
+
+    def task(self, coroutine):
+        # Run any other coroutine alongside everything else
+        self._add(coroutine)
+
+    def _add(self, coroutine):
+        if self._running:
+            self._tasks.append(asyncio.create_task(coroutine))
+        else:
+            self._pending.append(coroutine)
+
+    async def _render(self, effect, scheduler):
+        scheduler.reset()
+        while self._running:
+            effect(scheduler.frame)
+            # Rather than wait_async(), so there isn't a new coroutine to allocate every frame
+            await asyncio.sleep_ms(scheduler.end_frame())
+            scheduler.start_frame()
+
+    async def _every(self, interval_ms, callback, delay_ms):
+        if delay_ms > 0:
+            await asyncio.sleep_ms(delay_ms)
+        while self._running:
+            start = time.ticks_ms()
+            result = callback()
+            if hasattr(result, "send"):
+                await result
+            elapsed = time.ticks_diff(time.ticks_ms(), start)
+            await asyncio.sleep_ms(max(0, interval_ms - elapsed))
+
+    async def main(self):
+        self._running = True
+        for coroutine in self._pending:
+            self._tasks.append(asyncio.create_task(coroutine))
+        self._pending = []
+        try:
+            # Tasks may be added while we wait, so walk the list rather than iterating it
+            i = 0
+            while i < len(self._tasks):
+                try:
+                    await self._tasks[i]
+                except asyncio.CancelledError:
+                    pass
+                i += 1
+        finally:
+            self._running = False
+            self._tasks = []
+
+    def run(self):
+        asyncio.run(self.main())
+
+    def stop(self):
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from array import array
+
+
+class Scheduler:
+    # Keeps an animation loop running at a fixed frame rate, by sleeping for whatever is
+    # left of each frame after rendering, rather than for a fixed time.
+    # If a frame overruns, the frames it ran into are dropped so the animation stays on time.
+    def __init__(self, fps=60, window=60):
+        if fps <= 0:
+            raise ValueError("fps must be greater than zero")
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.fps = fps
+        self.period = 1_000_000 // fps
+        self._render_us = array("I", [0] * window)
+        self._running = False
+        self.reset()
+
+    def reset(self):
+        self.frame = 0      # frames elapsed, including dropped ones
+        self.rendered = 0   # frames actually rendered
+        self.dropped = 0
+        self._index = 0
+        self._frame_start = time.ticks_us()
+        self._deadline = time.ticks_add(self._frame_start, self.period)
+
+    def wait(self):
+        # Call at the end of each frame, in place of time.sleep(1.0 / fps)
+        remaining = self._end_frame()
+        if remaining > 0:
+            time.sleep_us(remaining)
+        self._frame_start = time.ticks_us()
+        return self.frame
+
+    async def wait_async(self):
+        # As wait(), but lets other asyncio tasks run while waiting for the next frame
+        await asyncio.sleep_ms(self.end_frame())
+        self.start_frame()
+        return self.frame
+
+    def end_frame(self):
+        # wait_async() in two halves, for a loop that awaits the sleep itself, as calling an async
+        # function makes a new coroutine every frame: returns how long to sleep for, in ms, eg:
+        # await asyncio.sleep_ms(scheduler.end_frame()) then scheduler.start_frame()
+        remaining = self._end_frame()
+        return remaining // 1000 if remaining >= 1000 else 0
+
+    def start_frame(self):
+        self._frame_start = time.ticks_us()
+
+    def _end_frame(self):
+        # Record this frame, skip any frames we have overrun and return the time left in microseconds
+        now = time.ticks_us()
+        self._record(time.ticks_diff(now, self._frame_start))
+        self.frame += 1
+
+        late = -time.ticks_diff(self._deadline, now)
+        if late >= 0:
+            missed = late // self.period
+            self.dropped += missed
+            self.frame += missed
+            self._deadline = time.ticks_add(self._deadline, missed * self.period)
+
+        remaining = time.ticks_diff(self._deadline, now)
+        self._deadline = time.ticks_add(self._deadline, self.period)
+        return remaining
+
+    def run(self, effect, frames=None):
+        # Call `effect(frame)` once per frame until stop() is called or `frames` have elapsed
+        self._running = True
+        self.reset()
+        while self._running and (frames is None or self.frame < frames):
+            effect(self.frame)
+            self.wait()
+        self._running = False
+
+    def stop(self):
+        self._running = False
+
+    def _record(self, render_us):
+        self._render_us[self._index] = render_us
+        self._index = (self._index + 1) % len(self._render_us)
+        self.rendered += 1
+
+    def stats(self):
+        # Render times (in microseconds) over the last `window` frames
+        count = min(self.rendered, len(self._render_us))
+        if count == 0:
+            return {"fps": self.fps, "frames": 0, "rendered": 0, "dropped": 0,
+                    "mean_us": 0, "p95_us": 0, "max_us": 0, "headroom": 1.0}
+        samples = sorted(self._render_us[:count])
+        mean = sum(samples) // count
+        return {
+            "fps": self.fps,
+            "frames": self.frame,
+            "rendered": self.rendered,
+            "dropped": self.dropped,
+            "mean_us": mean,
+            "p95_us": samples[min(count - 1, (count * 95) // 100)],
+            "max_us": samples[-1],
+            "headroom": 1.0 - mean / self.period,
+        }
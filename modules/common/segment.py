@@ -0,0 +1,153 @@
+from array import array
+
+from framebuffer import FrameBuffer
+
+# Views onto LEDs, so an effect can draw into part of a strip (or a strip running backwards,
+# or several strips one after another) as if it were a strip of its own, counting from 0.
+# Which strip and LED each index lands on is worked out once, when the segment is made,
+# and kept in lookup tables, so drawing through a segment is a lookup rather than sums.
+
+
+def _mapping(target, end):
+    # The strips behind `target`, and which strip and LED each of its LEDs is
+    if isinstance(target, Segment):
+        return target.targets, target.which, target.indexes
+    buffers = getattr(target, "buffers", None)
+    if buffers is not None:
+        # A Strips: go straight to its FrameBuffers, rather than through Strips.locate()
+        which = bytearray()
+        index = array("H")
+        for t, fb in enumerate(buffers):
+            for i in range(fb.num_leds):
+                which.append(t)
+                index.append(i)
+        return list(buffers), which, index
+    num_leds = getattr(target, "num_leds", end)
+    if num_leds is None:
+        raise ValueError("end must be given for strips that don't know their length")
+    return [target], bytearray(num_leds), array("H", range(num_leds))
+
+
+class Segment:
+    def __init__(self, target, start=0, end=None, reverse=False):
+        # LEDs `start` up to (not including) `end` of a FrameBuffer, Strips, plasma strip or another
+        # Segment. Plasma strips don't know how long they are, so need an `end`
+        targets, which, index = _mapping(target, end)
+        end = len(index) if end is None else end
+        if not 0 <= start <= end <= len(index):
+            raise ValueError("segment is out of range")
+
+        count = end - start
+        self.targets = list(targets)
+        self.which = bytearray(count)              # which of self.targets each LED is on
+        self.indexes = array("H", [0] * count)     # and where on it
+        for i in range(count):
+            source = end - 1 - i if reverse else start + i
+            self.which[i] = which[source]
+            self.indexes[i] = index[source]
+        self.num_leds = count
+        self._find_runs()
+
+    def __len__(self):
+        return self.num_leds
+
+    def __add__(self, other):
+        return join(self, other)
+
+    def slice(self, start, end=None):
+        return Segment(self, start, end)
+
+    def reversed(self):
+        return Segment(self, reverse=True)
+
+    def split(self, count):
+        # Divide into `count` segments of (as near as possible) equal length
+        n = self.num_leds
+        return [Segment(self, i * n // count, (i + 1) * n // count) for i in range(count)]
+
+    def extend(self, other):
+        # Add another segment (or strip) onto the end of this one
+        targets, which, index = _mapping(other, None)
+        numbers = bytearray(len(targets))
+        for t, target in enumerate(targets):
+            numbers[t] = self._number(target)
+        for i in range(len(index)):
+            self.which.append(numbers[which[i]])
+            self.indexes.append(index[i])
+        self.num_leds = len(self.indexes)
+        self._find_runs()
+
+    def _number(self, target):
+        # Where `target` is in self.targets, adding it if it isn't there yet
+        for t in range(len(self.targets)):
+            if self.targets[t] is target:
+                return t
+        self.targets.append(target)
+        return len(self.targets) - 1
+
+    def _find_runs(self):
+        # Stretches of neighbouring LEDs on the same strip, as (target, first, last + 1),
+        # so fill() can hand them over to FrameBuffer.fill() whole
+        runs = []
+        which = self.which
+        index = self.indexes
+        i = 0
+        while i < self.num_leds:
+            j = i + 1
+            step = 0
+            while j < self.num_leds and which[j] == which[i]:
+                d = index[j] - index[j - 1]
+                if d not in (1, -1) or (step and d != step):
+                    break
+                step = d
+                j += 1
+            lo = min(index[i], index[j - 1])
+            hi = max(index[i], index[j - 1]) + 1
+            runs.append((which[i], lo, hi))
+            i = j
+        self._runs = runs
+
+    def position(self, value, low=0.0, high=1.0):
+        # Where `value`, from `low` to `high`, falls along the segment, in LEDs from the start of
+        # its first (0.0) to the end of its last (num_leds). Not rounded, so it can land between two
+        return (value - low) * self.num_leds / (high - low)
+
+    def locate(self, index):
+        # The strip an LED is on, and where on that strip
+        return self.targets[self.which[index]], self.indexes[index]
+
+    def set_rgb(self, index, r, g, b, w=0):
+        if w:
+            self.targets[self.which[index]].set_rgb(self.indexes[index], r, g, b, w)
+        else:
+            self.targets[self.which[index]].set_rgb(self.indexes[index], r, g, b)
+
+    def set_hsv(self, index, h, s=1.0, v=1.0):
+        self.targets[self.which[index]].set_hsv(self.indexes[index], h, s, v)
+
+    def get_rgb(self, index):
+        target = self.targets[self.which[index]]
+        if isinstance(target, FrameBuffer):
+            return target.get_rgb(self.indexes[index])
+        return target.get(self.indexes[index])
+
+    def fill(self, r, g, b, w=0):
+        for t, lo, hi in self._runs:
+            target = self.targets[t]
+            if isinstance(target, FrameBuffer):
+                target.fill(r, g, b, w, lo, hi)
+            else:
+                for i in range(lo, hi):
+                    target.set_rgb(i, r, g, b)
+
+    def clear(self):
+        self.fill(0, 0, 0)
+
+
+def join(*parts):
+    # One segment made of several, one after another. Parts can be Segments, FrameBuffers,
+    # or anything else with a num_leds (like a Strips)
+    segment = Segment(parts[0])
+    for part in parts[1:]:
+        segment.extend(part)
+    return segment
@@ -0,0 +1,169 @@
+import sys
+
+from framebuffer import FrameBuffer
+from machine import Timer
+
+import plasma
+
+# Drives several LED strips as one. Each strip is given its own PIO state machine, so there's
+# no need to pick `pio` and `sm` by hand, and all of them are sent out together, one straight
+# after the other, so they always show the same frame rather than drifting apart.
+# Strips are drawn into through FrameBuffers: fb = strips.ws2812(144, dat=15)
+
+STATE_MACHINES = 4
+
+# The wireless chip on W boards is driven through a state machine of its own, claimed when
+# MicroPython starts up: the first free one on PIO 1
+CYW43_STATE_MACHINES = ((1, 0),)
+
+
+def pio_count():
+    # The RP2350 has a third PIO
+    return 3 if "RP2350" in getattr(sys.implementation, "_machine", "") else 2
+
+
+def wireless():
+    # Only builds with the CYW43 driver have a network module with WLAN in it
+    try:
+        import network
+    except ImportError:
+        return False
+    return hasattr(network, "WLAN")
+
+
+class Strips:
+    def __init__(self, specs=(), pios=None, reserved=None):
+        # `specs` is a list of dicts of arguments for add(), eg: {"kind": "ws2812", "num_leds": 144, "dat": 15}
+        # `reserved` is a list of (pio, sm) pairs that are in use by something else. By default,
+        # that's the wireless chip's on W boards
+        self.pios = pio_count() if pios is None else pios
+        if reserved is None:
+            reserved = CYW43_STATE_MACHINES if wireless() else ()
+        self._used = set(reserved)
+        self.buffers = []
+        self.slots = []   # (kind, pio, sm) for each strip
+        self.starts = []  # where each strip begins, counting along all of them in order
+        self.num_leds = 0
+        self._timer = None
+        for spec in specs:
+            self.add(**spec)
+
+    def __len__(self):
+        return self.num_leds
+
+    def __iter__(self):
+        return iter(self.buffers)
+
+    def __getitem__(self, index):
+        return self.buffers[index]
+
+    def ws2812(self, num_leds, dat, **kwargs):
+        return self.add("ws2812", num_leds, dat=dat, **kwargs)
+
+    def apa102(self, num_leds, dat, clk, **kwargs):
+        return self.add("apa102", num_leds, dat=dat, clk=clk, **kwargs)
+
+    def add(self, kind, num_leds, rgbw=False, color_order=plasma.COLOR_ORDER_GRB, brightness=None, pio=None, sm=None, **kwargs):
+        # Add a strip, and return the FrameBuffer to draw it with. Other arguments (dat, clk, freq)
+        # are passed on to plasma.WS2812 or plasma.APA102
+        if kind not in ("ws2812", "apa102"):
+            raise ValueError("kind must be ws2812 or apa102")
+        if pio is None or sm is None:
+            pio, sm = self._allocate()
+        elif (pio, sm) in self._used:
+            raise ValueError("PIO state machine already in use")
+
+        fb = FrameBuffer(num_leds, rgbw=rgbw, color_order=color_order, brightness=brightness)
+        if kind == "ws2812":
+            fb.ws2812(pio, sm, **kwargs)
+        else:
+            fb.apa102(pio, sm, **kwargs)
+        self._used.add((pio, sm))
+
+        self.buffers.append(fb)
+        self.slots.append((kind, pio, sm))
+        self.starts.append(self.num_leds)
+        self.num_leds += num_leds
+        return fb
+
+    def _allocate(self):
+        for pio in range(self.pios):
+            for sm in range(STATE_MACHINES):
+                if (pio, sm) not in self._used:
+                    return pio, sm
+        raise ValueError("no free PIO state machines for another strip")
+
+    def locate(self, index):
+        # Which strip an LED is on, counting along all of them in order, and where on that strip
+        starts = self.starts
+        lo = 0
+        hi = len(starts) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if starts[mid] <= index:
+                lo = mid
+            else:
+                hi = mid - 1
+        return self.buffers[lo], index - starts[lo]
+
+    def set_rgb(self, index, r, g, b, w=0):
+        fb, i = self.locate(index)
+        fb.set_rgb(i, r, g, b, w)
+
+    def set_hsv(self, index, h, s=1.0, v=1.0):
+        fb, i = self.locate(index)
+        fb.set_hsv(i, h, s, v)
+
+    def fill(self, r, g, b, w=0):
+        for fb in self.buffers:
+            fb.fill(r, g, b, w)
+
+    def clear(self):
+        for fb in self.buffers:
+            fb.clear()
+
+    def set_brightness(self, brightness):
+        # For APA102 strips
+        for i, slot in enumerate(self.slots):
+            if slot[0] == "apa102":
+                self.buffers[i].set_brightness(brightness)
+
+    def show(self):
+        # Copy every strip's changes into place, then send them all out back to back.
+        # Returns how many LEDs changed
+        count = 0
+        for fb in self.buffers:
+            count += fb.push()
+        if count:
+            for fb in self.buffers:
+                fb.strip.update()
+        return count
+
+    def start(self, fps=60):
+        # Send every strip out together, fps times a second, from a single timer.
+        # Draw and push() as usual; there's no need to call update()
+        self.stop()
+        self._timer = Timer(freq=fps, callback=self._send)
+
+    def stop(self):
+        if self._timer is not None:
+            self._timer.deinit()
+            self._timer = None
+
+    def _send(self, _timer):
+        for fb in self.buffers:
+            fb.strip.update()
+
+    def push(self):
+        # Copy every strip's changes into place, for strips that have been start()ed
+        count = 0
+        for fb in self.buffers:
+            count += fb.push()
+        return count
+
+    def stats(self):
+        totals = {"frames_sent": 0, "frames_skipped": 0, "pixels_sent": 0, "pixels_skipped": 0}
+        for fb in self.buffers:
+            for key, value in fb.stats().items():
+                totals[key] += value
+        return totals
@@ -0,0 +1,49 @@
+import math
+
+import micropython
+
+# Waves from lookup tables, for effects that would otherwise call math.sin() (and friends)
+# for every LED, every frame. Phases are whole numbers, with 65536 to a full turn (so
+# 16384 is 90°), and they wrap around by themselves. Tables have 256 entries from 0 to 255,
+# so a wave is a single lookup: SINE[(phase >> 8) & 0xFF].
+
+TURN = 65536
+
+
+def table(function):
+    # Build a 256 entry table from `function(x)`, where x goes from 0 to just under 1 over a
+    # full turn and the result is from 0.0 to 1.0 (anything outside that is clipped)
+    values = bytearray(256)
+    for i in range(256):
+        values[i] = min(255, max(0, int(function(i / 256) * 255 + 0.5)))
+    return values
+
+
+def pulse(sharpness):
+    # A sine wave from 0 to 1, raised to the power of `sharpness`: the higher it is, the
+    # shorter and sharper each pulse. 1 is a plain sine wave shifted up to 0 to 255
+    return table(lambda x: math.pow((math.sin(x * 2 * math.pi) + 1) / 2, sharpness))
+
+
+# 128 plus or minus 127, starting at 128 and peaking at a quarter turn
+SINE = table(lambda x: (math.sin(x * 2 * math.pi) * 127 + 128) / 255)
+
+# Rises from 0 to 255 over the first half of a turn, then falls back again
+TRIANGLE = table(lambda x: 1 - abs(1 - 2 * x))
+
+
+@micropython.native
+def sine(phase):
+    # A sine wave from -127 to 127, for offsetting things either way. This one eases between
+    # table entries, for when a small wave is stretched over a big range
+    i = (phase >> 8) & 0xFF
+    a = SINE[i]
+    return a - 128 + (((SINE[(i + 1) & 0xFF] - a) * (phase & 0xFF)) >> 8)
+
+
+@micropython.native
+def fill(buf, wave, phase, step):
+    # Fill a bytearray with a table's values at phase, phase + step, phase + 2 * step...
+    for i in range(len(buf)):
+        buf[i] = wave[(phase >> 8) & 0xFF]
+        phase += step
@@ -0,0 +1,312 @@
+import asyncio
+import json
+import time
+
+DEFAULT_TIMEOUT = 10
+DEFAULT_MAX_IDLE_MS = 60_000
+DEFAULT_MAX_SKIP = 1024
+
+
+class HTTPError(Exception):
+    pass
+
+
+def parse_url(url):
+    try:
+        proto, _, host, path = url.split("/", 3)
+    except ValueError:
+        proto, _, host = url.split("/", 2)
+        path = ""
+
+    if proto == "http:":
+        port = 80
+    elif proto == "https:":
+        port = 443
+    else:
+        raise ValueError(f"Unsupported protocol: {proto}")
+
+    if ":" in host:
+        host, port = host.split(":", 1)
+        port = int(port)
+
+    return proto == "https:", host, port, "/" + path
+
+
+class ConnectionClosed(HTTPError):
+    # The server closed the connection without replying, as it may do to one left idle
+    pass
+
+
+class Body:
+    # Reads a response's body, stopping at the end of it rather than the end of the connection,
+    # so that on a kept-alive connection the next response can follow it
+    def __init__(self, stream, length=None, chunked=False):
+        self.stream = stream
+        self._chunked = chunked
+        self.remaining = 0 if chunked else length  # None: until the server closes the connection
+        self.done = length == 0 and not chunked
+
+    async def read(self, n=-1):
+        # Up to `n` bytes (a chunk at a time, if the body is chunked), or b"" at the end
+        if self.done:
+            return b""
+        if self._chunked and self.remaining == 0:
+            size = int((await self.stream.readline()).decode("utf-8").split(";")[0].strip(), 16)
+            if size == 0:
+                # Skip any trailers
+                while (await self.stream.readline()) not in (b"\r\n", b""):
+                    pass
+                self.done = True
+                return b""
+            self.remaining = size
+        if self.remaining is None:
+            data = await self.stream.read(n)
+            self.done = not data
+            return data
+        if n < 0 or n >= self.remaining:
+            data = await self.stream.readexactly(self.remaining)
+        else:
+            data = await self.stream.read(n)
+            if not data:
+                raise HTTPError("Connection closed mid-response")
+        self.remaining -= len(data)
+        if self.remaining == 0:
+            if self._chunked:
+                await self.stream.readexactly(2)  # the line break after each chunk
+            else:
+                self.done = True
+        return data
+
+    async def skip(self, limit):
+        # Read and throw away the rest of the body, so the connection can be used again.
+        # Returns False if that's more than `limit` bytes, or the body runs until the server closes
+        try:
+            while not self.done:
+                if self.remaining is None:
+                    return False
+                limit -= len(await self.read(limit + 1))
+                if limit < 0:
+                    return False
+        except (OSError, HTTPError, ValueError, EOFError):
+            return False
+        return True
+
+
+class Response:
+    # The status line and headers are read up front, the body is left on `reader`
+    # so it can be read all at once, or streamed a piece at a time
+    def __init__(self, status, reason, headers, reader, writer, session=None, key=None, keep_alive=False):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.reader = reader
+        self._writer = writer
+        self._session = session   # the Session to hand the connection back to, once the body's read
+        self._key = key
+        self.keep_alive = keep_alive
+
+    def header(self, name, default=None):
+        return self.headers.get(name.lower(), default)
+
+    async def read(self):
+        body = await self.reader.read()
+        while not self.reader.done:
+            # A chunked body comes a chunk at a time
+            body += await self.reader.read()
+        await self.close()
+        return body
+
+    async def text(self):
+        return (await self.read()).decode("utf-8")
+
+    async def json(self):
+        return json.loads(await self.read())
+
+    async def _skip(self):
+        try:
+            return await asyncio.wait_for(self.reader.skip(self._session.max_skip), self._session.timeout)
+        except asyncio.TimeoutError:
+            return False
+
+    async def close(self):
+        if self._writer is None:
+            return
+        writer = self._writer
+        self._writer = None
+        if self.keep_alive and self._session is not None and await self._skip():
+            self._session.release(self._key, self.reader.stream, writer)
+            return
+        writer.close()
+        await writer.wait_closed()
+
+
+def _encode(data):
+    return data.encode("utf-8") if isinstance(data, str) else data
+
+
+def _head(method, path, host, version, connection, headers, data):
+    lines = [f"{method} {path} {version}", f"Host: {host}", f"Connection: {connection}"]
+    if headers:
+        for name, value in headers.items():
+            lines.append(f"{name}: {value}")
+    if data is not None:
+        lines.append(f"Content-Length: {len(data)}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8")
+
+
+async def _read_head(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionClosed("Connection closed by server")
+    status_line = status_line.decode("utf-8").rstrip()
+    parts = status_line.split(" ", 2)
+    if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+        raise HTTPError(f"Invalid status line: {status_line}")
+    response_headers = {}
+    while True:
+        line = await reader.readline()
+        if not line or line == b"\r\n":
+            break
+        name, _, value = line.decode("utf-8").partition(":")
+        response_headers[name.strip().lower()] = value.strip()
+    return parts[0], int(parts[1]), parts[2] if len(parts) > 2 else "", response_headers
+
+
+def _body(reader, method, status, headers):
+    # Works out where the body ends, if anything but the server closing the connection says so
+    if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+        return Body(reader, 0)
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        return Body(reader, chunked=True)
+    if "content-length" in headers:
+        return Body(reader, int(headers["content-length"]))
+    return Body(reader)
+
+
+async def request(method, url, headers=None, data=None, timeout=DEFAULT_TIMEOUT):
+    ssl, host, port, path = parse_url(url)
+
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port, ssl=ssl), timeout)
+
+    # HTTP/1.0 means the body is never chunked and the server closes the connection when done
+    data = _encode(data)
+    writer.write(_head(method, path, host, "HTTP/1.0", "close", headers, data))
+    if data is not None:
+        writer.write(data)
+    await writer.drain()
+
+    try:
+        _, status, reason, response_headers = await asyncio.wait_for(_read_head(reader), timeout)
+    except Exception:
+        writer.close()
+        raise
+
+    return Response(status, reason, response_headers, _body(reader, method, status, response_headers), writer)
+
+
+async def get(url, headers=None, timeout=DEFAULT_TIMEOUT):
+    return await request("GET", url, headers=headers, timeout=timeout)
+
+
+class Session:
+    # Keeps the connection to each server open between requests (HTTP/1.1 keep-alive) and reuses
+    # it, saving a DNS lookup and TCP (and TLS) handshake each time the same server is polled.
+    # If the server has closed a connection in the meantime, it's reopened transparently.
+    # A connection goes back to the session when its response is closed (or read in full)
+    def __init__(self, timeout=DEFAULT_TIMEOUT, max_idle_ms=DEFAULT_MAX_IDLE_MS, max_skip=DEFAULT_MAX_SKIP):
+        self.timeout = timeout
+        self.max_idle_ms = max_idle_ms   # don't trust connections left idle for longer than this
+        self.max_skip = max_skip         # bytes of an unread body worth reading to keep its connection
+        self._connections = {}
+        self.requests = 0
+        self.reused = 0
+        self.connections = 0
+        self.reconnects = 0   # reused connections the server had already closed
+
+    def hit_rate(self):
+        return self.reused / self.requests if self.requests else 0.0
+
+    def stats(self):
+        return {"requests": self.requests, "reused": self.reused, "connections": self.connections,
+                "reconnects": self.reconnects, "hit_rate": self.hit_rate(), "open": len(self._connections)}
+
+    async def get(self, url, headers=None, timeout=None):
+        return await self.request("GET", url, headers=headers, timeout=timeout)
+
+    async def post(self, url, data=None, headers=None, timeout=None):
+        return await self.request("POST", url, headers=headers, data=data, timeout=timeout)
+
+    async def request(self, method, url, headers=None, data=None, timeout=None):
+        # `timeout` (in seconds) is for this request only, otherwise the session's is used
+        if timeout is None:
+            timeout = self.timeout
+        ssl, host, port, path = parse_url(url)
+        key = (host, port, ssl)
+        data = _encode(data)
+        head = _head(method, path, host, "HTTP/1.1", "keep-alive", headers, data)
+
+        self.requests += 1
+        connection = self._take(key)
+        if connection is not None:
+            try:
+                response = await self._exchange(connection, key, head, data, method, timeout)
+                self.reused += 1
+                return response
+            except (OSError, ConnectionClosed, asyncio.TimeoutError):
+                # Most likely the server closed it while it sat idle, so try once more on a new one.
+                # Only safe if repeating the request can't do any harm
+                await _close(connection[1])
+                if method not in ("GET", "HEAD"):
+                    raise
+                self.reconnects += 1
+            except Exception:
+                # A response that couldn't be made sense of leaves the connection part way through it
+                await _close(connection[1])
+                raise
+
+        connection = await asyncio.wait_for(asyncio.open_connection(host, port, ssl=ssl), timeout)
+        self.connections += 1
+        try:
+            return await self._exchange(connection, key, head, data, method, timeout)
+        except Exception:
+            await _close(connection[1])
+            raise
+
+    async def _exchange(self, connection, key, head, data, method, timeout):
+        reader, writer = connection
+        writer.write(head)
+        if data is not None:
+            writer.write(data)
+        await writer.drain()
+        version, status, reason, headers = await asyncio.wait_for(_read_head(reader), timeout)
+        body = _body(reader, method, status, headers)
+        keep_alive = (version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                      and (body.done or body.remaining is not None))
+        return Response(status, reason, headers, body, writer, self, key, keep_alive)
+
+    def _take(self, key):
+        # The (reader, writer) of a connection that's been kept open to this server, if any
+        connection = self._connections.pop(key, None)
+        if connection is None:
+            return None
+        if time.ticks_diff(time.ticks_ms(), connection[2]) > self.max_idle_ms:
+            connection[1].close()
+            return None
+        return connection[0], connection[1]
+
+    def release(self, key, reader, writer):
+        # Keep a connection for the next request, once its response has been read
+        old = self._connections.pop(key, None)
+        if old is not None:
+            old[1].close()
+        self._connections[key] = (reader, writer, time.ticks_ms())
+
+    async def close(self):
+        for connection in self._connections.values():
+            await _close(connection[1])
+        self._connections = {}
+
+
+async def _close(writer):
+    writer.close()
+    await writer.wait_closed()
@@ -0,0 +1,200 @@
+import binascii
+import hashlib
+import json
+import os
+import time
+
+# Remembers the last response from each URL, and uses it to avoid fetching things again:
+# - while a response is fresh (Cache-Control: max-age) no request is made at all
+# - after that, the request asks the server to reply "304 Not Modified" if nothing changed
+#   (using ETag / Last-Modified), so only the headers are sent back
+# Responses are saved to flash, so they survive a reboot.
+
+DEFAULT_PATH = "/cache"
+KEPT_HEADERS = ("etag", "last-modified", "content-type", "cache-control")
+
+
+class CachedResponse:
+    def __init__(self, status_code, headers, content, from_cache=False, revalidated=False):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.from_cache = from_cache      # no request was made at all
+        self.revalidated = revalidated    # the server replied 304 Not Modified
+
+    @property
+    def text(self):
+        return str(self.content, "utf-8")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def close(self):
+        pass
+
+
+def _lower_keys(headers):
+    return {k.lower(): v for k, v in headers.items()} if headers else {}
+
+
+def _kept_headers(headers):
+    # The headers worth storing with a response: its validators and caching rules
+    return {k: v for k, v in headers.items() if k in KEPT_HEADERS}
+
+
+def _max_age(cache_control):
+    # Returns how many seconds a response may be reused for, or None if it shouldn't be stored
+    max_age = 0
+    for directive in cache_control.lower().split(","):
+        directive = directive.strip()
+        if directive in ("no-store", "private"):
+            return None
+        if directive == "no-cache":
+            return 0
+        if directive.startswith("max-age="):
+            try:
+                max_age = int(directive[8:])
+            except ValueError:
+                max_age = 0
+    return max_age
+
+
+class HTTPCache:
+    def __init__(self, path=DEFAULT_PATH, session=None, persist=True):
+        # `session` is anything with a requests-style get(url, headers=...), such as requests or urequests.
+        # For get_async(), it's an ezhttp.Session (or the ezhttp module) instead
+        if session is None:
+            import requests
+            session = requests
+        self.path = path
+        self.session = session
+        self.persist = persist
+        self._entries = {}
+        self.hits = 0           # served without a request
+        self.revalidations = 0  # served after a 304 Not Modified
+        self.fetches = 0        # full responses downloaded
+        if persist:
+            try:
+                os.mkdir(path)
+            except OSError:
+                pass  # Already exists
+
+    def _key(self, url):
+        return str(binascii.hexlify(hashlib.sha256(url.encode("utf-8")).digest()[:8]), "utf-8")
+
+    def _filename(self, url, extension):
+        return f"{self.path}/{self._key(url)}.{extension}"
+
+    def _load(self, url):
+        entry = self._entries.get(url)
+        if entry is not None or not self.persist:
+            return entry
+        try:
+            with open(self._filename(url, "json")) as f:
+                entry = json.load(f)
+            with open(self._filename(url, "body"), "rb") as f:
+                entry["content"] = f.read()
+        except (OSError, ValueError):
+            return None
+        if entry.get("url") != url:
+            return None
+        self._entries[url] = entry
+        return entry
+
+    def _save(self, url, entry, body=True):
+        self._entries[url] = entry
+        if not self.persist:
+            return
+        try:
+            if body:
+                with open(self._filename(url, "body"), "wb") as f:
+                    f.write(entry["content"])
+            with open(self._filename(url, "json"), "w") as f:
+                json.dump({k: v for k, v in entry.items() if k != "content"}, f)
+        except OSError as e:
+            print(f"httpcache: failed to save {url}: {e}")
+
+    def forget(self, url):
+        self._entries.pop(url, None)
+        if self.persist:
+            for extension in ("json", "body"):
+                try:
+                    os.remove(self._filename(url, extension))
+                except OSError:
+                    pass
+
+    def _prepare(self, url, headers):
+        # Returns the stored entry, and either a response to serve straight from the cache,
+        # or the headers to ask the server with
+        entry = self._load(url)
+        now = time.time()
+
+        # Still fresh? Don't even ask. If the clock has gone backwards (eg: after a reboot
+        # without the time being set) the expiry can't be trusted, so check with the server
+        if entry is not None and entry["fetched"] <= now < entry["expires"]:
+            self.hits += 1
+            return entry, CachedResponse(200, entry["headers"], entry["content"], from_cache=True), None
+
+        request_headers = dict(headers) if headers else {}
+        if entry is not None:
+            if entry["headers"].get("etag"):
+                request_headers["If-None-Match"] = entry["headers"]["etag"]
+            if entry["headers"].get("last-modified"):
+                request_headers["If-Modified-Since"] = entry["headers"]["last-modified"]
+        return entry, None, request_headers
+
+    def _update(self, url, entry, status, response_headers, content):
+        # Stores what the server replied with, and returns the response to give back
+        now = time.time()
+        if status == 304 and entry is not None:
+            # A 304 may send newer validators or caching rules, or leave them out to mean the
+            # stored ones still stand, so work out freshness from the two merged
+            self.revalidations += 1
+            entry["headers"].update(_kept_headers(response_headers))
+            max_age = _max_age(entry["headers"].get("cache-control", ""))
+            entry["fetched"] = now
+            entry["expires"] = now + (max_age or 0)
+            self._save(url, entry, body=False)
+            return CachedResponse(200, entry["headers"], entry["content"], revalidated=True)
+
+        self.fetches += 1
+        max_age = _max_age(response_headers.get("cache-control", ""))
+        if status == 200 and max_age is not None:
+            self._save(url, {
+                "url": url,
+                "headers": _kept_headers(response_headers),
+                "fetched": now,
+                "expires": now + max_age,
+                "content": content,
+            })
+        elif entry is not None:
+            self.forget(url)
+        return CachedResponse(status, response_headers, content)
+
+    def get(self, url, headers=None, **kwargs):
+        entry, cached, request_headers = self._prepare(url, headers)
+        if cached is not None:
+            return cached
+
+        r = self.session.get(url, headers=request_headers, **kwargs)
+        try:
+            status = r.status_code
+            response_headers = _lower_keys(r.headers)
+            content = r.content if status != 304 else None
+        finally:
+            r.close()
+        return self._update(url, entry, status, response_headers, content)
+
+    async def get_async(self, url, headers=None, **kwargs):
+        # As get(), but for an asyncio session such as an ezhttp.Session, or ezhttp itself
+        entry, cached, request_headers = self._prepare(url, headers)
+        if cached is not None:
+            return cached
+
+        r = await self.session.get(url, headers=request_headers, **kwargs)
+        try:
+            status = r.status
+            content = await r.read() if status != 304 else None
+        finally:
+            await r.close()
+        return self._update(url, entry, status, _lower_keys(r.headers), content)
@@ -0,0 +1,244 @@
+import json
+import socket
+import time
+
+# An HTTP/1.1 client that keeps connections open between requests and reuses them,
+# saving a DNS lookup and TCP (and TLS) handshake each time the same server is polled.
+# If the server has closed a connection in the meantime, it's reopened transparently.
+
+DEFAULT_TIMEOUT = 10
+DEFAULT_MAX_IDLE_MS = 60_000
+
+
+class HTTPError(OSError):
+    pass
+
+
+class Response:
+    def __init__(self, status_code, reason, headers, content):
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self):
+        return str(self.content, "utf-8")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def close(self):
+        # The body has already been read and the connection handed back to the pool
+        pass
+
+
+class _Connection:
+    def __init__(self, host, port, use_ssl, timeout):
+        addr = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)[0][-1]
+        sock = socket.socket()
+        sock.settimeout(timeout)
+        self.timeout = timeout
+        self.raw = sock   # keeps the timeout, even once wrapped for TLS
+        try:
+            sock.connect(addr)
+            if use_ssl:
+                import ssl
+                sock = ssl.wrap_socket(sock, server_hostname=host)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+        # MicroPython sockets can be read line by line directly, CPython's need a file wrapper
+        self.stream = sock.makefile("rb") if hasattr(sock, "makefile") else sock
+        self.last_used = time.ticks_ms()
+        self.requests = 0
+
+    def settimeout(self, timeout):
+        if timeout != self.timeout:
+            self.raw.settimeout(timeout)
+            self.timeout = timeout
+
+    def send(self, data):
+        # MicroPython's ssl sockets have write() but not sendall()
+        send = getattr(self.sock, "sendall", None) or self.sock.write
+        send(data)
+
+    def close(self):
+        if self.stream is not self.sock:
+            # CPython keeps the socket open until its file wrapper is closed too
+            self.stream.close()
+        self.sock.close()
+
+
+def _split_url(url):
+    try:
+        proto, _, host, path = url.split("/", 3)
+    except ValueError:
+        proto, _, host = url.split("/", 2)
+        path = ""
+    if proto not in ("http:", "https:"):
+        raise ValueError(f"Unsupported protocol: {proto}")
+    use_ssl = proto == "https:"
+    port = 443 if use_ssl else 80
+    if ":" in host:
+        host, port = host.split(":", 1)
+        port = int(port)
+    return host, port, use_ssl, "/" + path
+
+
+class ConnectionPool:
+    def __init__(self, timeout=DEFAULT_TIMEOUT, max_idle_ms=DEFAULT_MAX_IDLE_MS):
+        self.timeout = timeout
+        self.max_idle_ms = max_idle_ms   # don't trust connections left idle for longer than this
+        self._connections = {}
+        self.requests = 0
+        self.reused = 0
+        self.connections = 0
+        self.reconnects = 0   # reused connections the server had already closed
+
+    def hit_rate(self):
+        return self.reused / self.requests if self.requests else 0.0
+
+    def stats(self):
+        return {"requests": self.requests, "reused": self.reused, "connections": self.connections,
+                "reconnects": self.reconnects, "hit_rate": self.hit_rate(), "open": len(self._connections)}
+
+    def get(self, url, headers=None, **kwargs):
+        return self.request("GET", url, headers=headers, **kwargs)
+
+    def post(self, url, data=None, headers=None, **kwargs):
+        return self.request("POST", url, data=data, headers=headers, **kwargs)
+
+    def request(self, method, url, data=None, headers=None, timeout=None):
+        # `timeout` (in seconds) is for this request only, otherwise the pool's is used
+        if timeout is None:
+            timeout = self.timeout
+        host, port, use_ssl, path = _split_url(url)
+        key = (host, port, use_ssl)
+
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {host}", "Connection: keep-alive"]
+        if headers:
+            for name, value in headers.items():
+                lines.append(f"{name}: {value}")
+        if data is not None:
+            lines.append(f"Content-Length: {len(data)}")
+        head = ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8")
+
+        self.requests += 1
+        connection = self._take(key)
+        if connection is not None:
+            connection.settimeout(timeout)
+            try:
+                response, keep_alive = self._exchange(connection, head, data, method)
+                self.reused += 1
+                self._release(key, connection, keep_alive)
+                return response
+            except OSError:
+                # Most likely the server closed it while it sat idle, so try once more on a new one.
+                # Only safe if repeating the request can't do any harm
+                connection.close()
+                if method not in ("GET", "HEAD"):
+                    raise
+                self.reconnects += 1
+            except Exception:
+                # A response that couldn't be made sense of leaves the connection part way through it
+                connection.close()
+                raise
+
+        connection = _Connection(host, port, use_ssl, timeout)
+        self.connections += 1
+        try:
+            response, keep_alive = self._exchange(connection, head, data, method)
+        except Exception:
+            connection.close()
+            raise
+        self._release(key, connection, keep_alive)
+        return response
+
+    def _take(self, key):
+        connection = self._connections.pop(key, None)
+        if connection is not None and time.ticks_diff(time.ticks_ms(), connection.last_used) > self.max_idle_ms:
+            connection.close()
+            connection = None
+        return connection
+
+    def _release(self, key, connection, keep_alive):
+        if keep_alive:
+            connection.last_used = time.ticks_ms()
+            old = self._connections.pop(key, None)
+            if old is not None:
+                old.close()
+            self._connections[key] = connection
+        else:
+            connection.close()
+
+    def _exchange(self, connection, head, data, method):
+        connection.send(head)
+        if data is not None:
+            connection.send(data)
+        connection.requests += 1
+        stream = connection.stream
+
+        status_line = stream.readline()
+        if not status_line:
+            raise HTTPError("Connection closed by server")
+        parts = str(status_line, "utf-8").rstrip().split(" ", 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+            raise HTTPError(f"Invalid status line: {status_line}")
+        status = int(parts[1])
+        reason = parts[2] if len(parts) > 2 else ""
+
+        headers = {}
+        while True:
+            line = stream.readline()
+            if not line or line == b"\r\n":
+                break
+            name, _, value = str(line, "utf-8").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = parts[0] == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            content = b""
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            content = self._read_chunked(stream)
+        elif "content-length" in headers:
+            content = self._read_exactly(stream, int(headers["content-length"]))
+        else:
+            # No length given, so the body runs until the server closes the connection
+            content = stream.read()
+            keep_alive = False
+
+        return Response(status, reason, headers, content), keep_alive
+
+    def _read_exactly(self, stream, length):
+        content = bytearray(length)
+        view = memoryview(content)
+        read = 0
+        while read < length:
+            n = stream.readinto(view[read:])
+            if not n:
+                raise HTTPError("Connection closed mid-response")
+            read += n
+        return bytes(content)
+
+    def _read_chunked(self, stream):
+        content = bytearray()
+        while True:
+            size = int(str(stream.readline(), "utf-8").split(";")[0].strip(), 16)
+            if size == 0:
+                # Skip any trailers
+                while stream.readline() not in (b"\r\n", b""):
+                    pass
+                return bytes(content)
+            content.extend(self._read_exactly(stream, size))
+            stream.readline()
+
+    def close(self):
+        for connection in self._connections.values():
+            connection.close()
+        self._connections = {}
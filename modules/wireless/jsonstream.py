@@ -0,0 +1,236 @@
+import micropython
+from micropython import const
+
+# Pulls a few values out of a JSON document as it arrives, a chunk at a time,
+# without ever holding the whole document (or a dict of it) in memory.
+# Paths are dotted keys, with numbers for array indexes, eg: "current_weather.temperature" or "feeds.0.field2"
+# Only strings, numbers, true, false and null can be extracted, not whole objects or arrays.
+
+DEFAULT_CHUNK_SIZE = const(128)
+DEFAULT_MAX_TOKEN = const(64)
+DEFAULT_MAX_DEPTH = const(8)
+
+_OBJECT = const(1)
+_ARRAY = const(2)
+
+_VALUE = const(0)    # between tokens
+_STRING = const(1)   # inside a string
+_LITERAL = const(2)  # inside a number, true, false or null
+
+_QUOTE = const(0x22)
+_BACKSLASH = const(0x5C)
+_COLON = const(0x3A)
+_COMMA = const(0x2C)
+_OPEN_OBJECT = const(0x7B)
+_CLOSE_OBJECT = const(0x7D)
+_OPEN_ARRAY = const(0x5B)
+_CLOSE_ARRAY = const(0x5D)
+
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}
+
+
+class JSONStreamError(ValueError):
+    pass
+
+
+def _component(key):
+    return int(key) if key.isdigit() else key
+
+
+class Extractor:
+    def __init__(self, paths, max_token=DEFAULT_MAX_TOKEN, max_depth=DEFAULT_MAX_DEPTH):
+        self.paths = paths
+        self.values = {}
+        self._targets = [tuple(_component(key) for key in path.split(".")) for path in paths]
+        self._token = bytearray(max_token)
+        self._length = 0
+        self._overflow = False
+        self._containers = bytearray(max_depth)
+        self._path = [None] * max_depth
+        self._depth = 0
+        self._state = _VALUE
+        self._escape = False
+        self._is_key = False
+        self._capture = False
+
+    def done(self):
+        return len(self.values) == len(self.paths)
+
+    def feed(self, data, length=None):
+        # Parse `length` bytes of `data`. Returns True once every path has been found
+        self._feed(data, len(data) if length is None else length)
+        return self.done()
+
+    @micropython.native
+    def _feed(self, data, length):
+        token = self._token
+        max_token = len(token)
+        for i in range(length):
+            c = data[i]
+            state = self._state
+
+            if state == _STRING:
+                if self._escape:
+                    self._escape = False
+                elif c == _BACKSLASH:
+                    self._escape = True
+                elif c == _QUOTE:
+                    self._state = _VALUE
+                    self._end_string()
+                    continue
+                if self._capture:
+                    if self._length < max_token:
+                        token[self._length] = c
+                        self._length += 1
+                    else:
+                        self._overflow = True
+                continue
+
+            if state == _LITERAL:
+                if c > 0x20 and c != _COMMA and c != _CLOSE_OBJECT and c != _CLOSE_ARRAY:
+                    if self._capture:
+                        if self._length < max_token:
+                            token[self._length] = c
+                            self._length += 1
+                        else:
+                            self._overflow = True
+                    continue
+                self._state = _VALUE
+                self._end_literal()
+                # Fall through so the delimiter is handled below
+
+            if c <= 0x20:
+                continue
+            if c == _QUOTE:
+                self._state = _STRING
+                self._is_key = self._depth > 0 and self._containers[self._depth - 1] == _OBJECT and self._path[self._depth - 1] is None
+                self._start_token()
+            elif c == _OPEN_OBJECT or c == _OPEN_ARRAY:
+                if self._depth >= len(self._containers):
+                    raise JSONStreamError("JSON is nested too deeply")
+                self._containers[self._depth] = _OBJECT if c == _OPEN_OBJECT else _ARRAY
+                self._path[self._depth] = None if c == _OPEN_OBJECT else 0
+                self._depth += 1
+            elif c == _CLOSE_OBJECT or c == _CLOSE_ARRAY:
+                if self._depth == 0:
+                    raise JSONStreamError("Unexpected end of object or array")
+                self._depth -= 1
+            elif c == _COMMA:
+                d = self._depth - 1
+                if d >= 0:
+                    if self._containers[d] == _ARRAY:
+                        self._path[d] += 1
+                    else:
+                        self._path[d] = None
+            elif c == _COLON:
+                pass
+            else:
+                self._state = _LITERAL
+                self._is_key = False
+                self._start_token()
+                if self._capture:
+                    token[0] = c
+                    self._length = 1
+
+    def _matches(self):
+        depth = self._depth
+        path = self._path
+        for n in range(len(self._targets)):
+            target = self._targets[n]
+            if len(target) != depth:
+                continue
+            for d in range(depth):
+                if target[d] != path[d]:
+                    break
+            else:
+                return self.paths[n]
+        return None
+
+    def _start_token(self):
+        self._length = 0
+        self._overflow = False
+        # Keys are always captured (they're needed to track the path), values only if they're wanted
+        self._capture = self._is_key or self._matches() is not None
+
+    def _end_string(self):
+        if not self._capture:
+            return
+        if self._is_key:
+            # Over-long keys can never match a path, so are stored as a placeholder
+            key = "" if self._overflow else str(self._token[:self._length], "utf-8")
+            self._path[self._depth - 1] = key
+            return
+        self._store(self._unescape(str(self._token[:self._length], "utf-8")))
+
+    def _end_literal(self):
+        if not self._capture:
+            return
+        text = str(self._token[:self._length], "utf-8")
+        if text == "true":
+            value = True
+        elif text == "false":
+            value = False
+        elif text == "null":
+            value = None
+        elif "." in text or "e" in text or "E" in text:
+            value = float(text)
+        else:
+            value = int(text)
+        self._store(value)
+
+    def _store(self, value):
+        if self._overflow:
+            raise JSONStreamError("Value is longer than max_token")
+        path = self._matches()
+        if path is not None and path not in self.values:
+            self.values[path] = value
+
+    def _unescape(self, text):
+        if "\\" not in text:
+            return text
+        out = []
+        i = 0
+        while i < len(text):
+            c = text[i]
+            if c == "\\" and i + 1 < len(text):
+                i += 1
+                c = text[i]
+                if c == "u":
+                    c = chr(int(text[i + 1:i + 5], 16))
+                    i += 4
+                else:
+                    c = _ESCAPES.get(c, c)
+            out.append(c)
+            i += 1
+        return "".join(out)
+
+    def result(self):
+        if not self.done():
+            missing = [path for path in self.paths if path not in self.values]
+            raise KeyError(", ".join(missing))
+        return self.values
+
+
+def extract(stream, paths, chunk_size=DEFAULT_CHUNK_SIZE, **kwargs):
+    # Read from a file, socket or `requests` response's `.raw` until every path is found
+    extractor = Extractor(paths, **kwargs)
+    buffer = bytearray(chunk_size)
+    while True:
+        n = stream.readinto(buffer)
+        if not n:
+            break
+        if extractor.feed(buffer, n):
+            break
+    return extractor.result()
+
+
+async def extract_async(reader, paths, chunk_size=DEFAULT_CHUNK_SIZE, **kwargs):
+    # As extract(), but for an asyncio stream (such as an ezhttp response's `.reader`)
+    extractor = Extractor(paths, **kwargs)
+    while True:
+        chunk = await reader.read(chunk_size)
+        if not chunk:
+            break
+        if extractor.feed(chunk):
+            break
+    return extractor.result()
@@ -0,0 +1,113 @@
+import asyncio
+import gc
+import sys
+import tracemalloc
+import types
+from pathlib import Path
+
+from simulator import aio, breakouts, machine, network, plasma
+from simulator.clock import Clock, StopSimulation
+
+"""
+Runs the frozen modules and examples under CPython, with the plasma, machine, network
+and micropython modules (and the breakouts the examples use) replaced by simulated ones.
+
+    import simulator
+    clock = simulator.install()
+
+With a virtual clock (the default) sleeping takes no time at all, the clock just moves on,
+so runs are fast and repeatable. See simulator/run.py for running an example headless.
+"""
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAP_SIZE = 192 * 1024
+
+__all__ = ["ROOT", "Clock", "StopSimulation", "install", "reset"]
+
+clock = None
+
+
+def _micropython():
+    module = types.ModuleType("micropython")
+    module.const = lambda value: value
+    module.native = lambda function: function
+    module.viper = lambda function: function
+    module.alloc_emergency_exception_buf = lambda _size: None
+    module.schedule = lambda function, arg: function(arg)
+    module.opt_level = lambda level=None: 0 if level is None else None
+    module.heap_lock = lambda: 0
+    module.heap_unlock = lambda: 0
+    module.kbd_intr = lambda _chr: None
+    module.mem_info = lambda *_args: print(f"mem: total={HEAP_SIZE}, used={_mem_alloc()}, free={_mem_free()}")
+    return module
+
+
+def _mem_alloc():
+    # Bytes allocated by Python code, if tracemalloc is running
+    return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+
+
+def _mem_free():
+    return max(0, HEAP_SIZE - _mem_alloc())
+
+
+def _module(name, **attributes):
+    module = types.ModuleType(name)
+    for key, value in attributes.items():
+        setattr(module, key, value)
+    return module
+
+
+def install(virtual=True, record=False, trace_memory=False):
+    # Put the simulated modules in place, and return the clock driving them
+    global clock
+    clock = Clock(virtual)
+    clock.install()
+    plasma.clock = clock
+    plasma.record = record
+    machine.clock = clock
+    breakouts.clock = clock
+
+    asyncio.sleep_ms = aio.sleep_ms
+    if virtual:
+        asyncio.set_event_loop_policy(aio.VirtualEventLoopPolicy(clock))
+    asyncio.open_connection = network.open_connection
+
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    gc.mem_alloc = _mem_alloc
+    gc.mem_free = _mem_free
+
+    scd41 = breakouts.SCD41()
+    sys.modules.update({
+        "micropython": _micropython(),
+        "plasma": plasma,
+        "machine": machine,
+        "network": network,
+        "cppmem": _module("cppmem", MICROPYTHON=0, C_HEAP=1, set_mode=lambda _mode: None),
+        "pimoroni_i2c": _module("pimoroni_i2c", PimoroniI2C=machine.I2C),
+        "breakout_encoder": _module("breakout_encoder", BreakoutEncoder=breakouts.BreakoutEncoder),
+        "breakout_encoder_wheel": _module("breakout_encoder_wheel", BreakoutEncoderWheel=breakouts.BreakoutEncoderWheel,
+                                          UP=0, DOWN=1, LEFT=2, RIGHT=3, CENTRE=4, NUM_LEDS=24),
+        "breakout_msa301": _module("breakout_msa301", BreakoutMSA301=breakouts.BreakoutMSA301),
+        "breakout_bme280": _module("breakout_bme280", BreakoutBME280=breakouts.BreakoutBME280),
+        "breakout_bme68x": _module("breakout_bme68x", BreakoutBME68X=breakouts.BreakoutBME68X),
+        "breakout_rtc": _module("breakout_rtc", BreakoutRTC=breakouts.BreakoutRTC),
+        "breakout_scd41": _module("breakout_scd41", init=scd41.init, start=scd41.start, stop=scd41.stop,
+                                  ready=scd41.ready, measure=scd41.measure),
+    })
+
+    for path in ("modules/common", "modules/wireless"):
+        path = str(ROOT / path)
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    return clock
+
+
+def reset():
+    # Forget every strip, pin level, device and server, between runs
+    plasma.reset()
+    machine.reset_state()
+    network.reset()
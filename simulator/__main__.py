@@ -0,0 +1,55 @@
+import argparse
+import json
+from pathlib import Path
+
+from simulator import network
+from simulator.run import run
+
+"""
+Run an example on your computer, without a board:
+
+    python3 -m simulator examples/fire.py --leds 144 --frames 500
+
+Use --serve to answer the example's web requests from a file, eg:
+
+    python3 -m simulator examples/weather.py --serve api.open-meteo.com=benchmarks/data/open-meteo-current.json
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python3 -m simulator", description="Run a Plasma example headless.")
+    parser.add_argument("example", help="path to the example to run")
+    parser.add_argument("--leds", type=int, default=None, help="override the example's NUM_LEDS")
+    parser.add_argument("--frames", type=int, default=100, help="how many frames to run for (default: 100)")
+    parser.add_argument("--seconds", type=float, default=None, help="stop after this much simulated time")
+    parser.add_argument("--timeout", type=float, default=30, help="stop after this much real time (default: 30)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random module (default: 0)")
+    parser.add_argument("--serve", action="append", default=[], metavar="HOST=FILE", help="answer requests to HOST with the contents of FILE")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    def setup(_clock):
+        for serve in args.serve:
+            host, _, filename = serve.partition("=")
+            network.serve(host, Path(filename).read_bytes())
+
+    result = run(args.example, args.leds, args.frames, args.seed, setup=setup, seconds=args.seconds, timeout=args.timeout)
+    stats = result.stats()
+    stats["elapsed_ms"] = result.elapsed_us // 1_000
+    stats["timed_out"] = result.timed_out
+    stats["strips"] = [{"type": type(strip).__name__, "num_leds": strip.num_leds, "updates": strip.updates} for strip in result.strips]
+
+    if args.json:
+        print(json.dumps(stats, indent=2))
+        return
+
+    print(f"{result.path}: {stats['frames']} frames over {stats['elapsed_ms']} ms of simulated time")
+    if result.timed_out:
+        print(f"stopped after {args.timeout} s of real time")
+    print(f"frame time: mean {stats['mean_us']} us, p95 {stats['p95_us']} us, max {stats['max_us']} us")
+    for strip in stats["strips"]:
+        print(f"{strip['type']}: {strip['num_leds']} LEDs, {strip['updates']} frames sent")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import asyncio
+import selectors
+
+# An asyncio event loop that runs on the simulated clock. When every task is waiting,
+# the clock jumps straight to the next thing that's due instead of sleeping.
+
+
+class _Selector:
+    def __init__(self, clock):
+        self._clock = clock
+        self._selector = selectors.DefaultSelector()
+
+    def select(self, timeout=None):
+        events = self._selector.select(0)
+        if events or timeout == 0:
+            return events
+        # Nothing is scheduled, so let time pass a millisecond at a time in case a timer or pin interrupt wakes something
+        self._clock.sleep_us(1_000 if timeout is None else round(timeout * 1_000_000))
+        return self._selector.select(0)
+
+    def __getattr__(self, name):
+        return getattr(self._selector, name)
+
+
+class VirtualEventLoop(asyncio.SelectorEventLoop):
+    def __init__(self, clock):
+        super().__init__(_Selector(clock))
+        self._clock = clock
+        self._clock_resolution = 1e-6
+
+    def time(self):
+        return self._clock.now_us() / 1_000_000
+
+
+class VirtualEventLoopPolicy(asyncio.DefaultEventLoopPolicy):
+    def __init__(self, clock):
+        super().__init__()
+        self._clock = clock
+
+    def new_event_loop(self):
+        return VirtualEventLoop(self._clock)
+
+
+def sleep_ms(ms):
+    return asyncio.sleep(ms / 1000)
@@ -0,0 +1,149 @@
+import dis
+import sys
+from collections import Counter
+
+# Counts the objects a MicroPython build would have to allocate on the heap, as the code in
+# some folders (the examples and frozen modules) runs. CPython's own memory use doesn't carry
+# over: it allocates a new int for anything over 256, and hands lists, tuples and floats out
+# of free lists without asking for memory, whereas MicroPython keeps ints under 2**30 in the
+# object pointer itself and has no free lists. So instead, this watches each bytecode
+# instruction run in those folders and counts the ones that make a new object there:
+#
+# * lists, tuples, dicts, sets and strings built by an expression, and slices of a sequence
+#   (MicroPython 1.23 and later keep the slice itself on the stack, but the slice of a list or
+#   memoryview that it picks out is a new object)
+# * functions made by a lambda, closure or comprehension, and generators when they start
+# * calls to the built-in types and iterators (bytearray(), enumerate() and so on)
+# * new floats, and ints too big for MicroPython's small ints, when they're stored in a variable
+#
+# Functions written in C (plasma, or a method like str.split()) aren't looked into, and floats
+# that are only ever passed along aren't seen. Tracing every instruction is slow, so only
+# turn it on for the frames being measured.
+
+BUILDS = {
+    "BUILD_LIST": "list", "BUILD_TUPLE": "tuple", "BUILD_MAP": "dict", "BUILD_CONST_KEY_MAP": "dict",
+    "BUILD_SET": "set", "BUILD_STRING": "str", "FORMAT_VALUE": "str",
+    "MAKE_FUNCTION": "function", "CALL_FUNCTION_EX": "tuple",
+}
+
+# Built-ins whose call makes a new object. range() isn't here: MicroPython doesn't make one
+# for `for i in range(...)`
+CONSTRUCTORS = {
+    "bytearray", "bytes", "array", "memoryview", "list", "tuple", "dict", "set", "frozenset",
+    "str", "float", "sorted", "reversed", "enumerate", "zip", "map", "filter", "iter",
+}
+
+STORES = {"STORE_FAST", "STORE_NAME", "STORE_GLOBAL", "STORE_DEREF"}
+
+# Storing something that was just loaded is only passing on an object that already exists
+LOADS = {"LOAD_FAST", "LOAD_CONST", "LOAD_NAME", "LOAD_GLOBAL", "LOAD_DEREF", "LOAD_ATTR", "COPY"}
+
+SMALL_INT_MIN = -(1 << 30)
+SMALL_INT_MAX = (1 << 30) - 1
+
+GENERATOR_FLAGS = 0x20 | 0x80 | 0x200  # generators, coroutines and async generators
+
+
+class Allocations:
+    def __init__(self, folders):
+        self.folders = tuple(str(folder) for folder in folders)
+        self.counting = False
+        self.count = 0
+        self.sites = Counter()   # (file, line, kind): how many times
+        self._codes = {}
+
+    def start(self):
+        # Trace every frame started from now on. Counting only happens while `counting` is True
+        sys.settrace(self._call)
+
+    def stop(self):
+        sys.settrace(None)
+
+    def reset(self):
+        self.count = 0
+        self.sites.clear()
+
+    def _record(self, code, offset, kind):
+        self.count += 1
+        line = self._codes[code][2].get(offset, code.co_firstlineno)
+        self.sites[(code.co_filename, line, kind)] += 1
+
+    def _scan(self, code):
+        # What each instruction of a function allocates, worked out once per function
+        if not code.co_filename.startswith(self.folders):
+            self._codes[code] = None
+            return None
+        builds = {}
+        stores = {}
+        lines = {}
+        start = None
+        previous = None
+        line = code.co_firstlineno
+        instructions = list(dis.get_instructions(code))
+        for n, instruction in enumerate(instructions):
+            if instruction.starts_line is not None:
+                line = instruction.starts_line
+            lines[instruction.offset] = line
+            name = instruction.opname
+            if name == "BUILD_SLICE":
+                # Assigning to a slice changes the sequence in place
+                if instructions[n + 1].opname not in ("STORE_SUBSCR", "DELETE_SUBSCR"):
+                    builds[instruction.offset] = "slice"
+            elif name in BUILDS:
+                builds[instruction.offset] = BUILDS[name]
+            elif name in STORES and previous not in LOADS:
+                stores[instruction.offset] = (name, instruction.argval)
+            elif name == "RESUME" and instruction.arg == 0:
+                start = instruction.offset
+            elif instruction.argval in CONSTRUCTORS and (
+                    (name == "LOAD_GLOBAL" and instruction.arg & 1)
+                    or (name == "LOAD_NAME" and previous == "PUSH_NULL")):
+                # Loaded to be called, rather than to compare a type with
+                builds[instruction.offset] = instruction.argval
+            previous = name
+        generator = start if code.co_flags & GENERATOR_FLAGS else None
+        self._codes[code] = (builds, stores, lines, generator)
+        return self._codes[code]
+
+    def _call(self, frame, _event, _arg):
+        code = frame.f_code
+        info = self._codes[code] if code in self._codes else self._scan(code)
+        if info is None:
+            return None
+        if self.counting and info[3] is not None and frame.f_lasti == info[3]:
+            # A generator or coroutine being started for the first time
+            self._record(code, frame.f_lasti, "generator")
+        frame.f_trace_lines = False
+        frame.f_trace_opcodes = True
+        builds, stores = info[0], info[1]
+        pending = None
+
+        def trace(frame, event, _arg):
+            nonlocal pending
+            if event != "opcode" or not self.counting:
+                return trace
+            if pending is not None:
+                self._check_store(frame, *pending)
+                pending = None
+            offset = frame.f_lasti
+            if offset in builds:
+                self._record(code, offset, builds[offset])
+            elif offset in stores:
+                # Look at what was stored once it's been stored, at the next instruction
+                pending = (offset,) + stores[offset]
+            return trace
+
+        return trace
+
+    def _check_store(self, frame, offset, opname, name):
+        if opname == "STORE_FAST" or opname == "STORE_DEREF":
+            value = frame.f_locals.get(name)
+        elif opname == "STORE_NAME":
+            value = frame.f_locals.get(name, frame.f_globals.get(name))
+        else:
+            value = frame.f_globals.get(name)
+        kind = type(value)
+        if kind is float:
+            self._record(frame.f_code, offset, "float")
+        elif kind is int and not SMALL_INT_MIN <= value <= SMALL_INT_MAX:
+            self._record(frame.f_code, offset, "big int")
@@ -0,0 +1,222 @@
+import time
+
+# Pretend versions of the breakouts the examples use, built into the firmware as C++ modules.
+# They don't talk to the simulated I2C bus, their readings are plain attributes that can be set.
+# Each reading takes a little simulated time, as the I2C transfer would.
+
+READ_US = 200
+
+clock = None  # set by simulator.install()
+
+
+def _read():
+    if clock is not None:
+        clock.spend_us(READ_US)
+
+
+class BreakoutEncoder:
+    DIRECTION_CW = 0
+    DIRECTION_CCW = 1
+
+    def __init__(self, i2c, address=0x0F, interrupt=None):
+        self.i2c = i2c
+        self.address = address
+        self.interrupt_pin = interrupt
+        self.count = 0
+        self.direction = BreakoutEncoder.DIRECTION_CW
+        self.brightness = 1.0
+        self.led = (0, 0, 0)
+        self.interrupt = False
+
+    def turn(self, steps):
+        # Simulate turning the knob
+        self.count += steps
+        self.interrupt = True
+
+    def set_direction(self, direction):
+        self.direction = direction
+
+    def set_brightness(self, brightness):
+        self.brightness = brightness
+
+    def set_led(self, r, g, b):
+        self.led = (r, g, b)
+
+    def available(self):
+        _read()
+        return self.interrupt
+
+    def get_interrupt_flag(self):
+        _read()
+        return self.interrupt
+
+    def clear_interrupt_flag(self):
+        self.interrupt = False
+
+    def read(self):
+        _read()
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+
+class BreakoutEncoderWheel:
+    def __init__(self, i2c, address=0x13, led_address=0x77, interrupt=None):
+        self.i2c = i2c
+        self.address = address
+        self.led_address = led_address
+        self.interrupt_pin = interrupt
+        self.buttons = [False] * 5
+        self._count = 0
+        self._last = 0
+        self.leds = [(0, 0, 0)] * 24
+
+    def turn(self, steps):
+        self._count += steps
+
+    def pressed(self, button):
+        _read()
+        return self.buttons[button]
+
+    def count(self):
+        return self._count
+
+    def delta(self):
+        _read()
+        delta = self._count - self._last
+        self._last = self._count
+        return delta
+
+    def step(self):
+        return self._count % 24
+
+    def revolutions(self):
+        return self._count / 24
+
+    def zero(self):
+        self._count = 0
+        self._last = 0
+
+    def set_rgb(self, index, r, g, b):
+        self.leds[index] = (r, g, b)
+
+    def set_hsv(self, index, h, s=1.0, v=1.0):
+        self.leds[index] = (h, s, v)
+
+    def clear(self):
+        self.leds = [(0, 0, 0)] * 24
+
+    def show(self):
+        pass
+
+
+class BreakoutMSA301:
+    def __init__(self, i2c, address=0x26, interrupt=None):
+        self.i2c = i2c
+        self.address = address
+        self.interrupt_pin = interrupt
+        self.x = 0.0
+        self.y = 0.0
+        self.z = 1.0
+
+    def get_x_axis(self):
+        _read()
+        return self.x
+
+    def get_y_axis(self):
+        _read()
+        return self.y
+
+    def get_z_axis(self):
+        _read()
+        return self.z
+
+
+class BreakoutBME280:
+    def __init__(self, i2c, address=0x76, interrupt=None):
+        self.i2c = i2c
+        self.address = address
+        self.interrupt_pin = interrupt
+        self.reading = (21.0, 101325.0, 45.0)
+
+    def read(self):
+        _read()
+        return self.reading
+
+
+class BreakoutBME68X:
+    def __init__(self, i2c, address=0x76, interrupt=None):
+        self.i2c = i2c
+        self.address = address
+        self.interrupt_pin = interrupt
+        # temperature, pressure, humidity, gas resistance, status, gas index, measurement index
+        self.reading = (21.0, 101325.0, 45.0, 50000.0, 0xB0, 0, 0)
+
+    def read(self, *_args):
+        _read()
+        return self.reading
+
+
+class BreakoutRTC:
+    def __init__(self, i2c, address=0x52, interrupt=None):
+        self.i2c = i2c
+        self.address = address
+        self.interrupt_pin = interrupt
+        self._time = time.gmtime(0)
+
+    def update_time(self):
+        _read()
+        self._time = time.gmtime(1_735_732_800)  # 2025-01-01 12:00:00
+        return True
+
+    def get_year(self):
+        return self._time.tm_year
+
+    def get_month(self):
+        return self._time.tm_mon
+
+    def get_date(self):
+        return self._time.tm_mday
+
+    def get_weekday(self):
+        return self._time.tm_wday
+
+    def get_hours(self):
+        return self._time.tm_hour
+
+    def get_minutes(self):
+        return self._time.tm_min
+
+    def get_seconds(self):
+        return self._time.tm_sec
+
+    def string_date(self):
+        return f"{self._time.tm_mday:02}/{self._time.tm_mon:02}/{self._time.tm_year}"
+
+    def string_time(self):
+        return f"{self._time.tm_hour:02}:{self._time.tm_min:02}:{self._time.tm_sec:02}"
+
+
+class SCD41:
+    # breakout_scd41 is a module of functions rather than a class
+    def __init__(self):
+        self.reading = (600, 21.0, 45.0)
+        self.started = False
+
+    def init(self, i2c):
+        self.i2c = i2c
+
+    def start(self):
+        self.started = True
+
+    def stop(self):
+        self.started = False
+
+    def ready(self):
+        _read()
+        return self.started
+
+    def measure(self):
+        _read()
+        return self.reading
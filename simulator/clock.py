@@ -0,0 +1,120 @@
+import time
+
+# MicroPython's time functions, driven by a clock that only moves when the code sleeps.
+# Sleeping returns immediately, so an example runs as fast as it can be computed, and
+# the same example always sees the same sequence of ticks.
+
+TICKS_PERIOD = 1 << 30
+
+_real_sleep = time.sleep
+
+
+class StopSimulation(BaseException):
+    # Raised from a sleep to end a run. A BaseException, so examples' `except Exception` won't catch it
+    pass
+
+
+class Clock:
+    def __init__(self, virtual=True):
+        self.virtual = virtual
+        self._now_us = 0
+        self._start_ns = time.perf_counter_ns()
+        self._timers = []
+        self._listeners = []
+        self.sleeps = 0
+        self.limit_us = None  # stop the simulation once the clock passes this
+
+    def now_us(self):
+        if self.virtual:
+            return self._now_us
+        return (time.perf_counter_ns() - self._start_ns) // 1_000
+
+    def on_advance(self, listener):
+        # `listener(clock, us)` is called before the clock moves forward by `us`
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def add_timer(self, timer):
+        if timer not in self._timers:
+            self._timers.append(timer)
+
+    def remove_timer(self, timer):
+        if timer in self._timers:
+            self._timers.remove(timer)
+
+    def sleep_us(self, us):
+        us = max(0, int(us))
+        self.sleeps += 1
+        for listener in list(self._listeners):
+            listener(self, us)
+        if not self.virtual:
+            _real_sleep(us / 1_000_000)
+            self._run_timers(self.now_us())
+            return
+
+        self._advance(us)
+
+    def spend_us(self, us):
+        # Time taken by simulated hardware (eg: an I2C transfer). Unlike sleeping, it doesn't end a frame
+        if self.virtual:
+            self._advance(max(0, int(us)))
+
+    def _advance(self, us):
+        # Stop at every timer deadline on the way, so callbacks see the right time
+        end = self._now_us + us
+        if self.limit_us is not None and end > self.limit_us:
+            self._now_us = self.limit_us
+            raise StopSimulation
+        while True:
+            due = [timer for timer in self._timers if timer.deadline_us <= end]
+            if not due:
+                break
+            timer = min(due, key=lambda t: t.deadline_us)
+            self._now_us = max(self._now_us, timer.deadline_us)
+            timer.fire()
+        self._now_us = end
+
+    def _run_timers(self, now):
+        for timer in list(self._timers):
+            if timer.deadline_us <= now:
+                timer.fire()
+
+    # The functions below are installed into the `time` module
+
+    def ticks_ms(self):
+        return (self.now_us() // 1_000) % TICKS_PERIOD
+
+    def ticks_us(self):
+        return self.now_us() % TICKS_PERIOD
+
+    def ticks_cpu(self):
+        return self.ticks_us()
+
+    @staticmethod
+    def ticks_add(ticks, delta):
+        return (ticks + delta) % TICKS_PERIOD
+
+    @staticmethod
+    def ticks_diff(end, start):
+        diff = (end - start) % TICKS_PERIOD
+        return diff - TICKS_PERIOD if diff >= TICKS_PERIOD // 2 else diff
+
+    def sleep(self, seconds):
+        self.sleep_us(seconds * 1_000_000)
+
+    def sleep_ms(self, ms):
+        self.sleep_us(ms * 1_000)
+
+    def install(self):
+        time.ticks_ms = self.ticks_ms
+        time.ticks_us = self.ticks_us
+        time.ticks_cpu = self.ticks_cpu
+        time.ticks_add = self.ticks_add
+        time.ticks_diff = self.ticks_diff
+        time.sleep_ms = self.sleep_ms
+        time.sleep_us = self.sleep_us
+        if self.virtual:
+            time.sleep = self.sleep
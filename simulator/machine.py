@@ -0,0 +1,408 @@
+import calendar
+import time
+
+# Stands in for the machine module. Inputs (pins, ADC readings, UART data and I2C devices)
+# are set from outside with the functions at the bottom, outputs are kept for inspection.
+
+clock = None  # set by simulator.install(), drives Timer
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    ALT = 3
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    def __init__(self, id, mode=-1, pull=-1, *, value=None):
+        self.id = id
+        self.mode = None
+        self.pull = None
+        self.handler = None
+        self.trigger = 0
+        _pins.setdefault(id, []).append(self)
+        self.init(mode, pull, value=value)
+
+    def init(self, mode=-1, pull=-1, *, value=None):
+        if mode != -1:
+            self.mode = mode
+        if pull != -1:
+            self.pull = pull
+            if self.id not in _levels:
+                # An unconnected input reads however it's pulled
+                _levels[self.id] = 1 if pull == Pin.PULL_UP else 0
+        if value is not None:
+            self.value(value)
+
+    def value(self, value=None):
+        if value is None:
+            return _levels.get(self.id, 0)
+        _levels[self.id] = 1 if value else 0
+        return None
+
+    def __call__(self, value=None):
+        return self.value(value)
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+    def high(self):
+        self.value(1)
+
+    def low(self):
+        self.value(0)
+
+    def toggle(self):
+        self.value(not self.value())
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+        self.handler = handler
+        self.trigger = trigger
+        self.hard = hard
+
+
+class Signal:
+    def __init__(self, pin, invert=False):
+        self.pin = pin
+        self.invert = invert
+
+    def value(self, value=None):
+        if value is None:
+            return self.pin.value() ^ self.invert
+        self.pin.value(bool(value) ^ self.invert)
+        return None
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+
+class PWM:
+    def __init__(self, pin, freq=None, duty_u16=None):
+        self.pin = pin
+        self._freq = 1000
+        self._duty = 0
+        if freq is not None:
+            self.freq(freq)
+        if duty_u16 is not None:
+            self.duty_u16(duty_u16)
+
+    def freq(self, freq=None):
+        if freq is None:
+            return self._freq
+        self._freq = int(freq)
+        return None
+
+    def duty_u16(self, duty=None):
+        if duty is None:
+            return self._duty
+        self._duty = min(65535, max(0, int(duty)))
+        return None
+
+    def deinit(self):
+        self._duty = 0
+
+
+class ADC:
+    CORE_TEMP = 4
+
+    def __init__(self, pin):
+        self.pin = pin.id if isinstance(pin, Pin) else pin
+
+    def read_u16(self):
+        value = _adc_values.get(self.pin)
+        if value is None:
+            # 0.706V, which the temperature sensor reads as 27C
+            return 14022 if self.pin == ADC.CORE_TEMP else 0
+        if callable(value):
+            value = value(time.ticks_ms())
+        return min(65535, max(0, int(value)))
+
+
+class Timer:
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=-1, **kwargs):
+        self.id = id
+        self.callback = None
+        self.deadline_us = 0
+        self.period_us = 0
+        self.mode = Timer.PERIODIC
+        if kwargs:
+            self.init(**kwargs)
+
+    def init(self, *, mode=PERIODIC, freq=-1, period=-1, callback=None):
+        if freq > 0:
+            self.period_us = int(1_000_000 / freq)
+        elif period >= 0:
+            self.period_us = int(period * 1_000)
+        else:
+            raise ValueError("freq or period must be given")
+        self.mode = mode
+        self.callback = callback
+        self.deadline_us = clock.now_us() + self.period_us
+        clock.add_timer(self)
+
+    def fire(self):
+        if self.mode == Timer.PERIODIC:
+            self.deadline_us += max(1, self.period_us)
+        else:
+            clock.remove_timer(self)
+        if self.callback is not None:
+            self.callback(self)
+
+    def deinit(self):
+        clock.remove_timer(self)
+
+
+class UART:
+    def __init__(self, id, baudrate=115200, **kwargs):
+        self.id = id
+        self.baudrate = baudrate
+        self.config = kwargs
+        self.tx = bytearray()   # everything written
+        self.rx = bytearray()   # waiting to be read, see feed_uart()
+        _uarts[id] = self
+
+    def init(self, baudrate=115200, **kwargs):
+        self.baudrate = baudrate
+        self.config.update(kwargs)
+
+    def any(self):
+        return len(self.rx)
+
+    def read(self, nbytes=None):
+        if not self.rx:
+            return None
+        nbytes = len(self.rx) if nbytes is None else nbytes
+        data = bytes(self.rx[:nbytes])
+        del self.rx[:nbytes]
+        return data
+
+    def readline(self):
+        end = self.rx.find(b"\n")
+        return self.read(None if end < 0 else end + 1)
+
+    def readinto(self, buf, nbytes=None):
+        data = self.read(len(buf) if nbytes is None else nbytes)
+        if data is None:
+            return None
+        buf[:len(data)] = data
+        return len(data)
+
+    def write(self, data):
+        self.tx.extend(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def deinit(self):
+        pass
+
+
+class RTC:
+    # Starts at midday on the 1st of January 2025, and keeps time with the clock
+    _base = calendar.timegm((2025, 1, 1, 12, 0, 0))
+    _base_us = 0
+
+    def datetime(self, datetimetuple=None):
+        if datetimetuple is not None:
+            year, month, day, _, hours, minutes, seconds = datetimetuple[:7]
+            RTC._base = calendar.timegm((year, month, day, hours, minutes, seconds))
+            RTC._base_us = clock.now_us()
+            return None
+        t = time.gmtime(RTC._base + (clock.now_us() - RTC._base_us) // 1_000_000)
+        return (t.tm_year, t.tm_mon, t.tm_mday, t.tm_wday, t.tm_hour, t.tm_min, t.tm_sec, 0)
+
+
+class I2C:
+    def __init__(self, id=0, *, scl=None, sda=None, freq=400_000, timeout=50_000):
+        self.id = id
+        self.scl = scl
+        self.sda = sda
+        self.freq = freq
+        self.timeout = timeout
+        self.transactions = 0
+        self.bytes = 0
+
+    def _device(self, addr, nbytes):
+        # Each byte (and the address) takes nine clocks
+        clock.spend_us((nbytes + 1) * 9_000_000 // self.freq)
+        device = _i2c_devices.get(addr)
+        if device is None:
+            raise OSError(5, "EIO")  # no ACK
+        self.transactions += 1
+        self.bytes += nbytes + 1
+        return device
+
+    def scan(self):
+        return sorted(_i2c_devices)
+
+    def writeto(self, addr, buf, *_args):
+        device = self._device(addr, len(buf))
+        if buf:
+            device.write(buf[0], bytes(buf[1:]))
+        else:
+            device.write(None, b"")
+        return 1
+
+    def readfrom(self, addr, nbytes, *_args):
+        device = self._device(addr, nbytes)
+        return bytes(device.read(None, nbytes))
+
+    def readfrom_into(self, addr, buf, *_args):
+        buf[:] = self.readfrom(addr, len(buf))
+
+    def writeto_mem(self, addr, memaddr, buf, **_kwargs):
+        device = self._device(addr, len(buf) + 1)
+        device.write(memaddr, bytes(buf))
+
+    def readfrom_mem(self, addr, memaddr, nbytes, **_kwargs):
+        # The register address is written, then the bus restarted to read
+        device = self._device(addr, nbytes + 2)
+        return bytes(device.read(memaddr, nbytes))
+
+    def readfrom_mem_into(self, addr, memaddr, buf, **_kwargs):
+        buf[:] = self.readfrom_mem(addr, memaddr, len(buf))
+
+
+class I2CDevice:
+    # A device as a bank of 8-bit registers. Reading or writing without a register
+    # address carries on from the last one, as most register-based chips do
+    def __init__(self, size=256):
+        self.registers = bytearray(size)
+        self.pointer = 0
+        self.reads = 0
+        self.writes = 0
+
+    def read(self, reg, nbytes):
+        self.reads += 1
+        if reg is not None:
+            self.pointer = reg
+        start = self.pointer
+        self.pointer = (start + nbytes) % len(self.registers)
+        return bytes(self.registers[(start + i) % len(self.registers)] for i in range(nbytes))
+
+    def write(self, reg, data):
+        self.writes += 1
+        if reg is None:
+            return
+        for i, byte in enumerate(data):
+            self.registers[(reg + i) % len(self.registers)] = byte
+        self.pointer = reg + len(data)
+
+
+class TCA9555(I2CDevice):
+    # A 16-bit I/O expander (as on a QwSTPad). set_inputs() changes what its input port reads,
+    # and pulls its INT pin low until the input port is read, as the real chip does
+    def __init__(self, interrupt=None):
+        super().__init__(8)
+        self.interrupt = interrupt
+        if interrupt is not None:
+            set_pin(interrupt, 1)
+
+    def set_inputs(self, value):
+        old = self.registers[0] | (self.registers[1] << 8)
+        self.registers[0] = value & 0xFF
+        self.registers[1] = (value >> 8) & 0xFF
+        if value != old and self.interrupt is not None:
+            set_pin(self.interrupt, 0)
+
+    def read(self, reg, nbytes):
+        first = self.pointer if reg is None else reg
+        if self.interrupt is not None and first in (0, 1):
+            set_pin(self.interrupt, 1)
+        return super().read(reg, nbytes)
+
+
+# State shared between every object for the same pin, ADC channel, UART or I2C address
+_levels = {}
+_pins = {}
+_adc_values = {}
+_uarts = {}
+_i2c_devices = {}
+
+
+def freq(hz=None):
+    return 150_000_000 if hz is None else None
+
+
+def unique_id():
+    return b"\xe6\x61\x41\x04\x03\x5f\x2a\x21"
+
+
+def reset():
+    raise SystemExit("machine.reset()")
+
+
+def soft_reset():
+    raise SystemExit("machine.soft_reset()")
+
+
+def idle():
+    pass
+
+
+def lightsleep(ms=None):
+    if ms is not None:
+        time.sleep_ms(ms)
+
+
+def disable_irq():
+    return 0
+
+
+def enable_irq(_state=0):
+    pass
+
+
+# Functions for a test or runner to drive the inputs
+
+
+def set_pin(id, value):
+    # Change an input's level, calling its irq() handler if the edge matches
+    old = _levels.get(id, 0)
+    value = 1 if value else 0
+    _levels[id] = value
+    if value == old:
+        return
+    edge = Pin.IRQ_RISING if value else Pin.IRQ_FALLING
+    for pin in _pins.get(id, ()):
+        if pin.handler is not None and pin.trigger & edge:
+            pin.handler(pin)
+
+
+def set_adc(pin, value):
+    # A fixed reading from 0 to 65535, or a function that's given the time in ms and returns one
+    _adc_values[pin.id if isinstance(pin, Pin) else pin] = value
+
+
+def feed_uart(id, data):
+    _uarts[id].rx.extend(data)
+
+
+def add_i2c_device(address, device):
+    _i2c_devices[address] = device
+    return device
+
+
+def remove_i2c_device(address):
+    _i2c_devices.pop(address, None)
+
+
+def reset_state():
+    _levels.clear()
+    _pins.clear()
+    _adc_values.clear()
+    _i2c_devices.clear()
+    _uarts.clear()
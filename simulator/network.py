@@ -0,0 +1,194 @@
+import asyncio
+
+# Stands in for the network module. WLAN connects straight away (or fails, if told to), and
+# asyncio.open_connection() is replaced by fake servers, so nothing goes out to the internet.
+
+STA_IF = 0
+AP_IF = 1
+
+STAT_IDLE = 0
+STAT_CONNECTING = 1
+STAT_WRONG_PASSWORD = -3
+STAT_NO_AP_FOUND = -2
+STAT_CONNECT_FAIL = -1
+STAT_GOT_IP = 3
+
+# Set to a STAT_ value to make connections fail
+fail_with = None
+
+# Fake servers by host name, see serve()
+_servers = {}
+
+# The request line of every request that's been answered, in order
+requests = []
+
+# How many connections have been opened. HTTP/1.1 requests can share one, as with keep-alive
+connections = 0
+
+
+class WLAN:
+    def __init__(self, interface=STA_IF, **_pins):
+        self.interface = interface
+        self._active = False
+        self._status = STAT_IDLE
+        self._config = {"ssid": "", "mac": b"\x28\xcd\xc1\x00\x00\x01", "hostname": "plasma"}
+        self.ssid = None
+
+    def active(self, active=None):
+        if active is None:
+            return self._active
+        self._active = bool(active)
+        return None
+
+    def connect(self, ssid=None, key=None, **_kwargs):
+        self.ssid = ssid
+        self.key = key
+        self._config["ssid"] = ssid
+        self._status = fail_with if fail_with is not None else STAT_GOT_IP
+
+    def disconnect(self):
+        self._status = STAT_IDLE
+
+    def isconnected(self):
+        return self._status == STAT_GOT_IP
+
+    def status(self, param=None):
+        if param == "rssi":
+            return -50
+        return self._status
+
+    def config(self, *args, **kwargs):
+        if kwargs:
+            self._config.update(kwargs)
+            return None
+        return self._config.get(args[0]) if args else None
+
+    def ifconfig(self, config=None):
+        if config is not None:
+            return None
+        return ("192.168.1.50", "255.255.255.0", "192.168.1.1", "192.168.1.1")
+
+    def ipconfig(self, key):
+        if key == "addr4":
+            return ("192.168.1.50", "255.255.255.0")
+        if key == "addr6":
+            return [("fe80::1", 0, 0, 0)]
+        return None
+
+    def scan(self):
+        return []
+
+
+class PPP:
+    def __init__(self, stream):
+        self.stream = stream
+        self._status = 0
+
+    def active(self, active=None):
+        return True if active is None else None
+
+    def config(self, **kwargs):
+        pass
+
+    def connect(self, **_kwargs):
+        self._status = 4
+
+    def disconnect(self):
+        self._status = 0
+
+    def status(self):
+        return self._status
+
+    def isconnected(self):
+        return self._status == 4
+
+    def ifconfig(self, config=None):
+        if config is not None:
+            return None
+        return ("10.0.0.2", "255.255.255.255", "10.0.0.1", "8.8.8.8")
+
+    def ipconfig(self, *args, **kwargs):
+        if kwargs:
+            return None
+        return ("10.0.0.2", "255.255.255.255") if args and args[0] == "addr4" else None
+
+
+def serve(host, body, status=200, headers=None, delay_ms=0):
+    # Answer every request to `host` with this response, after `delay_ms` (of simulated time).
+    # `body` may be bytes or a function that's given the request line and returns bytes
+    _servers[host] = (body, status, headers or {}, delay_ms)
+
+
+def reset():
+    global fail_with, connections
+    fail_with = None
+    connections = 0
+    _servers.clear()
+    requests.clear()
+
+
+class _Writer:
+    def __init__(self):
+        self.data = bytearray()
+        self.closed = False
+        self.written = asyncio.Event()
+
+    def write(self, data):
+        self.data.extend(data)
+        self.written.set()
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.closed = True
+        self.written.set()
+
+    async def wait_closed(self):
+        pass
+
+
+async def _next_request(writer):
+    # The head of the next request written to the connection, or None once it's closed
+    while b"\r\n\r\n" not in writer.data:
+        if writer.closed:
+            return None
+        writer.written.clear()
+        await writer.written.wait()
+    head, _, rest = bytes(writer.data).partition(b"\r\n\r\n")
+    writer.data = bytearray(rest)
+    return head
+
+
+async def open_connection(host, port, **_kwargs):
+    global connections
+    if host not in _servers:
+        raise OSError(-2, f"simulator: no server for {host}:{port}, see simulator.network.serve()")
+    connections += 1
+    reader = asyncio.StreamReader()
+    writer = _Writer()
+
+    async def respond():
+        # Answers requests until the client closes the connection, or asks for it to be closed
+        while True:
+            head = await _next_request(writer)
+            if head is None:
+                return
+            body, status, headers, delay_ms = _servers[host]
+            await asyncio.sleep(delay_ms / 1000)
+            if writer.closed:
+                return
+            request, _, request_headers = head.partition(b"\r\n")
+            requests.append(request)
+            keep_alive = request.endswith(b"HTTP/1.1") and b"connection: close" not in request_headers.lower()
+            content = body(request) if callable(body) else body
+            version = "HTTP/1.1" if request.endswith(b"HTTP/1.1") else "HTTP/1.0"
+            response = [f"{version} {status} OK", f"Content-Length: {len(content)}"]
+            response.extend(f"{name}: {value}" for name, value in headers.items())
+            reader.feed_data(("\r\n".join(response) + "\r\n\r\n").encode("utf-8") + content)
+            if not keep_alive:
+                reader.feed_eof()
+                return
+
+    asyncio.get_event_loop().create_task(respond())
+    return reader, writer
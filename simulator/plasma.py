@@ -0,0 +1,137 @@
+import colorsys
+
+# Stands in for the plasma module. Each strip stores pixels exactly as the real drivers do
+# (four bytes per LED: white or APA102 brightness first, then the colour bytes in wire order)
+# and can keep a copy of every frame it's asked to send.
+
+COLOR_ORDER_RGB = 0
+COLOR_ORDER_RBG = 1
+COLOR_ORDER_GRB = 2
+COLOR_ORDER_GBR = 3
+COLOR_ORDER_BRG = 4
+COLOR_ORDER_BGR = 5
+
+# Byte offsets of red, green and blue for each colour order
+_OFFSETS = {
+    COLOR_ORDER_RGB: (3, 2, 1),
+    COLOR_ORDER_RBG: (3, 1, 2),
+    COLOR_ORDER_GRB: (2, 3, 1),
+    COLOR_ORDER_GBR: (1, 3, 2),
+    COLOR_ORDER_BRG: (2, 1, 3),
+    COLOR_ORDER_BGR: (1, 2, 3),
+}
+
+# Every strip created, in order, so a runner can inspect them afterwards
+strips = []
+
+# Set by simulator.install(), to give started strips their frames
+clock = None
+record = False
+
+# The RP2350 has three PIOs, each with four state machines
+PIOS = 3
+STATE_MACHINES = 4
+
+
+class _Strip:
+    def __init__(self, num_leds, pio=0, sm=0, *, buffer=None, color_order=COLOR_ORDER_GRB, rgbw=False):
+        if color_order not in _OFFSETS:
+            raise ValueError("color_order is not valid")
+        if buffer is not None and len(buffer) < num_leds * 4:
+            raise ValueError("Supplied buffer is too small for LED count!")
+        if not (0 <= pio < PIOS and 0 <= sm < STATE_MACHINES):
+            raise ValueError("pio or sm out of range")
+        self.num_leds = num_leds
+        self.pio = pio
+        self.sm = sm
+        self.rgbw = rgbw
+        self.color_order = color_order
+        self._r, self._g, self._b = _OFFSETS[color_order]
+        self.buffer = buffer if buffer is not None else bytearray(num_leds * 4)
+        self.calls = 0       # set_rgb / set_hsv calls
+        self.updates = 0     # frames sent with update()
+        self.fps = None      # set by start()
+        self.frames = []     # copies of each frame sent, if recording
+        strips.append(self)
+
+    def set_rgb(self, index, r, g, b, w=0):
+        if not 0 <= index < self.num_leds:
+            raise ValueError("index out of range")
+        self.calls += 1
+        i = index * 4
+        buffer = self.buffer
+        buffer[i + self._r] = int(r) & 0xff
+        buffer[i + self._g] = int(g) & 0xff
+        buffer[i + self._b] = int(b) & 0xff
+        self._set_first(i, w)
+
+    def _set_first(self, i, w):
+        if self.rgbw:
+            self.buffer[i] = int(w) & 0xff
+
+    def set_hsv(self, index, h, s=1.0, v=1.0):
+        r, g, b = colorsys.hsv_to_rgb(h % 1.0, min(1.0, max(0.0, s)), min(1.0, max(0.0, v)))
+        self.set_rgb(index, int(r * 255), int(g * 255), int(b * 255))
+
+    def get(self, index):
+        i = index * 4
+        buffer = self.buffer
+        if self.rgbw:
+            return buffer[i + self._r], buffer[i + self._g], buffer[i + self._b], buffer[i]
+        return buffer[i + self._r], buffer[i + self._g], buffer[i + self._b]
+
+    def clear(self):
+        for i in range(self.num_leds):
+            self.set_rgb(i, 0, 0, 0)
+
+    def start(self, fps=60):
+        # Send a frame every 1/fps seconds of simulated time, as the real strip's timer does
+        self.fps = fps
+        self.period_us = 1_000_000 // fps
+        if clock is not None:
+            self.deadline_us = clock.now_us() + self.period_us
+            clock.add_timer(self)
+
+    def fire(self):
+        # Called by the clock when the next frame is due
+        self.deadline_us += self.period_us
+        self.update()
+
+    def update(self):
+        self.updates += 1
+        if record:
+            self.frames.append(bytes(self.buffer))
+
+    def pixels(self):
+        # The LEDs as a list of colour tuples
+        return [self.get(i) for i in range(self.num_leds)]
+
+
+class WS2812(_Strip):
+    def __init__(self, num_leds, pio=0, sm=0, dat=None, freq=800_000, *, buffer=None, color_order=COLOR_ORDER_GRB, rgbw=False):
+        super().__init__(num_leds, pio, sm, buffer=buffer, color_order=color_order, rgbw=rgbw)
+        self.dat = dat
+        self.freq = freq
+
+
+class APA102(_Strip):
+    def __init__(self, num_leds, pio=0, sm=0, dat=None, clk=None, freq=1_000_000, *, buffer=None):
+        # APA102s don't have a colour order setting: blue, green then red, after the brightness byte
+        super().__init__(num_leds, pio, sm, buffer=buffer, color_order=COLOR_ORDER_RGB)
+        self.dat = dat
+        self.clk = clk
+        self.freq = freq
+        if buffer is None:
+            self.set_brightness(15)
+
+    def _set_first(self, i, _w):
+        self.buffer[i] |= 0b11100000
+
+    def set_brightness(self, brightness):
+        sof = 0b11100000 | (int(brightness) & 0b11111)
+        for i in range(0, self.num_leds * 4, 4):
+            self.buffer[i] = sof
+
+
+def reset():
+    strips.clear()
@@ -0,0 +1,115 @@
+import _thread
+import random
+import re
+import sys
+import threading
+import time
+import types
+from array import array
+from pathlib import Path
+
+import simulator
+from simulator import plasma
+from simulator.clock import StopSimulation
+
+# Runs an example headless for a number of frames, timing each one.
+# A frame ends whenever the example sleeps (time.sleep, a Scheduler wait or an asyncio sleep),
+# and the time it took is the real time spent computing since the last one.
+# Examples that never sleep (eg: ones that poll a sensor as fast as they can) are stopped
+# after `seconds` of simulated time, or `timeout` seconds of real time.
+
+
+class Result:
+    def __init__(self, path, num_leds, frame_us, elapsed_us, strips, timed_out=False):
+        self.path = path
+        self.num_leds = num_leds
+        self.frame_us = frame_us      # real time taken by each frame
+        self.elapsed_us = elapsed_us  # simulated time that passed
+        self.strips = strips          # every plasma strip the example created
+        self.timed_out = timed_out    # stopped by the real time limit
+
+    @property
+    def frames(self):
+        return len(self.frame_us)
+
+    def stats(self):
+        times = sorted(self.frame_us)
+        if not times:
+            return {"frames": 0, "mean_us": 0, "p95_us": 0, "max_us": 0}
+        return {
+            "frames": len(times),
+            "mean_us": sum(times) // len(times),
+            "p95_us": times[min(len(times) - 1, len(times) * 95 // 100)],
+            "max_us": times[-1],
+        }
+
+
+def load(path, num_leds=None):
+    # The example's source, with its NUM_LEDS changed if asked
+    source = Path(path).read_text()
+    if num_leds is not None:
+        source = re.sub(r"^NUM_LEDS = \d+", f"NUM_LEDS = {num_leds}", source, count=1, flags=re.MULTILINE)
+    return source
+
+
+def run(path, num_leds=None, frames=100, seed=0, record=False, setup=None, seconds=None, timeout=30, on_frame=None):
+    # `setup(clock)` is called once everything is in place, to set up pins, sensors or servers.
+    # `on_frame(frame, frame_us)` is called at the end of every frame, and isn't counted in its time
+    path = Path(path)
+    clock = simulator.install(record=record)
+    simulator.reset()
+    random.seed(seed)
+
+    # Examples that connect to WiFi need something in secrets.py
+    sys.modules["secrets"] = types.SimpleNamespace(WIFI_SSID="simulator", WIFI_PASSWORD="simulator")
+    if str(path.parent) not in sys.path:
+        sys.path.insert(0, str(path.parent))
+
+    # Preallocated, so that timing frames doesn't grow the heap that's being measured
+    frame_us = array("Q", bytes(8 * frames))
+    count = 0
+    last = time.perf_counter_ns()
+
+    def end_frame(_clock, _us):
+        nonlocal last, count
+        if count >= frames:
+            return  # already stopping, let the example clean up
+        us = (time.perf_counter_ns() - last) // 1_000
+        frame_us[count] = us
+        count += 1
+        if on_frame is not None:
+            on_frame(count - 1, us)
+        last = time.perf_counter_ns()
+        if count >= frames:
+            raise StopSimulation
+
+    clock.on_advance(end_frame)
+    if seconds is not None:
+        clock.limit_us = int(seconds * 1_000_000)
+    if setup is not None:
+        setup(clock)
+
+    # A KeyboardInterrupt is the only way to stop code that never calls into the simulator
+    timed_out = threading.Event()
+
+    def watchdog():
+        timed_out.set()
+        _thread.interrupt_main()
+
+    timer = threading.Timer(timeout, watchdog)
+    timer.daemon = True
+
+    code = compile(load(path, num_leds), str(path), "exec")
+    timer.start()
+    try:
+        exec(code, {"__name__": "__main__", "__file__": str(path)})
+    except StopSimulation:
+        pass
+    except KeyboardInterrupt:
+        if not timed_out.is_set():
+            raise
+    finally:
+        timer.cancel()
+        clock.remove_listener(end_frame)
+
+    return Result(str(path), num_leds, frame_us[:count].tolist(), clock.now_us(), list(plasma.strips), timed_out.is_set())